@@ -40,6 +40,9 @@ INSTALLED_APPS = [
     'suppliers',
     'purchase_orders',
     'products',
+    'currencies',
+    'sequences',
+    'blobstore',
 ]
 
 MIDDLEWARE = [
@@ -114,6 +117,21 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per content hash (see blobstore/storage.py). Files whose
+# names are already derived from their content (avatars, rendered documents)
+# use the plain 'hashed' storage so they keep those names.
+STORAGES = {
+    'default': {
+        'BACKEND': os.environ.get('MEDIA_STORAGE_BACKEND', 'blobstore.storage.ContentAddressedStorage'),
+    },
+    'hashed': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -158,6 +176,9 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    # Number of trusted reverse proxies in front of the app. With 0, clients are
+    # identified by REMOTE_ADDR and X-Forwarded-For is ignored.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 
@@ -177,6 +198,65 @@ SIMPLE_JWT = {
 }
 
 
+# Request throttling (token buckets, see backend/throttling.py)
+# Rates are per scope and per key kind ('ip' or 'user'), as "N/period".
+THROTTLE_BACKEND = os.environ.get('THROTTLE_BACKEND', 'backend.throttling.LocalBucketBackend')
+THROTTLE_CACHE = os.environ.get('THROTTLE_CACHE', 'default')
+THROTTLE_RATES = {
+    'register': {'ip': '10/hour'},
+    'login': {'ip': '20/minute'},
+    'password_reset': {'ip': '10/hour'},
+    'lead_create': {'ip': '30/hour', 'user': '30/hour'},
+    'upload_image': {'ip': '120/hour', 'user': '120/hour'},
+}
+
+# FX rates (see currencies/importers.py)
+# Stored rates are units of each currency per one unit of FX_BASE_CURRENCY.
+FX_BASE_CURRENCY = os.environ.get('FX_BASE_CURRENCY', 'USD')
+FX_RATE_IMPORTER = os.environ.get('FX_RATE_IMPORTER', 'currencies.importers.FileRateImporter')
+FX_RATE_FILE = os.environ.get('FX_RATE_FILE', str(BASE_DIR / 'fx_rates.json'))
+FX_RATE_URL = os.environ.get('FX_RATE_URL', '')
+# Cache holding the rates version; share it between workers so imports apply at once
+FX_RATE_CACHE = os.environ.get('FX_RATE_CACHE', 'default')
+
+
+# Document numbering (see sequences/service.py), e.g. PI/2026-27/000123
+FISCAL_YEAR_START_MONTH = int(os.environ.get('FISCAL_YEAR_START_MONTH', 4))
+DOCUMENT_NUMBER_FORMAT = '{prefix}/{year}/{value:06d}'
+# Numbers reserved per database round trip; unused ones are lost when a process exits
+DOCUMENT_NUMBER_BLOCK_SIZE = int(os.environ.get('DOCUMENT_NUMBER_BLOCK_SIZE', 1))
+
+
+# Order documents (see orders/documents.py)
+DOCUMENT_COMPANY_NAME = os.environ.get('DOCUMENT_COMPANY_NAME', 'Prime Apparel')
+DOCUMENT_COMPANY_ADDRESS = os.environ.get('DOCUMENT_COMPANY_ADDRESS', '')
+# WeasyPrint worker processes; defaults to the number of CPUs
+DOCUMENT_RENDER_WORKERS = int(os.environ['DOCUMENT_RENDER_WORKERS']) if os.environ.get('DOCUMENT_RENDER_WORKERS') else None
+
+
+# Cache alias for QC defect analytics results; use a shared cache with several workers
+DEFECT_ANALYTICS_CACHE = os.environ.get('DEFECT_ANALYTICS_CACHE', 'default')
+# Seconds a cached result is kept even if no report is saved
+DEFECT_ANALYTICS_TIMEOUT = int(os.environ.get('DEFECT_ANALYTICS_TIMEOUT', 3600))
+
+
+# Capacity planning (see production/planning.py)
+PRODUCTION_STAGE_SEQUENCE = os.environ.get('PRODUCTION_STAGE_SEQUENCE', 'cutting,stitching,finishing,packing').split(',')
+# Working weekdays, 0 = Monday
+PRODUCTION_WORKING_DAYS = [int(day) for day in os.environ.get('PRODUCTION_WORKING_DAYS', '0,1,2,3,4,5').split(',')]
+# Lead time assumed for orders without a ship-by date, counted from the PI date
+PRODUCTION_DEFAULT_LEAD_DAYS = int(os.environ.get('PRODUCTION_DEFAULT_LEAD_DAYS', 60))
+
+
+# Courier tracking (see production/couriers.py), keyed by Shipment.courier (case-insensitive)
+COURIER_TRACKING = {}
+if os.environ.get('COURIER_STUB_URL'):
+    # Stand-in server from `python manage.py courier_stub`
+    COURIER_TRACKING['stub'] = {'url': os.environ['COURIER_STUB_URL'], 'rate': '50/second', 'batch_size': 100}
+# Pooled HTTP connections shared by all couriers during a sync
+COURIER_TRACKING_CONNECTIONS = int(os.environ.get('COURIER_TRACKING_CONNECTIONS', 20))
+
+
 # Email Settings
 EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 
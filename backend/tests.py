@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .throttling import CacheBucketBackend, LocalBucketBackend, get_backend, parse_rate
+
+
+class BucketBackendTests(TestCase):
+    """Buckets allow a burst of `capacity`, then refill at the configured rate"""
+
+    def drain(self, backend, clock, patch_target):
+        with mock.patch(patch_target, side_effect=lambda: clock[0]):
+            results = [backend.consume('k', 2, 1.0) for _ in range(3)]
+            clock[0] += 1.5
+            results.append(backend.consume('k', 2, 1.0))
+        return results
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/minute'), (10, 10 / 60))
+        self.assertEqual(parse_rate('3/s'), (3, 3.0))
+
+    def test_local_bucket_refills(self):
+        results = self.drain(LocalBucketBackend(), [100.0], 'backend.throttling.time.monotonic')
+        self.assertEqual([allowed for allowed, _ in results], [True, True, False, True])
+        self.assertAlmostEqual(results[2][1], 1.0)
+
+    def test_local_bucket_evicts_least_recently_used_key(self):
+        backend = LocalBucketBackend()
+        backend.max_keys = 2
+        backend.consume('a', 1, 0.001)
+        backend.consume('b', 1, 0.001)
+        backend.consume('a', 1, 0.001)
+        backend.consume('c', 1, 0.001)
+        self.assertEqual(list(backend._buckets), ['a', 'c'])
+        self.assertTrue(backend.consume('b', 1, 0.001)[0])
+
+    def test_cache_bucket_refills(self):
+        backend = CacheBucketBackend()
+        backend.clear()
+        results = self.drain(backend, [1000.0], 'backend.throttling.time.time')
+        self.assertEqual([allowed for allowed, _ in results], [True, True, False, True])
+
+    def test_cache_clear_keeps_other_cache_entries(self):
+        backend = CacheBucketBackend()
+        cache.set('fx:rates', 'kept')
+        backend.consume('k', 1, 0.01)
+        self.assertFalse(backend.consume('k', 1, 0.01)[0])
+
+        backend.clear()
+        self.assertTrue(backend.consume('k', 1, 0.01)[0])
+        self.assertEqual(cache.get('fx:rates'), 'kept')
+
+
+@override_settings(THROTTLE_RATES={'login': {'ip': '3/minute'}})
+class ThrottledEndpointTests(TestCase):
+    def setUp(self):
+        get_backend().clear()
+
+    def tearDown(self):
+        get_backend().clear()
+
+    def test_login_is_rejected_with_429_after_burst(self):
+        responses = [
+            self.client.post('/api/auth/login/', {'identifier': 'nobody', 'password': 'wrong'}) for _ in range(4)
+        ]
+        self.assertNotIn(429, [response.status_code for response in responses[:3]])
+        self.assertEqual(responses[3].status_code, 429)
+        self.assertTrue(responses[3].has_header('Retry-After'))
+
+    def test_forwarded_for_header_does_not_reset_the_ip_limit(self):
+        responses = [
+            self.client.post(
+                '/api/auth/login/', {'identifier': 'nobody', 'password': 'wrong'},
+                HTTP_X_FORWARDED_FOR=f'203.0.113.{n}',
+            )
+            for n in range(4)
+        ]
+        self.assertEqual(responses[3].status_code, 429)
@@ -0,0 +1,190 @@
+"""
+Token-bucket request throttling for public endpoints.
+
+Views opt in by setting ``throttle_scope`` and listing the throttle classes
+they need. Limits per scope live in ``THROTTLE_RATES`` in settings, e.g.::
+
+    THROTTLE_RATES = {
+        'login': {'ip': '10/minute'},
+        'lead_create': {'ip': '20/hour', 'user': '30/hour'},
+    }
+
+A rate of ``N/period`` is a bucket holding ``N`` tokens that refills at
+``N`` tokens per period, so short bursts are allowed while the long-term
+average is capped. DRF runs throttles in ``APIView.initial()``, before the
+request body is parsed, so rejected requests never touch uploads or the DB.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {
+    's': 1,
+    'sec': 1,
+    'second': 1,
+    'm': 60,
+    'min': 60,
+    'minute': 60,
+    'h': 3600,
+    'hour': 3600,
+    'd': 86400,
+    'day': 86400,
+}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """Parse ``'10/minute'`` into ``(capacity, tokens_per_second)``."""
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period.strip().lower()]
+
+
+class LocalBucketBackend:
+    """
+    In-process token buckets.
+
+    Fastest option, but every worker process keeps its own buckets, so the
+    effective limit is multiplied by the number of workers.
+    """
+
+    # Least recently used buckets are dropped once this many keys are tracked
+    max_keys = 50000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        """Take one token. Returns ``(allowed, seconds_until_next_token)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - stamp) * refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                allowed, wait = True, 0.0
+            else:
+                allowed, wait = False, (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketBackend:
+    """
+    Token buckets stored in the Django cache, shared by all workers.
+
+    Uses ``THROTTLE_CACHE`` (default ``'default'``). The read-modify-write is
+    not atomic, so concurrent requests for the same key may slightly exceed
+    the limit; that is acceptable for abuse protection. Buckets are stored
+    under a generation number (the cache key version), so ``clear()`` retires
+    them without touching anything else kept in a shared cache.
+    """
+
+    generation_key = 'throttle:generation'
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'THROTTLE_CACHE', 'default')]
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.time()
+        cache_key = f'throttle:{key}'
+        generation = self.cache.get_or_set(self.generation_key, 1, None)
+        tokens, stamp = self.cache.get(cache_key, (capacity, now), version=generation)
+        tokens = min(capacity, tokens + max(now - stamp, 0) * refill_rate)
+        if tokens >= 1:
+            tokens -= 1
+            allowed, wait = True, 0.0
+        else:
+            allowed, wait = False, (1 - tokens) / refill_rate
+        # Keep the entry only as long as it takes to refill completely
+        timeout = int(capacity / refill_rate) + 1
+        self.cache.set(cache_key, (tokens, now), timeout, version=generation)
+        return allowed, wait
+
+    def clear(self):
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            pass  # no bucket has been stored yet
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _load_backend(getattr(settings, 'THROTTLE_BACKEND', 'backend.throttling.LocalBucketBackend'))
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Base token-bucket throttle. Subclasses set ``kind`` (the key looked up in
+    the scope's rate dict) and implement ``get_cache_key``.
+    """
+
+    kind = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None
+        return getattr(settings, 'THROTTLE_RATES', {}).get(scope, {}).get(self.kind)
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(view)
+        if not rate:
+            return True
+
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        key = f'{view.throttle_scope}:{self.kind}:{ident}'
+        allowed, self._wait = get_backend().consume(key, capacity, refill_rate)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPBucketThrottle(BucketThrottle):
+    """Limits requests per client IP address."""
+
+    kind = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserBucketThrottle(BucketThrottle):
+    """Limits requests per authenticated user; anonymous requests pass."""
+
+    kind = 'user'
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if not user or not user.is_authenticated:
+            return None
+        return user.pk
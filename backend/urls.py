@@ -13,7 +13,11 @@ urlpatterns = [
     # API endpoints
     path('api/auth/', include('users.urls')),
     path('api/leads/', include('leads.urls')),
+    path('api/costings/', include('costings.urls')),
+    path('api/orders/', include('orders.urls')),
+    path('api/production/', include('production.urls')),
     path('api/products/', include('products.urls')),
+    path('api/suppliers/', include('suppliers.urls')),
 ]
 
 # Serve media files in development
@@ -0,0 +1,187 @@
+"""
+Orphaned media collection.
+
+``referenced_paths()`` streams every ``FileField`` and every ``JSONField``
+(image URL lists, colour images, avatar variants, ...) with ``.iterator()``
+and keeps an 8-byte digest of each referenced media path, so memory grows
+with the number of references rather than with path lengths.
+``orphaned_files()`` walks ``MEDIA_ROOT`` with ``os.scandir`` and yields
+files that are not referenced and older than the grace period.
+
+The walk can take a while, so ``remove_orphans()`` checks the candidates
+again before removing them: one pass over the JSON fields keeps only the
+candidates' digests, and each chunk of ``CHUNK_SIZE`` candidates is looked
+up with one ``IN`` query per ``FileField``. ``remove_orphan()`` then locks
+the file's ``Blob`` row (the lock ``ContentAddressedStorage`` takes to save
+or delete it) and re-reads the row's ``updated_at`` and the file's mtime.
+"""
+import hashlib
+import os
+import time
+from urllib.parse import unquote, urlparse
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+
+QUARANTINE_DIR = '.quarantine'
+CHUNK_SIZE = 2000
+
+
+def path_key(path):
+    return hashlib.blake2b(path.encode(), digest_size=8).digest()
+
+
+def media_path(value):
+    """Media-relative path for a stored name or media URL, or None."""
+    if not isinstance(value, str) or not value or len(value) > 1024:
+        return None
+    media_prefix = '/' + settings.MEDIA_URL.strip('/') + '/'
+    parsed = urlparse(value)
+    path = unquote(parsed.path)
+    if media_prefix in path:
+        return path.split(media_prefix, 1)[1]
+    if parsed.scheme or parsed.netloc or path.startswith('/'):
+        return None
+    # Plain storage names such as 'avatars/ab/abcd-256.jpg'
+    if '/' in path and os.path.splitext(path)[1]:
+        return path
+    return None
+
+
+def _json_strings(value):
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def media_fields():
+    """``(model, [file fields], [json fields])`` for every installed model."""
+    for model in apps.get_models():
+        file_fields = [f.attname for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+        json_fields = [f.attname for f in model._meta.concrete_fields if isinstance(f, models.JSONField)]
+        if file_fields or json_fields:
+            yield model, file_fields, json_fields
+
+
+def referenced_paths(within=None):
+    """
+    Set of ``path_key()`` digests of every media path referenced from the database.
+
+    With ``within`` (a set of digests) only JSON fields are read and only
+    those digests are kept; ``referenced_files()`` covers the file fields.
+    """
+    keys = set()
+    for model, file_fields, json_fields in media_fields():
+        if within is not None:
+            file_fields = []
+            if not json_fields:
+                continue
+        rows = model._default_manager.values_list(*file_fields, *json_fields).order_by()
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            for name in row[:len(file_fields)]:
+                if name:
+                    keys.add(path_key(name))
+            for value in row[len(file_fields):]:
+                for string in _json_strings(value):
+                    path = media_path(string)
+                    if path and (within is None or path_key(path) in within):
+                        keys.add(path_key(path))
+    return keys
+
+
+def referenced_files(relatives):
+    """The paths among ``relatives`` stored in any ``FileField``; one query per field."""
+    found = set()
+    for model, file_fields, _ in media_fields():
+        for field in file_fields:
+            found.update(
+                model._default_manager.filter(**{f'{field}__in': relatives}).values_list(field, flat=True).order_by()
+            )
+    return found
+
+
+def walk_files(root):
+    """Yield ``(relative path, DirEntry)`` for every file under ``root``, skipping the quarantine."""
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                relative = f'{relative_dir}/{entry.name}' if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if relative != QUARANTINE_DIR:
+                        stack.append(relative)
+                elif entry.is_file(follow_symlinks=False):
+                    yield relative, entry
+
+
+def orphaned_files(root, referenced, grace_seconds):
+    """Yield ``(relative path, size)`` of unreferenced files last modified before the grace period."""
+    cutoff = time.time() - grace_seconds
+    for relative, entry in walk_files(root):
+        if path_key(relative) in referenced:
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime < cutoff:
+            yield relative, stat.st_size
+
+
+def remove_orphan(root, relative, grace_seconds, quarantine=None):
+    """
+    Delete ``relative`` (or move it under ``quarantine``) unless it was saved
+    or modified within the grace period; returns whether it was removed.
+    Callers check that no row refers to the file (``remove_orphans()``).
+    """
+    from .models import Blob
+    from .storage import BLOB_PREFIX
+
+    cutoff = time.time() - grace_seconds
+    path = os.path.join(root, relative)
+    with transaction.atomic():
+        blob = None
+        if relative.startswith(BLOB_PREFIX):
+            blob = Blob.objects.select_for_update().filter(name=relative).first()
+            if blob is not None and blob.updated_at.timestamp() >= cutoff:
+                return False
+        try:
+            if os.stat(path).st_mtime >= cutoff:
+                return False
+        except FileNotFoundError:
+            return False
+
+        if quarantine:
+            target = os.path.join(quarantine, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        else:
+            os.remove(path)
+        if blob is not None:
+            blob.delete()
+    return True
+
+
+def remove_orphans(root, candidates, grace_seconds, quarantine=None):
+    """
+    Remove the ``(relative path, size)`` candidates from ``orphaned_files()``
+    that are still orphans; yields those removed.
+    """
+    candidates = list(candidates)
+    in_json = referenced_paths(within={path_key(relative) for relative, _ in candidates})
+    for start in range(0, len(candidates), CHUNK_SIZE):
+        chunk = [(relative, size) for relative, size in candidates[start:start + CHUNK_SIZE]
+                 if path_key(relative) not in in_json]
+        in_files = referenced_files([relative for relative, _ in chunk]) if chunk else set()
+        for relative, size in chunk:
+            if relative not in in_files and remove_orphan(root, relative, grace_seconds, quarantine):
+                yield relative, size
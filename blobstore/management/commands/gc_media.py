@@ -0,0 +1,52 @@
+"""
+Django management command to remove media files nothing refers to
+Usage: python manage.py gc_media [--grace-hours 24] [--quarantine] [--dry-run]
+
+Referenced paths are collected from every FileField and JSON URL field, then
+MEDIA_ROOT is walked and unreferenced files older than the grace period are
+deleted, or moved under MEDIA_ROOT/.quarantine/<date>/ with --quarantine.
+Candidates are checked again against the database in batches, and each file
+under its Blob row lock just before removal, so files saved or attached
+during the walk are kept.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blobstore.gc import QUARANTINE_DIR, orphaned_files, referenced_paths, remove_orphans
+
+
+class Command(BaseCommand):
+    help = 'Deletes or quarantines unreferenced media files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='Keep unreferenced files modified within this many hours (uploads not attached yet)',
+        )
+        parser.add_argument('--quarantine', action='store_true', help='Move files aside instead of deleting')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be removed')
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        referenced = referenced_paths()
+        self.stdout.write(f'{len(referenced)} referenced path(s)')
+
+        quarantine = os.path.join(root, QUARANTINE_DIR, timezone.localdate().isoformat())
+        count = size = 0
+        grace_seconds = options['grace_hours'] * 3600
+        orphans = orphaned_files(root, referenced, grace_seconds)
+        if not options['dry_run']:
+            orphans = remove_orphans(root, orphans, grace_seconds, quarantine if options['quarantine'] else None)
+        for relative, file_size in orphans:
+            if options['dry_run']:
+                self.stdout.write(f'  {relative}')
+            count += 1
+            size += file_size
+
+        action = 'Would remove' if options['dry_run'] else ('Quarantined' if options['quarantine'] else 'Removed')
+        self.stdout.write(self.style.SUCCESS(f'{action} {count} file(s), {size / 1024 / 1024:.1f} MB'))
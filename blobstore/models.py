@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    A stored file in the content-addressed media tree and how many saves refer to it
+    """
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name, e.g. blobs/ab/cd/abcd....pdf')
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Blob'
+        verbose_name_plural = 'Blobs'
+    
+    def __str__(self):
+        return f'{self.name} ({self.refcount} ref)'
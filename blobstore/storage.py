@@ -0,0 +1,127 @@
+"""
+Content-addressed media storage.
+
+``ContentAddressedStorage`` is a ``FileSystemStorage`` that ignores the
+requested file name and stores each upload under the SHA-256 of its bytes
+in a sharded tree, e.g. ``blobs/3f/a2/3fa2...e1.pdf`` (the extension is
+kept so files are served with the right content type). Uploads are hashed
+in 64 KB chunks while they are copied to a temporary file; if the blob is
+already stored the copy is dropped, so an identical upload costs no extra
+disk space, and the file's mtime and ``Blob.updated_at`` are refreshed so
+``gc_media`` treats it as a new upload. Every save adds a reference on its
+``Blob`` row and ``delete()`` removes the file only when the last reference
+goes away.
+
+Names outside ``blobs/`` (files written before this storage was enabled,
+or by code that names its own files) are handled like plain
+``FileSystemStorage`` files.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+CHUNK_SIZE = 64 * 1024
+_EXTENSION = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+def blob_name(digest, extension=''):
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def file_extension(name):
+    extension = os.path.splitext(name)[1].lower()
+    return extension if _EXTENSION.match(extension) else ''
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save()
+        return name
+
+    def _spool(self, content):
+        """Hash ``content`` while streaming it to disk; returns (digest, size, path, owned)."""
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'temporary_file_path'):
+            # Large uploads are already on disk: hash in place, move later
+            for chunk in content.chunks(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+            return digest.hexdigest(), size, content.temporary_file_path(), False
+
+        spool_dir = self.path(f'{BLOB_PREFIX}tmp')
+        os.makedirs(spool_dir, exist_ok=True)
+        handle, path = tempfile.mkstemp(dir=spool_dir)
+        with os.fdopen(handle, 'wb') as spool:
+            for chunk in content.chunks(CHUNK_SIZE):
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                size += len(chunk)
+                spool.write(chunk)
+        return digest.hexdigest(), size, path, True
+
+    def _save(self, name, content):
+        from .models import Blob
+
+        digest, size, source, owned = self._spool(content)
+        name = blob_name(digest, file_extension(name))
+        target = self.path(name)
+
+        with transaction.atomic():
+            blob, _ = Blob.objects.get_or_create(name=name, defaults={'sha256': digest, 'size': size})
+            # Lock the row so a concurrent delete() or gc_media cannot remove the file under us
+            if Blob.objects.select_for_update().filter(pk=blob.pk).first() is None:
+                # gc_media removed the blob between the two queries
+                blob = Blob.objects.create(name=name, sha256=digest, size=size)
+            if os.path.exists(target):
+                if owned:
+                    os.remove(source)
+                # A fresh mtime keeps gc_media's grace period from treating the reused file as stale
+                os.utime(target)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if self.directory_permissions_mode is not None:
+                    os.chmod(os.path.dirname(target), self.directory_permissions_mode)
+                if owned:
+                    os.replace(source, target)
+                else:
+                    file_move_safe(source, target)
+                if self.file_permissions_mode is not None:
+                    os.chmod(target, self.file_permissions_mode)
+            Blob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1, updated_at=timezone.now())
+        return name
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+        if not name.startswith(BLOB_PREFIX):
+            return super().delete(name)
+
+        from .models import Blob
+
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.refcount > 1:
+                Blob.objects.filter(pk=blob.pk).update(refcount=F('refcount') - 1)
+                return
+            if blob is not None:
+                blob.delete()
+            super().delete(name)
+
+    def references(self, name):
+        """Number of saves still referring to ``name`` (None for untracked files)."""
+        from .models import Blob
+
+        return Blob.objects.filter(name=name).values_list('refcount', flat=True).first()
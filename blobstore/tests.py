@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from leads.models import Lead
+from products.models import Product
+from .gc import QUARANTINE_DIR, remove_orphans
+from .models import Blob
+
+WEEK = 7 * 24 * 3600
+
+
+class BlobTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = storages.create_storage({'BACKEND': 'blobstore.storage.ContentAddressedStorage'})
+
+    def age(self, name, seconds=WEEK):
+        past = time.time() - seconds
+        os.utime(self.storage.path(name), (past, past))
+        Blob.objects.filter(name=name).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+
+class ContentAddressedStorageTests(BlobTestCase):
+    """Identical uploads share one file that lives until its last reference is deleted"""
+
+    def test_identical_uploads_share_a_blob(self):
+        first = self.storage.save('qc_reports/report.PDF', ContentFile(b'hello'))
+        second = self.storage.save('shipment/other.pdf', ContentFile(b'hello'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('blobs/') and first.endswith('.pdf'))
+        self.assertEqual(self.storage.references(first), 2)
+        self.assertEqual(os.listdir(self.storage.path('blobs/tmp')), [])
+
+        self.storage.delete(first)
+        self.assertTrue(self.storage.exists(first))
+        self.storage.delete(second)
+        self.assertFalse(self.storage.exists(first))
+        self.assertIsNone(self.storage.references(first))
+
+    def test_dedup_hit_refreshes_blob_age(self):
+        name = self.storage.save('documents/a.pdf', ContentFile(b'report'))
+        self.age(name)
+        self.storage.save('documents/b.pdf', ContentFile(b'report'))
+
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), time.time() - 60)
+        self.assertGreater(Blob.objects.get(name=name).updated_at, timezone.now() - timedelta(minutes=1))
+        self.gc()
+        self.assertTrue(self.storage.exists(name))
+
+
+class GcMediaTests(BlobTestCase):
+    """Unreferenced files past the grace period are removed, after a re-check under lock"""
+
+    def write(self, relative, age=WEEK):
+        path = os.path.join(self.media_root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as handle:
+            handle.write('x')
+        past = time.time() - age
+        os.utime(path, (past, past))
+        return path
+
+    def exists(self, relative):
+        return os.path.exists(os.path.join(self.media_root, relative))
+
+    def test_removes_only_old_unreferenced_files(self):
+        for relative in ['products/a.jpg', 'products/b.jpg', 'products/orphan.jpg', 'orphan.txt']:
+            self.write(relative)
+        self.write('products/new.jpg', age=60)
+        blob = self.storage.save('leads/ref.pdf', ContentFile(b'reference'))
+        orphan_blob = self.storage.save('leads/old.pdf', ContentFile(b'old'))
+        self.age(blob)
+        self.age(orphan_blob)
+        Product.objects.create(
+            name='Tee', description='Tee', category='Apparel', sub_category='Tops',
+            images=['http://localhost:8000/media/products/a.jpg'],
+            colors=[{'name': 'Red', 'image': '/media/products/b%2Ejpg'}],
+        )
+        Lead.objects.create(
+            name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts', reference_images=[blob]
+        )
+
+        out = self.gc('--dry-run')
+        self.assertIn('Would remove 3 file(s)', out)
+        self.assertTrue(self.exists('orphan.txt'))
+
+        self.assertIn('Removed 3 file(s)', self.gc())
+        for relative in ['products/a.jpg', 'products/b.jpg', 'products/new.jpg', blob]:
+            self.assertTrue(self.exists(relative), relative)
+        for relative in ['products/orphan.jpg', 'orphan.txt', orphan_blob]:
+            self.assertFalse(self.exists(relative), relative)
+        self.assertEqual(list(Blob.objects.values_list('name', flat=True)), [blob])
+
+    def test_quarantine_moves_files_aside(self):
+        self.write('products/orphan.jpg')
+        self.assertIn('Quarantined 1 file(s)', self.gc('--quarantine'))
+        quarantine = os.path.join(self.media_root, QUARANTINE_DIR, timezone.localdate().isoformat())
+        self.assertTrue(os.path.exists(os.path.join(quarantine, 'products/orphan.jpg')))
+        self.assertIn('Removed 0 file(s)', self.gc())
+
+    def test_recheck_keeps_files_claimed_during_the_walk(self):
+        # Candidates found by the walk that were saved or attached before removal
+        resaved = self.storage.save('documents/a.pdf', ContentFile(b'a'))
+        self.age(resaved)
+        Blob.objects.filter(name=resaved).update(updated_at=timezone.now())
+        attached = self.storage.save('documents/b.pdf', ContentFile(b'b'))
+        self.age(attached)
+        Lead.objects.create(
+            name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts',
+            reference_images=[f'/media/{attached}'],
+        )
+        avatar = self.write('avatars/old.jpg')
+        get_user_model().objects.create_user(email='a@example.com', username='a', password='x', avatar='avatars/old.jpg')
+        touched = self.write('products/touched.jpg')
+        os.utime(touched)
+
+        candidates = [resaved, attached, 'avatars/old.jpg', 'products/touched.jpg', 'products/missing.jpg']
+        removed = remove_orphans(self.media_root, [(relative, 1) for relative in candidates], WEEK / 2)
+        self.assertEqual(list(removed), [])
+        for relative in candidates:
+            self.assertEqual(self.exists(relative), relative != 'products/missing.jpg', relative)
+        self.assertEqual(Blob.objects.count(), 2)
+
+    def test_recheck_queries_do_not_grow_with_candidates(self):
+        def recheck_queries(count):
+            names = [f'products/{count}-{index}.jpg' for index in range(count)]
+            Product.objects.create(
+                name='Tee', description='Tee', category='Apparel', sub_category='Tops',
+                images=[f'/media/{name}' for name in names],
+            )
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(list(remove_orphans(self.media_root, [(name, 1) for name in names], 0)), [])
+            return len(queries)
+
+        self.assertEqual(recheck_queries(1), recheck_queries(25))
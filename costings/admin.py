@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import Costing
+from .models import Costing, Component, CostingComponent
+
+
+class CostingComponentInline(admin.TabularInline):
+    model = CostingComponent
+    extra = 1
+    autocomplete_fields = ['component']
 
 
 @admin.register(Costing)
@@ -7,14 +13,15 @@ class CostingAdmin(admin.ModelAdmin):
     list_display = ['style_name', 'style_number', 'exw_price', 'currency', 'created_by', 'created_at']
     list_filter = ['currency', 'created_at']
     search_fields = ['style_name', 'style_number']
-    readonly_fields = ['exw_price', 'total_price', 'created_at', 'updated_at']
+    readonly_fields = ['material_cost', 'exw_price', 'total_price', 'created_at', 'updated_at']
+    inlines = [CostingComponentInline]
     
     fieldsets = (
         ('Style Information', {
             'fields': ('style_name', 'style_number', 'lead')
         }),
         ('Cost Components', {
-            'fields': ('fabric_cost', 'fabric_consumption', 'trim_cost', 'cm_cost', 'packing_cost', 'overhead_cost')
+            'fields': ('fabric_cost', 'fabric_consumption', 'trim_cost', 'cm_cost', 'packing_cost', 'overhead_cost', 'material_cost')
         }),
         ('Pricing', {
             'fields': ('profit_margin', 'currency', 'exw_price', 'total_price')
@@ -24,3 +31,11 @@ class CostingAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(Component)
+class ComponentAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'type', 'unit', 'price', 'currency', 'supplier']
+    list_filter = ['type', 'currency']
+    search_fields = ['code', 'name']
+    readonly_fields = ['created_at', 'updated_at']
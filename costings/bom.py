@@ -0,0 +1,147 @@
+"""
+Bill-of-materials roll-up.
+
+``BomRollup`` loads the BOM lines of a set of costings in one query and
+computes each costing's material cost: the sum of component price times
+units per garment (wastage included), with component prices converted into
+the costing's currency at the current FX rates (``currencies.rates``).
+Rounding to cents happens once, on write, where material cost and the
+recomputed prices of every costing are stored with one ``bulk_update``.
+
+Only the costings involved are touched: a component price change reprices
+the costings that use that component, and BOM line edits reprice their
+costing once per transaction however many lines were saved.
+"""
+import threading
+from decimal import Decimal, ROUND_HALF_EVEN
+
+import numpy as np
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .engine import CENT, CostingBatch, to_decimals
+
+
+def effective_quantity(consumption, wastage):
+    """Component units per garment including the wastage allowance."""
+    return consumption * (1 + wastage / 100)
+
+
+class BomRollup:
+    def __init__(self, costing_ids):
+        from currencies.rates import UnknownCurrency, conversion_factor, get_rates
+
+        from .models import CostingComponent
+
+        self.costing_ids = set(costing_ids)
+        self.totals = dict.fromkeys(self.costing_ids, Decimal(0))
+        rates = None
+        for costing_id, price, currency, costing_currency, consumption, wastage in (
+            CostingComponent.objects.filter(costing_id__in=list(self.costing_ids)).values_list(
+                'costing_id', 'component__price', 'component__currency', 'costing__currency',
+                'consumption', 'wastage',
+            )
+        ):
+            if currency.upper() != costing_currency.upper():
+                rates = rates if rates is not None else get_rates()
+                try:
+                    price *= conversion_factor(currency, costing_currency, rates)
+                except UnknownCurrency as exc:
+                    raise UnknownCurrency(f'No FX rate for {exc.args[0]} to price costing {costing_id}') from None
+            self.totals[costing_id] += price * effective_quantity(consumption, wastage)
+
+    @classmethod
+    def for_components(cls, component_ids):
+        """Roll-up covering only the costings that use ``component_ids``."""
+        from .models import CostingComponent
+
+        return cls(
+            CostingComponent.objects.filter(component_id__in=list(component_ids))
+            .values_list('costing_id', flat=True)
+            .distinct()
+        )
+
+    def material_costs(self):
+        return {
+            costing_id: total.quantize(CENT, rounding=ROUND_HALF_EVEN) for costing_id, total in self.totals.items()
+        }
+
+    def save(self, batch_size=1000):
+        """Write material cost and recomputed prices; returns the number of costings."""
+        from .models import Costing
+
+        material = self.material_costs()
+        if not material:
+            return 0
+
+        batch = CostingBatch.from_queryset(Costing.objects.filter(pk__in=list(material)))
+        batch.material_cost = np.array(
+            [int(material[pk] * 100) for pk in batch.ids.tolist()], dtype=np.int64
+        )
+        prices = to_decimals(batch.exw_cents())
+
+        now = timezone.now()
+        objs = [
+            Costing(
+                pk=pk,
+                material_cost=material[pk],
+                exw_price=price,
+                total_price=price,
+                updated_at=now,
+            )
+            for pk, price in zip(batch.ids.tolist(), prices)
+        ]
+        Costing.objects.bulk_update(
+            objs, ['material_cost', 'exw_price', 'total_price', 'updated_at'], batch_size=batch_size
+        )
+        return len(objs)
+
+
+def refresh_costings(costing_ids):
+    """Recompute material cost and prices of the given costings from their BOM."""
+    with transaction.atomic():
+        return BomRollup(costing_ids).save()
+
+
+def refresh_costings_for_components(component_ids):
+    """Reprice the costings that use any of ``component_ids``."""
+    with transaction.atomic():
+        return BomRollup.for_components(component_ids).save()
+
+
+_pending = threading.local()
+
+
+def _refresh_pending(using):
+    pending = _pending.__dict__.get(using)
+    if pending:
+        costing_ids = set(pending)
+        pending.clear()
+        refresh_costings(costing_ids)
+
+
+def refresh_on_commit(costing_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Refresh ``costing_ids`` when the current transaction commits (at once
+    outside a transaction). Every costing changed in one transaction is
+    refreshed by the first callback to run; later ones find nothing left.
+    """
+    _pending.__dict__.setdefault(using, set()).update(costing_ids)
+    transaction.on_commit(lambda: _refresh_pending(using), using=using)
+
+
+def update_component_prices(new_prices):
+    """
+    Set ``{component_id: price}`` and reprice the costings that use them.
+
+    Returns the number of costings rewritten.
+    """
+    from .models import Component
+
+    with transaction.atomic():
+        now = timezone.now()
+        Component.objects.bulk_update(
+            [Component(pk=pk, price=Decimal(str(price)), updated_at=now) for pk, price in new_prices.items()],
+            ['price', 'updated_at'],
+        )
+        return BomRollup.for_components(new_prices).save()
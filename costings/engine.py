@@ -0,0 +1,207 @@
+"""
+Costing price engine.
+
+``calculate_exw_price`` is the single-row formula used by ``Costing.save``.
+``CostingBatch`` holds many costings as fixed-point int64 NumPy arrays
+(money in cents, consumption in hundredths, margin in hundredths of a
+percent) so repricing and margin scenarios run as a handful of vectorised
+integer operations. Results are rounded half-to-even to cents, which is
+what the database stores for the Decimal path, so both agree to the cent.
+"""
+from decimal import Decimal, ROUND_HALF_EVEN
+
+import numpy as np
+from django.utils import timezone
+
+CENT = Decimal('0.01')
+
+# Per-unit rates that scenarios may move by a percentage
+RATE_FIELDS = ('fabric_cost', 'trim_cost', 'cm_cost', 'packing_cost', 'overhead_cost')
+COMPONENT_FIELDS = RATE_FIELDS + ('fabric_consumption', 'profit_margin', 'material_cost')
+
+INT64_MAX = np.iinfo(np.int64).max
+
+# Rate changes are applied as factors in millionths, i.e. percentages are kept
+# to 1/10000 of a percent
+PCT_SCALE = 1000000
+
+
+def _decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value or 0))
+
+
+def calculate_exw_price(fabric_cost, fabric_consumption, trim_cost=0, cm_cost=0,
+                        packing_cost=0, overhead_cost=0, profit_margin=0, material_cost=0):
+    """EXW price per garment: base cost plus profit margin, rounded to cents."""
+    base_cost = (
+        _decimal(fabric_cost) * _decimal(fabric_consumption) +
+        _decimal(material_cost) +
+        _decimal(trim_cost) +
+        _decimal(cm_cost) +
+        _decimal(packing_cost) +
+        _decimal(overhead_cost)
+    )
+    price = base_cost + base_cost * (_decimal(profit_margin) / 100)
+    return price.quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+def round_div(numerator, denominator):
+    """Integer division rounded half to even, element-wise."""
+    # // and - also work on the object arrays used past the int64 range
+    quotient = numerator // denominator
+    remainder = numerator - quotient * denominator
+    twice = remainder * 2
+    bump = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + bump
+
+
+def _scaled(values, scale):
+    # 2-decimal DB values up to 1e12 survive the float round-trip exactly
+    return np.rint(np.asarray(values, dtype=np.float64) * scale).astype(np.int64)
+
+
+def to_decimals(cents):
+    """Convert an array of cents to a list of Decimals."""
+    return [Decimal(int(value)).scaleb(-2) for value in cents]
+
+
+class CostingBatch:
+    """
+    Cost components of many costings in fixed-point arrays.
+
+    Build one with ``from_queryset`` (one query) or ``from_rows``; every
+    method returns new arrays and never touches the database.
+    """
+
+    def __init__(self, ids, fabric_cost, fabric_consumption, trim_cost, cm_cost,
+                 packing_cost, overhead_cost, profit_margin, material_cost):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.fabric_cost = fabric_cost
+        self.fabric_consumption = fabric_consumption
+        self.trim_cost = trim_cost
+        self.cm_cost = cm_cost
+        self.packing_cost = packing_cost
+        self.overhead_cost = overhead_cost
+        self.profit_margin = profit_margin
+        self.material_cost = material_cost
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """``rows`` are ``(id, *COMPONENT_FIELDS)`` tuples with Decimal-like values."""
+        width = len(COMPONENT_FIELDS) + 1
+        for row in rows:
+            if len(row) != width:
+                raise ValueError(f'Expected rows of id + {", ".join(COMPONENT_FIELDS)}; got {len(row)} values')
+        columns = list(zip(*rows)) if rows else [[]] * width
+        ids, *values = columns
+        data = dict(zip(COMPONENT_FIELDS, values))
+        return cls(
+            ids,
+            **{field: _scaled(data[field], 100) for field in COMPONENT_FIELDS},
+        )
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls.from_rows(list(queryset.values_list('pk', *COMPONENT_FIELDS)))
+
+    def base_cost(self):
+        """Base cost per garment in 1/10000 of the currency unit."""
+        return (
+            self.fabric_cost * self.fabric_consumption +
+            (self.material_cost + self.trim_cost + self.cm_cost + self.packing_cost + self.overhead_cost) * 100
+        )
+
+    def with_rate_changes(self, deltas):
+        """
+        Return a copy with rates moved by percentages, e.g.
+        ``{'fabric_cost': 5, 'cm_cost': -2.5}``. New rates are rounded to cents.
+        """
+        changed = CostingBatch(self.ids, **{field: getattr(self, field) for field in COMPONENT_FIELDS})
+        for field, pct in (deltas or {}).items():
+            if field not in RATE_FIELDS:
+                raise ValueError(f'Unknown rate field: {field}')
+            factor = PCT_SCALE + int((_decimal(pct) * 10000).to_integral_value(rounding=ROUND_HALF_EVEN))
+            setattr(changed, field, round_div(getattr(self, field) * factor, PCT_SCALE))
+        return changed
+
+    def exw_cents(self, margins=None):
+        """
+        EXW price in cents.
+
+        With ``margins=None`` each costing uses its own margin and a 1-d array
+        is returned. Otherwise ``margins`` is a sequence of percentages and the
+        result has shape ``(len(self), len(margins))``.
+        """
+        base = self.base_cost()
+        if margins is None:
+            factor = 10000 + self.profit_margin
+        else:
+            factor = 10000 + _scaled([_decimal(m) for m in margins], 100)
+            base = base[:, np.newaxis]
+
+        if len(self) and int(np.abs(base).max()) > INT64_MAX // int(np.abs(factor).max() or 1):
+            # Fall back to Python integers instead of overflowing int64
+            base = base.astype(object)
+        return round_div(base * factor, 1000000)
+
+    def simulate(self, deltas=None, margins=None):
+        """
+        What-if pricing for rate ``deltas`` over a grid of ``margins``.
+
+        Returns a dict with the per-costing price matrix (cents) and totals per
+        margin, leaving the current prices untouched.
+        """
+        priced = self.with_rate_changes(deltas)
+        matrix = priced.exw_cents(margins)
+        if margins is None:
+            matrix = matrix[:, np.newaxis]
+        current = self.exw_cents()
+        return {
+            'ids': self.ids,
+            'margins': margins,
+            'exw_cents': matrix,
+            'total_cents': matrix.sum(axis=0),
+            'change_cents': (matrix - current[:, np.newaxis]).sum(axis=0),
+        }
+
+
+def reprice(queryset, deltas=None, margin=None, batch_size=1000):
+    """
+    Recompute and store prices for every costing in ``queryset``.
+
+    ``deltas`` moves rates by percentages (stored as the new rates) and
+    ``margin`` replaces every row's profit margin. Returns the number of rows
+    written with ``bulk_update``.
+    """
+    from .models import Costing
+
+    batch = CostingBatch.from_queryset(queryset)
+    if not len(batch):
+        return 0
+
+    priced = batch.with_rate_changes(deltas)
+    if margin is not None:
+        priced.profit_margin = np.full(len(priced), _scaled([_decimal(margin)], 100)[0])
+    prices = to_decimals(priced.exw_cents())
+
+    fields = ['exw_price', 'total_price', 'updated_at']
+    changed = list(deltas or {})
+    if margin is not None:
+        changed.append('profit_margin')
+    columns = {field: to_decimals(getattr(priced, field)) for field in changed}
+
+    now = timezone.now()
+    objs = []
+    for index, pk in enumerate(priced.ids.tolist()):
+        obj = Costing(pk=pk, exw_price=prices[index], total_price=prices[index], updated_at=now)
+        for field, values in columns.items():
+            setattr(obj, field, values[index])
+        objs.append(obj)
+
+    Costing.objects.bulk_update(objs, fields + changed, batch_size=batch_size)
+    return len(objs)
@@ -0,0 +1,67 @@
+"""
+Django management command to reprice costings in bulk
+Usage: python manage.py reprice_costings --fabric-pct 5 --cm-pct 3 [--margin 22] [--dry-run]
+
+Rate options move the stored rates by a percentage. With --dry-run (or
+--scenario-margins) nothing is written and a summary is printed instead.
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from costings.engine import CostingBatch, reprice
+from costings.models import Costing
+
+
+class Command(BaseCommand):
+    help = 'Reprices costings in bulk after rate or margin changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fabric-pct', type=Decimal, help='Change fabric cost by this percentage')
+        parser.add_argument('--trim-pct', type=Decimal, help='Change trim cost by this percentage')
+        parser.add_argument('--cm-pct', type=Decimal, help='Change CM cost by this percentage')
+        parser.add_argument('--packing-pct', type=Decimal, help='Change packing cost by this percentage')
+        parser.add_argument('--overhead-pct', type=Decimal, help='Change overhead cost by this percentage')
+        parser.add_argument('--margin', type=Decimal, help='Replace every profit margin with this percentage')
+        parser.add_argument(
+            '--scenario-margins',
+            type=Decimal,
+            nargs='+',
+            help='Print totals for each of these margins instead of writing',
+        )
+        parser.add_argument('--currency', help='Only costings in this currency')
+        parser.add_argument('--lead', type=int, help='Only costings for this lead id')
+        parser.add_argument('--dry-run', action='store_true', help='Print totals without writing')
+
+    def handle(self, *args, **options):
+        deltas = {
+            field: options[option]
+            for field, option in [
+                ('fabric_cost', 'fabric_pct'),
+                ('trim_cost', 'trim_pct'),
+                ('cm_cost', 'cm_pct'),
+                ('packing_cost', 'packing_pct'),
+                ('overhead_cost', 'overhead_pct'),
+            ]
+            if options[option] is not None
+        }
+
+        queryset = Costing.objects.all()
+        if options['currency']:
+            queryset = queryset.filter(currency=options['currency'].upper())
+        if options['lead']:
+            queryset = queryset.filter(lead_id=options['lead'])
+
+        if options['dry_run'] or options['scenario_margins']:
+            margins = options['scenario_margins'] or ([options['margin']] if options['margin'] is not None else None)
+            result = CostingBatch.from_queryset(queryset).simulate(deltas, margins)
+            for index, margin in enumerate(result['margins'] or ['current']):
+                total = Decimal(int(result['total_cents'][index])).scaleb(-2)
+                change = Decimal(int(result['change_cents'][index])).scaleb(-2)
+                self.stdout.write(f'Margin {margin}: total EXW {total} ({change:+} vs current)')
+            return
+
+        with transaction.atomic():
+            count = reprice(queryset, deltas=deltas, margin=options['margin'])
+        self.stdout.write(self.style.SUCCESS(f'Repriced {count} costings'))
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('costings', '0002_initial'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='costing',
+            name='material_cost',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Bill-of-materials cost per garment (rolled up from BOM lines)', max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='Component',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=50, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('type', models.CharField(choices=[('FABRIC', 'Fabric'), ('TRIM', 'Trim'), ('PACKING', 'Packing'), ('OTHER', 'Other')], max_length=10)),
+                ('unit', models.CharField(blank=True, help_text='e.g., meters, pieces, kg', max_length=20)),
+                ('price', models.DecimalField(decimal_places=4, help_text='Price per unit', max_digits=12)),
+                ('currency', models.CharField(default='USD', max_length=3)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='components', to='suppliers.supplier')),
+            ],
+            options={
+                'verbose_name': 'Component',
+                'verbose_name_plural': 'Components',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CostingComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumption', models.DecimalField(decimal_places=4, help_text='Units consumed per garment', max_digits=10)),
+                ('wastage', models.DecimalField(decimal_places=2, default=0, help_text='Wastage percentage', max_digits=5)),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='costing_lines', to='costings.component')),
+                ('costing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bom_lines', to='costings.costing')),
+            ],
+            options={
+                'verbose_name': 'BOM Line',
+                'verbose_name_plural': 'BOM Lines',
+                'constraints': [models.UniqueConstraint(fields=('costing', 'component'), name='unique_costing_component')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from .engine import calculate_exw_price
+
 
 class Costing(models.Model):
     """
@@ -18,6 +20,13 @@ class Costing(models.Model):
     cm_cost = models.DecimalField(max_digits=10, decimal_places=2, help_text='Cut & Make cost')
     packing_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     overhead_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    material_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text='Bill-of-materials cost per garment (rolled up from BOM lines)'
+    )
     
     # Pricing
     profit_margin = models.DecimalField(max_digits=5, decimal_places=2, default=20, help_text='Profit margin percentage')
@@ -41,19 +50,139 @@ class Costing(models.Model):
         verbose_name = 'Costing'
         verbose_name_plural = 'Costings'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_currency = instance.__dict__.get('currency')
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Auto-calculate prices before saving"""
-        base_cost = (
-            (self.fabric_cost * self.fabric_consumption) +
-            self.trim_cost +
-            self.cm_cost +
-            self.packing_cost +
-            self.overhead_cost
+        """Auto-calculate prices before saving; a currency change re-converts the BOM"""
+        currency_changed = self.pk is not None and self.currency != getattr(self, '_loaded_currency', self.currency)
+        self.exw_price = calculate_exw_price(
+            self.fabric_cost,
+            self.fabric_consumption,
+            self.trim_cost,
+            self.cm_cost,
+            self.packing_cost,
+            self.overhead_cost,
+            self.profit_margin,
+            self.material_cost,
         )
-        profit_amount = base_cost * (self.profit_margin / 100)
-        self.exw_price = base_cost + profit_amount
         self.total_price = self.exw_price
         super().save(*args, **kwargs)
+        self._loaded_currency = self.currency
+        
+        if currency_changed:
+            from .bom import refresh_on_commit
+            refresh_on_commit([self.pk], using=self._state.db)
     
     def __str__(self):
         return f'{self.style_name} - ${self.exw_price:.2f} EXW'
+
+
+class Component(models.Model):
+    """
+    Fabric/trim master shared across costings (bill of materials)
+    """
+    
+    TYPE_CHOICES = [
+        ('FABRIC', 'Fabric'),
+        ('TRIM', 'Trim'),
+        ('PACKING', 'Packing'),
+        ('OTHER', 'Other'),
+    ]
+    
+    code = models.CharField(max_length=50, unique=True)
+    name = models.CharField(max_length=255)
+    type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    unit = models.CharField(max_length=20, blank=True, help_text='e.g., meters, pieces, kg')
+    price = models.DecimalField(max_digits=12, decimal_places=4, help_text='Price per unit')
+    currency = models.CharField(max_length=3, default='USD')
+    supplier = models.ForeignKey(
+        'suppliers.Supplier',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='components'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['code']
+        verbose_name = 'Component'
+        verbose_name_plural = 'Components'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_price = instance.__dict__.get('price')
+        instance._loaded_currency = instance.__dict__.get('currency')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Reprice every costing using this component when its price or currency changes"""
+        price_changed = self.pk is not None and (
+            self.price != getattr(self, '_loaded_price', self.price)
+            or self.currency != getattr(self, '_loaded_currency', self.currency)
+        )
+        super().save(*args, **kwargs)
+        self._loaded_price = self.price
+        self._loaded_currency = self.currency
+        
+        if price_changed:
+            from .bom import refresh_costings_for_components
+            refresh_costings_for_components([self.pk])
+    
+    def __str__(self):
+        return f'{self.code} - {self.name}'
+
+
+class CostingComponent(models.Model):
+    """
+    Bill-of-materials line: how much of a component one garment consumes
+    """
+    costing = models.ForeignKey(Costing, on_delete=models.CASCADE, related_name='bom_lines')
+    component = models.ForeignKey(Component, on_delete=models.PROTECT, related_name='costing_lines')
+    
+    consumption = models.DecimalField(max_digits=10, decimal_places=4, help_text='Units consumed per garment')
+    wastage = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text='Wastage percentage')
+    
+    class Meta:
+        verbose_name = 'BOM Line'
+        verbose_name_plural = 'BOM Lines'
+        constraints = [
+            models.UniqueConstraint(fields=['costing', 'component'], name='unique_costing_component'),
+        ]
+    
+    def clean(self):
+        """Component prices must be convertible into the costing's currency"""
+        from django.core.exceptions import ValidationError
+        from currencies.rates import UnknownCurrency, conversion_factor
+
+        if self.costing_id and self.component_id and self.component.currency.upper() != self.costing.currency.upper():
+            try:
+                conversion_factor(self.component.currency, self.costing.currency)
+            except UnknownCurrency:
+                raise ValidationError(
+                    f'No FX rate to convert {self.component.currency} into {self.costing.currency}'
+                )
+    
+    def save(self, *args, **kwargs):
+        """Keep the costing's material cost in step with its BOM (once per transaction)"""
+        super().save(*args, **kwargs)
+        from .bom import refresh_on_commit
+        refresh_on_commit([self.costing_id], using=self._state.db)
+    
+    def delete(self, *args, **kwargs):
+        costing_id = self.costing_id
+        using = self._state.db
+        result = super().delete(*args, **kwargs)
+        from .bom import refresh_on_commit
+        refresh_on_commit([costing_id], using=using)
+        return result
+    
+    def __str__(self):
+        return f'{self.component.code} x {self.consumption}'
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+from .models import Costing
+
+
+class CostingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Costing
+        fields = [
+            'id', 'style_name', 'style_number', 'fabric_cost', 'fabric_consumption',
+            'trim_cost', 'cm_cost', 'packing_cost', 'overhead_cost', 'material_cost',
+            'profit_margin', 'currency', 'exw_price', 'total_price', 'notes', 'lead', 'created_by',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'material_cost', 'exw_price', 'total_price', 'created_by', 'created_at', 'updated_at'
+        ]
+
+    def validate_currency(self, value):
+        return value.upper()
+
+
+class CostingPreviewSerializer(serializers.Serializer):
+    """Cost components for a price preview; nothing is saved"""
+    fabric_cost = serializers.DecimalField(max_digits=10, decimal_places=2)
+    fabric_consumption = serializers.DecimalField(max_digits=8, decimal_places=2)
+    trim_cost = serializers.DecimalField(max_digits=10, decimal_places=2, default=0)
+    cm_cost = serializers.DecimalField(max_digits=10, decimal_places=2, default=0)
+    packing_cost = serializers.DecimalField(max_digits=10, decimal_places=2, default=0)
+    overhead_cost = serializers.DecimalField(max_digits=10, decimal_places=2, default=0)
+    material_cost = serializers.DecimalField(max_digits=10, decimal_places=2, default=0)
+    profit_margin = serializers.DecimalField(max_digits=5, decimal_places=2, default=20)
+    margins = serializers.ListField(
+        child=serializers.DecimalField(max_digits=5, decimal_places=2),
+        required=False,
+        max_length=50,
+        help_text='Optional extra margins to price in the same call',
+    )
@@ -1,3 +1,312 @@
-from django.test import TestCase
+import random
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from currencies.models import ExchangeRate
+from currencies.rates import UnknownCurrency, rate_cache
+
+from .bom import update_component_prices
+from .engine import CENT, COMPONENT_FIELDS, CostingBatch, calculate_exw_price, to_decimals
+from .models import Component, Costing, CostingComponent
+
+
+def random_row(rng, pk):
+    money = lambda: Decimal(rng.randint(0, 999999)).scaleb(-2)
+    return pk, {
+        'fabric_cost': money(), 'fabric_consumption': Decimal(rng.randint(0, 500)).scaleb(-2),
+        'trim_cost': money(), 'cm_cost': money(), 'packing_cost': money(), 'overhead_cost': money(),
+        'profit_margin': Decimal(rng.randint(0, 9999)).scaleb(-2), 'material_cost': money(),
+    }
+
+
+def as_rows(rows):
+    return [(pk, *(values[field] for field in COMPONENT_FIELDS)) for pk, values in rows]
+
+
+def exw(values):
+    return calculate_exw_price(
+        values['fabric_cost'], values['fabric_consumption'], values['trim_cost'], values['cm_cost'],
+        values['packing_cost'], values['overhead_cost'], values['profit_margin'], values['material_cost'],
+    )
+
+
+class CostingEngineTests(SimpleTestCase):
+    """The fixed-point batch engine agrees to the cent with the Decimal formula"""
+
+    def setUp(self):
+        rng = random.Random(29)
+        self.rows = [random_row(rng, pk) for pk in range(1, 2001)]
+        self.batch = CostingBatch.from_rows(as_rows(self.rows))
+
+    def test_exw_matches_decimal_formula(self):
+        self.assertEqual(to_decimals(self.batch.exw_cents()), [exw(values) for _, values in self.rows])
+
+    def test_margin_grid(self):
+        margins = [Decimal('10'), Decimal('17.5')]
+        grid = self.batch.exw_cents(margins)
+        self.assertEqual(grid.shape, (len(self.rows), 2))
+        for column, margin in enumerate(margins):
+            expected = [exw({**values, 'profit_margin': margin}) for _, values in self.rows]
+            self.assertEqual(to_decimals(grid[:, column]), expected)
+
+    def test_rate_changes_keep_fractional_percentages(self):
+        for pct in ['5', '-2.5', '0.29', '2.555', '-2.555', '33.3333']:
+            changed = self.batch.with_rate_changes({'fabric_cost': pct, 'cm_cost': pct})
+            factor = 1 + Decimal(pct) / 100
+            for field in ['fabric_cost', 'cm_cost']:
+                expected = [
+                    (values[field] * factor).quantize(CENT, rounding=ROUND_HALF_EVEN) for _, values in self.rows
+                ]
+                self.assertEqual(to_decimals(getattr(changed, field)), expected, (pct, field))
+            self.assertIs(changed.trim_cost, self.batch.trim_cost)
+
+    def test_unknown_rate_field(self):
+        with self.assertRaises(ValueError):
+            self.batch.with_rate_changes({'profit_margin': 5})
+
+    def test_rows_must_match_component_fields(self):
+        rows = as_rows(self.rows[:2])
+        self.assertEqual(len(CostingBatch.from_rows(rows).ids), 2)
+        with self.assertRaises(ValueError):
+            CostingBatch.from_rows([row[:-1] for row in rows])
+
+    def test_large_values_do_not_overflow(self):
+        values = dict(self.rows[0][1], fabric_cost=Decimal('99999999.99'), fabric_consumption=Decimal('999999.99'))
+        batch = CostingBatch.from_rows(as_rows([(1, values)]))
+        self.assertEqual(to_decimals(batch.exw_cents([Decimal('99.99')])[:, 0]), [exw(dict(values, profit_margin=Decimal('99.99')))])
+
+    def test_simulate_leaves_prices_alone(self):
+        result = self.batch.simulate({'fabric_cost': 5}, [10, 20])
+        self.assertEqual(result['exw_cents'].shape, (len(self.rows), 2))
+        self.assertEqual(list(result['total_cents']), list(result['exw_cents'].sum(axis=0)))
+        self.assertEqual(to_decimals(self.batch.exw_cents()), [exw(values) for _, values in self.rows])
+
+
+class RepriceCommandTests(TestCase):
+    def setUp(self):
+        for index in range(5):
+            Costing.objects.create(
+                style_name=f'Style {index}', fabric_cost=Decimal('3.33'), fabric_consumption=Decimal('1.7'),
+                cm_cost=Decimal('2.10'), trim_cost=Decimal('0.45'),
+            )
+
+    def test_reprice_writes_rates_and_prices(self):
+        call_command('reprice_costings', '--fabric-pct', '2.555', '--margin', '15', stdout=StringIO())
+        for costing in Costing.objects.all():
+            self.assertEqual(costing.fabric_cost, Decimal('3.42'))
+            self.assertEqual(costing.profit_margin, Decimal('15.00'))
+            self.assertEqual(costing.exw_price, calculate_exw_price(
+                costing.fabric_cost, costing.fabric_consumption, costing.trim_cost, costing.cm_cost,
+                costing.packing_cost, costing.overhead_cost, costing.profit_margin, costing.material_cost,
+            ))
+
+    def test_scenarios_do_not_write(self):
+        before = list(Costing.objects.values_list('exw_price', flat=True))
+        out = StringIO()
+        call_command('reprice_costings', '--fabric-pct', '5', '--scenario-margins', '10', '20', stdout=out)
+        self.assertIn('Margin 10', out.getvalue())
+        self.assertEqual(list(Costing.objects.values_list('exw_price', flat=True)), before)
+
+
+class CostingApiTests(TestCase):
+    """Batch create/update in one transaction and query-free previews"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = get_user_model().objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def item(self, index, **values):
+        return {'style_name': f'Style {index}', 'fabric_cost': '3.33', 'fabric_consumption': '1.7',
+                'cm_cost': '2.10', 'currency': 'usd', **values}
+
+    def test_batch_create_and_update(self):
+        # savepoint, bulk insert, release
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/costings/batch/', [self.item(i) for i in range(3)], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 3)
+        costing = Costing.objects.get(style_name='Style 0')
+        self.assertEqual((costing.currency, costing.exw_price), ('USD', Decimal('9.31')))
+
+        response = self.client.post(
+            '/api/costings/batch/', {'items': [{'id': str(costing.pk), 'profit_margin': '30'}]}, format='json'
+        )
+        self.assertEqual((response.status_code, response.json()['updated']), (200, 1))
+        costing.refresh_from_db()
+        self.assertEqual((costing.profit_margin, costing.exw_price), (Decimal('30.00'), Decimal('10.09')))
+
+    def test_batch_reports_item_errors_without_saving(self):
+        costing = Costing.objects.create(style_name='Old', fabric_cost=1, fabric_consumption=1, cm_cost=1)
+        response = self.client.post('/api/costings/batch/', [
+            self.item(1),
+            {'id': 'abc', 'profit_margin': '30'},
+            {'id': 999999, 'profit_margin': '30'},
+            {'id': costing.pk, 'profit_margin': 'lots'},
+            'not an object',
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {})
+        self.assertEqual(errors[1], {'id': ['A valid integer is required']})
+        self.assertEqual(errors[2], {'id': ['Costing not found']})
+        self.assertIn('profit_margin', errors[3])
+        self.assertIn('non_field_errors', errors[4])
+        self.assertEqual(Costing.objects.count(), 1)
+
+    def test_batch_rejects_repeated_ids(self):
+        costing = Costing.objects.create(style_name='Old', fabric_cost=1, fabric_consumption=1, cm_cost=1)
+        response = self.client.post('/api/costings/batch/', [
+            {'id': costing.pk, 'profit_margin': '30'},
+            {'id': str(costing.pk), 'style_name': 'Renamed'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{}, {'id': ['Costing appears more than once in the batch']}])
+        costing.refresh_from_db()
+        self.assertEqual(costing.style_name, 'Old')
+
+    def test_batch_limits(self):
+        self.assertEqual(self.client.post('/api/costings/batch/', [], format='json').status_code, 400)
+        buyer = get_user_model().objects.create_user(
+            email='buyer@example.com', username='buyer', first_name='Buyer', password='x', role='BUYER'
+        )
+        self.client.force_authenticate(buyer)
+        self.assertEqual(self.client.post('/api/costings/batch/', [self.item(1)], format='json').status_code, 403)
+
+    def test_preview_prices_margins_without_queries(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.seller).access_token}')
+        with self.assertNumQueries(0):
+            response = client.post('/api/costings/preview/', {
+                'fabric_cost': '3.33', 'fabric_consumption': '1.7', 'cm_cost': '2.10', 'margins': ['10', '25'],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['exw_price'], data['base_cost']), ('9.31', '7.76'))
+        self.assertEqual([row['exw_price'] for row in data['scenarios']], ['8.54', '9.70'])
+        self.assertEqual(Costing.objects.count(), 0)
+
+    def test_preview_validates_input(self):
+        response = self.client.post('/api/costings/preview/', {'fabric_cost': 'x'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BomRollupTests(TestCase):
+    """Material cost follows the BOM, in the costing's currency"""
+
+    def setUp(self):
+        rate_cache.clear()
+        self.addCleanup(rate_cache.clear)
+        self.fabric = Component.objects.create(code='F1', name='Jersey', type='FABRIC', unit='m', price=Decimal('2.50'))
+        self.button = Component.objects.create(code='T1', name='Button', type='TRIM', price=Decimal('0.10'))
+        self.shirt = Costing.objects.create(
+            style_name='Shirt', fabric_cost=Decimal('2.00'), fabric_consumption=Decimal('1'), cm_cost=Decimal('1.00')
+        )
+        self.polo = Costing.objects.create(
+            style_name='Polo', fabric_cost=Decimal('2.00'), fabric_consumption=Decimal('1'), cm_cost=Decimal('1.00')
+        )
+        self.other = Costing.objects.create(
+            style_name='Other', fabric_cost=Decimal('2.00'), fabric_consumption=Decimal('1'), cm_cost=Decimal('1.00')
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            CostingComponent.objects.create(
+                costing=self.shirt, component=self.fabric, consumption=Decimal('1.2'), wastage=Decimal('5')
+            )
+            CostingComponent.objects.create(costing=self.shirt, component=self.button, consumption=Decimal('6'))
+            CostingComponent.objects.create(costing=self.polo, component=self.fabric, consumption=Decimal('1'))
+
+    def price(self, costing):
+        costing.refresh_from_db()
+        return costing.material_cost, costing.exw_price
+
+    def expected(self, costing):
+        costing.refresh_from_db()
+        return calculate_exw_price(
+            costing.fabric_cost, costing.fabric_consumption, costing.trim_cost, costing.cm_cost,
+            costing.packing_cost, costing.overhead_cost, costing.profit_margin, costing.material_cost,
+        )
+
+    def test_material_cost_includes_wastage(self):
+        # 2.50 * 1.2 * 1.05 + 0.10 * 6
+        self.assertEqual(self.price(self.shirt)[0], Decimal('3.75'))
+        self.assertEqual(self.price(self.polo)[0], Decimal('2.50'))
+        self.assertEqual(self.shirt.exw_price, self.expected(self.shirt))
+
+    def test_price_update_reprices_dependent_costings_only(self):
+        untouched = Costing.objects.get(pk=self.other.pk).updated_at
+        self.assertEqual(update_component_prices({self.button.pk: Decimal('0.20')}), 1)
+        self.assertEqual(self.price(self.shirt)[0], Decimal('4.35'))
+        self.assertEqual(self.price(self.polo)[0], Decimal('2.50'))
+        self.assertEqual(Costing.objects.get(pk=self.other.pk).updated_at, untouched)
+
+    def test_component_prices_are_converted(self):
+        ExchangeRate.objects.create(currency='INR', rate_date=date(2020, 1, 1), rate=Decimal('80'))
+        self.button.currency = 'INR'
+        self.button.price = Decimal('8')
+        self.button.save()
+        # 3.15 fabric + 8 INR / 80 * 6
+        self.assertEqual(self.price(self.shirt)[0], Decimal('3.75'))
+        self.polo.currency = 'INR'
+        self.polo.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            CostingComponent.objects.create(costing=self.polo, component=self.button, consumption=Decimal('1'))
+        self.assertEqual(self.price(self.polo)[0], Decimal('208.00'))
+
+    def test_costing_currency_change_converts_material_cost(self):
+        ExchangeRate.objects.create(currency='INR', rate_date=date(2020, 1, 1), rate=Decimal('80'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.polo.currency = 'INR'
+            self.polo.save()
+        self.assertEqual(self.price(self.polo)[0], Decimal('200.00'))
+
+        seller = get_user_model().objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        client = APIClient()
+        client.force_authenticate(seller)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/costings/batch/', [{'id': self.shirt.pk, 'currency': 'inr'}], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.price(self.shirt), (Decimal('300.00'), self.expected(self.shirt)))
+
+    def test_mixed_currency_without_rate_is_rejected(self):
+        euro = Component.objects.create(code='T2', name='Zip', type='TRIM', price=Decimal('1'), currency='EUR')
+        line = CostingComponent(costing=self.other, component=euro, consumption=Decimal('1'))
+        with self.assertRaises(ValidationError):
+            line.full_clean()
+        with self.assertRaises(UnknownCurrency):
+            with self.captureOnCommitCallbacks(execute=True):
+                line.save()
+
+    def test_lines_refresh_costing_once_per_transaction(self):
+        zips = [
+            Component.objects.create(code=f'Z{index}', name='Zip', type='TRIM', price=Decimal('0.50'))
+            for index in range(5)
+        ]
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for component in zips:
+                    CostingComponent.objects.create(costing=self.other, component=component, consumption=Decimal('1'))
+        # the first callback refreshes the costing, the rest find nothing pending:
+        # one costing read, one BOM read and the bulk update inside a savepoint
+        with self.assertNumQueries(5):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(self.price(self.other)[0], Decimal('2.50'))
@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import CostingViewSet
+
+router = DefaultRouter()
+router.register(r'', CostingViewSet, basename='costing')
+
+urlpatterns = router.urls
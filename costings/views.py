@@ -1,3 +1,176 @@
-from django.shortcuts import render
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 
-# Create your views here.
+from .bom import refresh_on_commit
+from .engine import COMPONENT_FIELDS, CostingBatch, calculate_exw_price, to_decimals
+from .models import Costing
+from .serializers import CostingSerializer, CostingPreviewSerializer
+
+MAX_BATCH_SIZE = 500
+INVALID_ID = object()
+
+
+def batch_item_pk(item):
+    """Costing pk of a batch item, None for a new costing or INVALID_ID."""
+    value = item.get('id') if isinstance(item, dict) else None
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return INVALID_ID
+    try:
+        pk = int(value)
+    except (TypeError, ValueError):
+        return INVALID_ID
+    return pk if pk > 0 and str(pk) == str(value).strip() else INVALID_ID
+
+
+class CostingViewSet(viewsets.ModelViewSet):
+    """
+    Costing sheets
+    - List/Retrieve/Create/Update/Delete: SELLER/ADMIN only
+    - batch: create and update many costings in one transaction
+    - preview: price calculation for any authenticated user, nothing is saved
+    """
+    serializer_class = CostingSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['lead', 'style_number', 'currency']
+    search_fields = ['style_name', 'style_number']
+    ordering_fields = ['created_at', 'updated_at', 'style_name', 'exw_price']
+
+    def get_queryset(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() in ['SELLER', 'ADMIN']:
+            return Costing.objects.all()
+        return Costing.objects.none()
+
+    def check_write_role(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() not in ['SELLER', 'ADMIN']:
+            raise PermissionDenied(detail='Only seller or admin users can manage costings')
+
+    def perform_create(self, serializer):
+        self.check_write_role()
+        serializer.save(created_by=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Create (no `id`) or update (with `id`) up to MAX_BATCH_SIZE costings.
+
+        Expects a JSON list of costing objects, or {'items': [...]}. Prices are
+        computed for the whole batch at once and written with bulk_create /
+        bulk_update inside a single transaction; nothing is saved if any item
+        is invalid.
+        """
+        self.check_write_role()
+
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'success': False, 'error': 'Expected a non-empty list of costings'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response({'success': False, 'error': f'At most {MAX_BATCH_SIZE} costings per batch'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        pks = [batch_item_pk(item) for item in items]
+        existing = Costing.objects.in_bulk([pk for pk in pks if isinstance(pk, int)])
+
+        errors = []
+        objs = []
+        seen = set()
+        for item, pk in zip(items, pks):
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ['Expected an object']})
+                continue
+            if pk is INVALID_ID:
+                errors.append({'id': ['A valid integer is required']})
+                continue
+            instance = None
+            if pk is not None:
+                if pk in seen:
+                    errors.append({'id': ['Costing appears more than once in the batch']})
+                    continue
+                seen.add(pk)
+                instance = existing.get(pk)
+                if instance is None:
+                    errors.append({'id': ['Costing not found']})
+                    continue
+            serializer = CostingSerializer(instance, data=item, partial=instance is not None)
+            if not serializer.is_valid():
+                errors.append(serializer.errors)
+                continue
+            errors.append({})
+            obj = instance or Costing(created_by=request.user)
+            for attr, value in serializer.validated_data.items():
+                setattr(obj, attr, value)
+            objs.append(obj)
+
+        if any(errors):
+            return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = [(obj.pk or 0, *(getattr(obj, field) for field in COMPONENT_FIELDS)) for obj in objs]
+        prices = to_decimals(CostingBatch.from_rows(rows).exw_cents())
+        now = timezone.now()
+        for obj, price in zip(objs, prices):
+            obj.exw_price = obj.total_price = price
+            obj.updated_at = now
+
+        to_create = [obj for obj in objs if obj.pk is None]
+        to_update = [obj for obj in objs if obj.pk is not None]
+        writable = [
+            name for name, field in CostingSerializer().fields.items()
+            if not field.read_only
+        ]
+        with transaction.atomic():
+            Costing.objects.bulk_create(to_create)
+            if to_update:
+                Costing.objects.bulk_update(to_update, writable + ['exw_price', 'total_price', 'updated_at'])
+            # Material cost is in the costing's currency; convert the BOM again
+            currency_changed = [obj.pk for obj in to_update if obj.currency != obj._loaded_currency]
+            if currency_changed:
+                refresh_on_commit(currency_changed)
+
+        return Response({
+            'success': True,
+            'created': len(to_create),
+            'updated': len(to_update),
+            'data': CostingSerializer(objs, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        authentication_classes=[JWTStatelessUserAuthentication],
+    )
+    def preview(self, request):
+        """Calculate the EXW price for the given components without saving.
+
+        Authenticates from the token alone, so a preview costs no database
+        queries. Pass `margins` to price several margins in one call.
+        """
+        serializer = CostingPreviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        components = {field: data[field] for field in COMPONENT_FIELDS}
+        exw_price = str(calculate_exw_price(**components))
+        response = {
+            'success': True,
+            'exw_price': exw_price,
+            'total_price': exw_price,
+            'base_cost': str(calculate_exw_price(**{**components, 'profit_margin': 0})),
+        }
+        if data.get('margins'):
+            response['scenarios'] = [
+                {
+                    'profit_margin': str(margin),
+                    'exw_price': str(calculate_exw_price(**{**components, 'profit_margin': margin})),
+                }
+                for margin in data['margins']
+            ]
+        return Response(response, status=status.HTTP_200_OK)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ExchangeRate
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'rate_date', 'rate', 'source']
+    list_filter = ['currency', 'rate_date']
+    search_fields = ['currency']
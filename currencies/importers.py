@@ -0,0 +1,100 @@
+"""
+Pluggable FX rate importers.
+
+An importer returns ``(rate_date, {currency: Decimal rate})`` with rates
+expressed per one unit of FX_BASE_CURRENCY. The class is chosen with the
+FX_RATE_IMPORTER setting. Both built-in importers read the same JSON shape::
+
+    {"base": "USD", "date": "2026-04-01", "rates": {"INR": "83.12", "EUR": "0.92"}}
+
+CSV files with ``currency,rate`` rows (and an optional ``date`` column) are
+also accepted by the file importer.
+"""
+import csv
+import json
+import urllib.request
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .rates import base_currency
+
+
+class RateImportError(Exception):
+    pass
+
+
+class RateImporter:
+    source = ''
+
+    def fetch(self, rate_date=None):
+        raise NotImplementedError('.fetch() must be overridden')
+
+    def parse_payload(self, payload, rate_date=None):
+        base = (payload.get('base') or base_currency()).upper()
+        rates = {code.upper(): Decimal(str(value)) for code, value in payload.get('rates', {}).items()}
+        if base != base_currency():
+            # Rebase so every stored rate is per unit of FX_BASE_CURRENCY
+            if base_currency() not in rates:
+                raise RateImportError(f'Cannot rebase {base} rates to {base_currency()}')
+            pivot = rates[base_currency()]
+            rates = {code: value / pivot for code, value in rates.items()}
+            rates[base] = 1 / pivot
+        rates.pop(base_currency(), None)
+        day = rate_date or (date.fromisoformat(payload['date']) if payload.get('date') else timezone.localdate())
+        return day, rates
+
+
+class FileRateImporter(RateImporter):
+    """Reads rates from FX_RATE_FILE (JSON or CSV); used in tests and offline setups."""
+
+    def __init__(self, path=None):
+        self.path = Path(path or getattr(settings, 'FX_RATE_FILE', ''))
+        self.source = f'file:{self.path.name}'
+
+    def fetch(self, rate_date=None):
+        if not self.path.is_file():
+            raise RateImportError(f'Rate file not found: {self.path}')
+
+        if self.path.suffix.lower() == '.csv':
+            with self.path.open(newline='') as handle:
+                rows = list(csv.DictReader(handle))
+            dates = {row['date'] for row in rows if row.get('date')}
+            payload = {
+                'rates': {row['currency']: row['rate'] for row in rows},
+                'date': dates.pop() if len(dates) == 1 else None,
+            }
+        else:
+            with self.path.open() as handle:
+                payload = json.load(handle)
+        return self.parse_payload(payload, rate_date)
+
+
+class UrlRateImporter(RateImporter):
+    """Fetches the JSON payload from FX_RATE_URL (``{date}`` is substituted)."""
+
+    timeout = 10
+
+    def __init__(self, url=None):
+        self.url = url or getattr(settings, 'FX_RATE_URL', '')
+        self.source = 'url'
+
+    def fetch(self, rate_date=None):
+        if not self.url:
+            raise RateImportError('FX_RATE_URL is not configured')
+        day = rate_date or timezone.localdate()
+        try:
+            with urllib.request.urlopen(self.url.format(date=day.isoformat()), timeout=self.timeout) as response:
+                payload = json.load(response)
+        except (OSError, ValueError) as exc:
+            raise RateImportError(f'Unable to fetch rates: {exc}') from exc
+        return self.parse_payload(payload, rate_date)
+
+
+def get_importer(**kwargs):
+    path = getattr(settings, 'FX_RATE_IMPORTER', 'currencies.importers.FileRateImporter')
+    return import_string(path)(**kwargs)
@@ -0,0 +1,39 @@
+"""
+Django management command to import a daily FX rate snapshot
+Usage: python manage.py import_fx_rates [--date 2026-04-01] [--file rates.json]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from currencies.importers import FileRateImporter, RateImportError, get_importer
+from currencies.models import ExchangeRate
+from currencies.rates import bump_rates_version
+
+
+class Command(BaseCommand):
+    help = 'Imports FX rates through the configured importer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Snapshot date (defaults to the payload date or today)')
+        parser.add_argument('--file', help='Read rates from this JSON/CSV file instead of the configured importer')
+
+    def handle(self, *args, **options):
+        importer = FileRateImporter(options['file']) if options['file'] else get_importer()
+        try:
+            rate_date, rates = importer.fetch(options['date'])
+        except RateImportError as exc:
+            raise CommandError(str(exc))
+
+        ExchangeRate.objects.bulk_create(
+            [
+                ExchangeRate(currency=currency, rate_date=rate_date, rate=rate, source=importer.source)
+                for currency, rate in rates.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['currency', 'rate_date'],
+            update_fields=['rate', 'source', 'updated_at'],
+        )
+        # bulk_create sends no post_save signals
+        bump_rates_version()
+        self.stdout.write(self.style.SUCCESS(f'Imported {len(rates)} rates for {rate_date}'))
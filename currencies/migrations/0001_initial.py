@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('rate_date', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=8, max_digits=18)),
+                ('source', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Exchange Rate',
+                'verbose_name_plural': 'Exchange Rates',
+                'ordering': ['-rate_date', 'currency'],
+                'indexes': [models.Index(fields=['rate_date', 'currency'], name='currencies_rate_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('currency', 'rate_date'), name='unique_currency_rate_date')],
+            },
+        ),
+    ]
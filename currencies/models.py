@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class ExchangeRate(models.Model):
+    """
+    Daily FX snapshot: units of `currency` per one unit of FX_BASE_CURRENCY
+    """
+    currency = models.CharField(max_length=3)
+    rate_date = models.DateField()
+    rate = models.DecimalField(max_digits=18, decimal_places=8)
+    source = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-rate_date', 'currency']
+        verbose_name = 'Exchange Rate'
+        verbose_name_plural = 'Exchange Rates'
+        constraints = [
+            models.UniqueConstraint(fields=['currency', 'rate_date'], name='unique_currency_rate_date'),
+        ]
+        indexes = [
+            models.Index(fields=['rate_date', 'currency'], name='currencies_rate_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.currency} {self.rate} ({self.rate_date})'
@@ -0,0 +1,142 @@
+"""
+FX rate lookup and conversion.
+
+Rates are loaded from ``ExchangeRate`` (the latest snapshot on or before
+today for every currency) and kept in memory per process. The table is
+reloaded when the date changes or when the rates version changes: a number
+kept in the ``FX_RATE_CACHE`` cache and bumped whenever rates are written
+(``ExchangeRate`` save/delete signals and ``import_fx_rates``), so a lookup
+costs one cache read and no query. With a cache that is not shared between
+processes, other processes pick up new rates after ``RateCache.max_age``.
+``converted()`` turns those rates into a ``CASE`` expression so conversions
+and aggregates over mixed-currency rows run inside a single SQL query.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Max, Q, Value, When
+from django.utils import timezone
+
+from .models import ExchangeRate
+
+
+class UnknownCurrency(KeyError):
+    pass
+
+
+def base_currency():
+    return getattr(settings, 'FX_BASE_CURRENCY', 'USD').upper()
+
+
+def load_rates(day=None):
+    """Latest rate on or before ``day`` for every currency: ``{code: Decimal}``."""
+    day = day or timezone.localdate()
+    latest = dict(
+        ExchangeRate.objects.filter(rate_date__lte=day)
+        .values_list('currency')
+        .annotate(latest=Max('rate_date'))
+    )
+    rates = {base_currency(): Decimal(1)}
+    if latest:
+        condition = Q()
+        for currency, rate_date in latest.items():
+            condition |= Q(currency=currency, rate_date=rate_date)
+        rates.update(ExchangeRate.objects.filter(condition).values_list('currency', 'rate'))
+    return rates
+
+
+VERSION_KEY = 'fx-rates:version'
+
+
+def version_cache():
+    return caches[getattr(settings, 'FX_RATE_CACHE', 'default')]
+
+
+def rates_version():
+    """Changes whenever a rate is imported, edited or deleted."""
+    # An evicted version is re-seeded with a value no earlier version can have had
+    return version_cache().get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def bump_rates_version():
+    """Make every process reload its rates; call after writing ``ExchangeRate`` rows."""
+    cache = version_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+class RateCache:
+    """Per-process rate table, reloaded when the local date or the rates version change."""
+
+    # Seconds after which rates are reloaded even if the version looks unchanged
+    max_age = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._loaded_at = 0.0
+        self._rates = {}
+
+    def get(self):
+        key = (timezone.localdate(), rates_version())
+        if self._key != key or time.monotonic() - self._loaded_at > self.max_age:
+            with self._lock:
+                if self._key != key or time.monotonic() - self._loaded_at > self.max_age:
+                    self._rates = load_rates(key[0])
+                    self._key = key
+                    self._loaded_at = time.monotonic()
+        return self._rates
+
+    def clear(self):
+        with self._lock:
+            self._key = None
+            self._rates = {}
+
+
+rate_cache = RateCache()
+
+
+def get_rates():
+    return rate_cache.get()
+
+
+def conversion_factor(from_currency, to_currency, rates=None):
+    """Multiplier converting an amount in ``from_currency`` to ``to_currency``."""
+    rates = rates if rates is not None else get_rates()
+    from_currency, to_currency = from_currency.upper(), to_currency.upper()
+    try:
+        return rates[to_currency] / rates[from_currency]
+    except KeyError as exc:
+        raise UnknownCurrency(exc.args[0]) from None
+
+
+def convert(amount, from_currency, to_currency, rates=None):
+    return Decimal(amount) * conversion_factor(from_currency, to_currency, rates)
+
+
+def converted(amount_field, to_currency, currency_field='currency', rates=None):
+    """
+    Expression converting ``amount_field`` into ``to_currency`` based on each
+    row's ``currency_field``. Rows in currencies without a rate become NULL.
+    """
+    rates = rates if rates is not None else get_rates()
+    to_currency = to_currency.upper()
+    if to_currency not in rates:
+        raise UnknownCurrency(to_currency)
+
+    output = DecimalField(max_digits=24, decimal_places=6)
+    factor_field = DecimalField(max_digits=30, decimal_places=12)
+    whens = []
+    for currency in rates:
+        factor = conversion_factor(currency, to_currency, rates)
+        if factor == 1:
+            then = ExpressionWrapper(F(amount_field), output_field=output)
+        else:
+            then = ExpressionWrapper(F(amount_field) * Value(factor, output_field=factor_field), output_field=output)
+        whens.append(When(**{currency_field: currency}, then=then))
+    return Case(*whens, default=Value(None), output_field=output)
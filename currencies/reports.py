@@ -0,0 +1,57 @@
+"""
+Multi-currency aggregates computed in the database.
+
+Each function issues one SQL query; conversions use the cached rate table
+through ``converted()``.
+"""
+from decimal import Decimal
+
+from django.db.models import F, OuterRef, Subquery, Sum, Value, DecimalField
+from django.db.models.functions import Coalesce
+
+from orders.models import Order
+from purchase_orders.models import PurchaseOrder, POPayment
+from suppliers.models import Supplier
+
+from .rates import converted
+
+OPEN_ORDER_EXCLUDED_STATUSES = ['DELIVERED', 'CANCELLED']
+
+
+def order_book_value(to_currency='USD', queryset=None):
+    """Total value of open orders in ``to_currency``."""
+    if queryset is None:
+        queryset = Order.objects.exclude(status__in=OPEN_ORDER_EXCLUDED_STATUSES)
+    total = queryset.aggregate(total=Sum(converted('total_amount', to_currency)))['total']
+    return total or Decimal(0)
+
+
+def _supplier_sum(queryset, amount_field, currency_field, supplier_field, to_currency):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{supplier_field: OuterRef('pk')})
+            .order_by()
+            .values(supplier_field)
+            .annotate(total=Sum(converted(amount_field, to_currency, currency_field)))
+            .values('total')
+        ),
+        Value(0),
+        output_field=DecimalField(max_digits=24, decimal_places=6),
+    )
+
+
+def supplier_balances(to_currency='INR', queryset=None):
+    """
+    Suppliers annotated with ``converted_billed``, ``converted_paid`` and
+    ``converted_balance``, converted from each PO's currency into ``to_currency``.
+    """
+    if queryset is None:
+        queryset = Supplier.objects.all()
+    return queryset.annotate(
+        converted_billed=_supplier_sum(
+            PurchaseOrder.objects.all(), 'total_amount', 'currency', 'supplier', to_currency,
+        ),
+        converted_paid=_supplier_sum(
+            POPayment.objects.all(), 'amount', 'purchase_order__currency', 'purchase_order__supplier', to_currency,
+        ),
+    ).annotate(converted_balance=F('converted_billed') - F('converted_paid'))
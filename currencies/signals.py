@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ExchangeRate
+from .rates import bump_rates_version
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def rates_changed(sender, **kwargs):
+    """Stored rates changed; every process reloads them on its next lookup"""
+    bump_rates_version()
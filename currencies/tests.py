@@ -0,0 +1,112 @@
+import json
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from leads.models import Lead
+from orders.models import Order
+from .importers import FileRateImporter, RateImportError
+from .models import ExchangeRate
+from .rates import (
+    VERSION_KEY, UnknownCurrency, bump_rates_version, convert, get_rates, rate_cache, rates_version, version_cache,
+)
+from .reports import order_book_value
+
+
+@override_settings(FX_BASE_CURRENCY='USD')
+class FxRateTests(TestCase):
+    """Rates come from local files in tests; conversions run in SQL"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.directory = Path(directory)
+        rate_cache.clear()
+        self.addCleanup(rate_cache.clear)
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def import_rates(self, payload, name='rates.json'):
+        call_command('import_fx_rates', file=str(self.write(name, payload)), stdout=StringIO())
+
+    def test_json_file_is_rebased_to_base_currency(self):
+        path = self.write('rates.json', {'base': 'EUR', 'date': '2026-01-01', 'rates': {'USD': '1.25', 'INR': '100'}})
+        day, rates = FileRateImporter(path).fetch()
+        self.assertEqual(day, date(2026, 1, 1))
+        self.assertEqual(rates, {'INR': Decimal('80'), 'EUR': Decimal('0.8')})
+
+    def test_csv_file(self):
+        path = self.write('rates.csv', 'currency,rate,date\nINR,83.5,2026-02-01\neur,0.9,2026-02-01\n')
+        self.assertEqual(
+            FileRateImporter(path).fetch(), (date(2026, 2, 1), {'INR': Decimal('83.5'), 'EUR': Decimal('0.9')})
+        )
+
+    def test_missing_file(self):
+        with self.assertRaises(RateImportError):
+            FileRateImporter(self.directory / 'missing.json').fetch()
+        with self.assertRaises(CommandError):
+            call_command('import_fx_rates', file=str(self.directory / 'missing.json'), stdout=StringIO())
+
+    def test_import_upserts_and_converts(self):
+        self.import_rates({'date': '2026-01-01', 'rates': {'INR': '80', 'EUR': '0.8'}})
+        self.import_rates({'date': '2026-01-01', 'rates': {'INR': '82'}})
+        self.assertEqual(ExchangeRate.objects.count(), 2)
+        self.assertEqual(convert(Decimal('10'), 'USD', 'INR'), Decimal('820'))
+        self.assertEqual(convert(Decimal('8'), 'EUR', 'USD'), Decimal('10'))
+        with self.assertRaises(UnknownCurrency):
+            convert(1, 'USD', 'GBP')
+
+    def test_order_book_value_in_one_query(self):
+        self.import_rates({'date': '2026-01-01', 'rates': {'INR': '80', 'EUR': '0.8'}})
+        lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+        for amount, currency, status in [
+            (100, 'USD', 'PI_GENERATED'), (100, 'EUR', 'PRODUCTION'), (8000, 'INR', 'SHIPPED'),
+            (500, 'USD', 'CANCELLED'), (5, 'GBP', 'PI_GENERATED'),
+        ]:
+            Order.objects.create(
+                lead=lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=amount,
+                currency=currency, status=status,
+            )
+        get_rates()
+        # Rates come from memory; GBP has no rate and is left out
+        with self.assertNumQueries(1):
+            total = order_book_value('USD')
+        self.assertEqual(total.quantize(Decimal('0.01')), Decimal('325.00'))
+        self.assertEqual(order_book_value('INR').quantize(Decimal('0.01')), Decimal('26000.00'))
+
+    def test_rates_written_elsewhere_are_picked_up(self):
+        self.import_rates({'date': '2026-01-01', 'rates': {'INR': '80'}})
+        self.assertEqual(get_rates()['INR'], Decimal('80'))
+
+        # What import_fx_rates does in another process; it cannot clear this process's cache
+        ExchangeRate.objects.bulk_create(
+            [ExchangeRate(currency='INR', rate_date=date(2026, 1, 1), rate=Decimal('90'))],
+            update_conflicts=True, unique_fields=['currency', 'rate_date'], update_fields=['rate', 'updated_at'],
+        )
+        self.assertEqual(get_rates()['INR'], Decimal('80'))
+        bump_rates_version()
+        self.assertEqual(get_rates()['INR'], Decimal('90'))
+        ExchangeRate.objects.create(currency='INR', rate_date=date(2026, 1, 2), rate=Decimal('85'))
+        self.assertEqual(get_rates()['INR'], Decimal('85'))
+        ExchangeRate.objects.filter(rate_date=date(2026, 1, 2)).delete()
+        self.assertEqual(get_rates()['INR'], Decimal('90'))
+
+    def test_lookups_do_not_query_until_rates_change(self):
+        self.import_rates({'date': '2026-01-01', 'rates': {'INR': '80'}})
+        get_rates()
+        with self.assertNumQueries(0):
+            get_rates()
+
+        # An evicted version is re-seeded with a new value, never an old one
+        version = rates_version()
+        version_cache().delete(VERSION_KEY)
+        self.assertNotEqual(rates_version(), version)
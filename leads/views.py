@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from backend.throttling import IPBucketThrottle, UserBucketThrottle
 from .models import Lead
 from .serializers import LeadSerializer, LeadCreateSerializer
 
@@ -16,6 +17,12 @@ class LeadViewSet(viewsets.ModelViewSet):
     queryset = Lead.objects.all()
     serializer_class = LeadSerializer
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'lead_create'
+    
+    def get_throttles(self):
+        if self.action == 'create':
+            return [IPBucketThrottle(), UserBucketThrottle()]
+        return super().get_throttles()
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderProduct
+from .models import Order, OrderEvent, OrderProduct, OrderSize, StatusDuration
 
 
 class OrderProductInline(admin.TabularInline):
@@ -8,13 +8,24 @@ class OrderProductInline(admin.TabularInline):
     readonly_fields = ['total_price']
 
 
+class OrderEventInline(admin.TabularInline):
+    model = OrderEvent
+    extra = 0
+    can_delete = False
+    readonly_fields = ['from_status', 'status', 'at', 'actor', 'note']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['pi_number', 'buyer_name', 'total_amount', 'status', 'pi_date']
     list_filter = ['status', 'commercial_term', 'pi_date']
     search_fields = ['pi_number', 'buyer_name', 'buyer_email']
-    readonly_fields = ['pi_number', 'pi_date', 'created_at', 'updated_at']
-    inlines = [OrderProductInline]
+    readonly_fields = ['pi_number', 'pi_date', 'total_amount', 'created_at', 'updated_at']
+    inlines = [OrderProductInline, OrderEventInline]
+    actions = ['render_documents']
     
     fieldsets = (
         ('order Information', {
@@ -34,3 +45,25 @@ class OrderAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    @admin.action(description='Queue PI / invoice / packing list PDFs for rendering')
+    def render_documents(self, request, queryset):
+        from .documents import request_documents
+
+        queued = request_documents(queryset)
+        self.message_user(request, f'Queued {queued} order(s); documents are rendered by render_documents --queued')
+
+
+@admin.register(OrderSize)
+class OrderSizeAdmin(admin.ModelAdmin):
+    list_display = ['order', 'style_number', 'size', 'quantity']
+    list_filter = ['size']
+    search_fields = ['order__pi_number', 'style_number']
+    readonly_fields = ['order', 'line', 'style_number', 'size', 'quantity']
+
+
+@admin.register(StatusDuration)
+class StatusDurationAdmin(admin.ModelAdmin):
+    list_display = ['status', 'period', 'count', 'average_days', 'max_seconds']
+    list_filter = ['status', 'period']
+    readonly_fields = ['status', 'period', 'count', 'total_seconds', 'max_seconds', 'updated_at']
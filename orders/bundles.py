@@ -0,0 +1,99 @@
+"""
+Streaming ZIP bundles of order documents.
+
+``stream_bundle(orders)`` yields a ZIP archive piece by piece: ``zipfile``
+writes into a write-only buffer that is drained after every 64 KB chunk of
+input, so the response starts at once and memory stays flat however large
+the bundle is. Nothing is compressed (documents are PDFs and images) and
+nothing touches the disk. Sizes and CRCs go in data descriptors after each
+file, which ``zipfile`` does by itself when the output cannot seek.
+"""
+import os
+import re
+import zipfile
+
+from django.utils import timezone
+
+CHUNK_SIZE = 64 * 1024
+
+# (object path, field, name in the archive)
+DOCUMENT_FIELDS = [
+    (None, 'pi_url', 'proforma-invoice'),
+    (None, 'invoice_url', 'commercial-invoice'),
+    (None, 'packing_list_url', 'packing-list'),
+    (None, 'awb_url', 'awb'),
+    ('shipment', 'invoice_url', 'shipment/invoice'),
+    ('shipment', 'packing_list_url', 'shipment/packing-list'),
+    ('shipment', 'awb_url', 'shipment/awb'),
+]
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def safe_name(value):
+    return _UNSAFE.sub('-', str(value)).strip('-') or 'order'
+
+
+class _Buffer:
+    """Write-only, non-seekable file object drained by the generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def order_documents(order):
+    """Yield ``(name in archive, FieldFile)`` for every document of ``order``."""
+    folder = safe_name(order.pi_number or order.pk)
+    # Reverse one-to-ones raise when missing, hence hasattr()
+    production = order.production if hasattr(order, 'production') else None
+    shipment = production.shipment if production is not None and hasattr(production, 'shipment') else None
+    sources = {None: order, 'shipment': shipment}
+    for source, field, name in DOCUMENT_FIELDS:
+        document = getattr(sources[source], field, None) if sources[source] is not None else None
+        if document:
+            yield f'{folder}/{name}{os.path.splitext(document.name)[1].lower()}', document
+    if production is not None:
+        for report in production.qc_reports.all():
+            if report.report_url:
+                day = timezone.localdate(report.date).isoformat() if report.date else 'undated'
+                extension = os.path.splitext(report.report_url.name)[1].lower()
+                yield f'{folder}/qc/{report.type.lower()}-{day}-{report.pk}{extension}', report.report_url
+
+
+def stream_bundle(orders):
+    """Yield the bytes of a ZIP with the documents of ``orders``; missing files are skipped."""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for order in orders:
+            for name, document in order_documents(order):
+                try:
+                    source = document.storage.open(document.name, 'rb')
+                except (FileNotFoundError, OSError):
+                    continue
+                with source:
+                    info = zipfile.ZipInfo(name, date_time=timezone.localtime().timetuple()[:6])
+                    # Known up front so zipfile only adds ZIP64 records for huge files
+                    info.file_size = source.size
+                    with archive.open(info, 'w') as target:
+                        for chunk in source.chunks(CHUNK_SIZE):
+                            target.write(chunk)
+                            yield buffer.drain()
+                yield buffer.drain()
+    yield buffer.drain()
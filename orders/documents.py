@@ -0,0 +1,229 @@
+"""
+PDF rendering for proforma invoices, commercial invoices and packing lists.
+
+HTML is rendered from Django templates in the calling process; the
+WeasyPrint step runs in a process pool whose workers import WeasyPrint,
+configure fonts and parse the shared stylesheet once at start-up. The pool
+belongs to the ``render_documents`` command; web requests (the admin
+action) only queue orders by setting ``Order.documents_requested_at``.
+
+Files are content-addressed: the name is the SHA-256 of the document data
+plus the template and stylesheet sources, e.g.
+``documents/pi/3f/3fa2...e1.pdf``. A document whose data has not changed
+already points at (or finds in storage) the right file and is never
+re-rendered.
+"""
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.template.loader import render_to_string
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates' / 'orders' / 'documents'
+STYLESHEET = TEMPLATE_DIR / 'documents.css'
+
+# kind -> (template, Order file field)
+DOCUMENTS = {
+    'pi': ('orders/documents/proforma_invoice.html', 'pi_url'),
+    'invoice': ('orders/documents/commercial_invoice.html', 'invoice_url'),
+    'packing_list': ('orders/documents/packing_list.html', 'packing_list_url'),
+}
+
+# Commercial invoice and packing list only exist once goods are ready to ship
+DOCUMENT_STATUSES = {
+    'pi': None,
+    'invoice': ['QC_PASSED', 'SHIPPED', 'DELIVERED'],
+    'packing_list': ['QC_PASSED', 'SHIPPED', 'DELIVERED'],
+}
+
+
+# --- worker process -------------------------------------------------------
+
+_worker = {}
+
+
+def _init_worker():
+    """Load WeasyPrint, fonts and the stylesheet once per worker process."""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    _worker['font_config'] = font_config
+    _worker['stylesheet'] = CSS(string=STYLESHEET.read_text(), font_config=font_config)
+
+
+def _render_pdf(html):
+    from weasyprint import HTML
+
+    if not _worker:
+        _init_worker()
+    return HTML(string=html).write_pdf(
+        stylesheets=[_worker['stylesheet']],
+        font_config=_worker['font_config'],
+    )
+
+
+# --- pool -----------------------------------------------------------------
+
+def document_pool():
+    """
+    New WeasyPrint process pool. Only the ``render_documents`` command
+    starts one; web workers queue orders with ``request_documents`` instead.
+    """
+    return ProcessPoolExecutor(
+        max_workers=getattr(settings, 'DOCUMENT_RENDER_WORKERS', None),
+        initializer=_init_worker,
+    )
+
+
+# --- document data --------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def layout_version(kind):
+    """Digest of the template sources, so layout changes invalidate old files."""
+    digest = hashlib.sha256()
+    for path in sorted(TEMPLATE_DIR.iterdir()):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(kind.encode())
+    return digest.hexdigest()
+
+
+def document_context(order):
+    """Plain data shown on an order's documents (uses prefetched products)."""
+    products = [
+        {
+            'style_name': product.style_name,
+            'style_number': product.style_number,
+            'quantity': product.quantity,
+            'unit_price': str(product.unit_price),
+            'total_price': str(product.total_price),
+            'size_breakdown': product.size_breakdown,
+        }
+        for product in sorted(order.products.all(), key=lambda product: product.pk)
+    ]
+    return {
+        'company_name': getattr(settings, 'DOCUMENT_COMPANY_NAME', ''),
+        'company_address': getattr(settings, 'DOCUMENT_COMPANY_ADDRESS', ''),
+        'pi_number': order.pi_number,
+        'pi_date': order.pi_date.date().isoformat() if order.pi_date else '',
+        'shipment_date': order.shipment_date.date().isoformat() if order.shipment_date else '',
+        'buyer_name': order.buyer_name,
+        'buyer_company': order.buyer_company,
+        'buyer_address': order.buyer_address,
+        'buyer_email': order.buyer_email,
+        'buyer_phone': order.buyer_phone,
+        'commercial_term': order.get_commercial_term_display(),
+        'payment_terms': order.payment_terms,
+        'bank_details': order.bank_details,
+        'currency': order.currency,
+        'total_amount': str(order.total_amount),
+        'total_quantity': sum(product['quantity'] for product in products),
+        'products': products,
+    }
+
+
+def document_name(kind, context):
+    """Content-addressed storage name for a document."""
+    payload = json.dumps(context, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256((layout_version(kind) + payload).encode()).hexdigest()
+    _, field = DOCUMENTS[kind]
+    from .models import Order
+
+    upload_to = Order._meta.get_field(field).upload_to
+    return f'{upload_to}{digest[:2]}/{digest}.pdf'
+
+
+def document_storage():
+    # Names are already content hashes, so skip the content-addressed default storage
+    return storages['hashed']
+
+
+def render_html(kind, context):
+    template, _ = DOCUMENTS[kind]
+    return render_to_string(template, context)
+
+
+# --- rendering ------------------------------------------------------------
+
+def render_documents(pool, orders, kinds=None, force=False):
+    """
+    Make sure each order's documents of ``kinds`` are rendered and current.
+
+    Only documents whose content hash is not already in storage are sent to
+    ``pool`` (see ``document_pool``); finished orders are written with one ``bulk_update``.
+    Returns ``(rendered, reused)`` counts.
+    """
+    from .models import Order
+
+    storage = document_storage()
+    kinds = list(kinds or DOCUMENTS)
+    changed = {}
+    jobs = {}
+    reused = 0
+
+    for order in orders:
+        context = document_context(order)
+        for kind in kinds:
+            statuses = DOCUMENT_STATUSES[kind]
+            if statuses is not None and order.status not in statuses:
+                continue
+            _, field = DOCUMENTS[kind]
+            name = document_name(kind, context)
+            if not force:
+                if getattr(order, field).name == name:
+                    continue
+                if storage.exists(name):
+                    getattr(order, field).name = name
+                    changed.setdefault(order.pk, (order, set()))[1].add(field)
+                    reused += 1
+                    continue
+            if name not in jobs:
+                jobs[name] = pool.submit(_render_pdf, render_html(kind, context))
+            changed.setdefault(order.pk, (order, set()))[1].add(field)
+            getattr(order, field).name = name
+
+    for name, future in jobs.items():
+        pdf = future.result()
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(pdf))
+
+    fields = sorted({field for _, order_fields in changed.values() for field in order_fields})
+    if changed:
+        Order.objects.bulk_update([order for order, _ in changed.values()], fields, batch_size=500)
+    return len(jobs), reused
+
+
+def pending_orders():
+    """Orders that may need documents, with products prefetched."""
+    from .models import Order
+
+    return (
+        Order.objects.exclude(status='CANCELLED')
+        .prefetch_related('products')
+        .order_by('pk')
+    )
+
+
+def request_documents(orders):
+    """Queue ``orders`` (a queryset) for the next ``render_documents --queued`` run."""
+    from django.utils import timezone
+
+    return orders.update(documents_requested_at=timezone.now())
+
+
+def queued_orders():
+    return pending_orders().filter(documents_requested_at__isnull=False)
+
+
+def clear_requests(order_ids, before):
+    """Dequeue orders rendered in a run that started at ``before``; later requests stay queued."""
+    from .models import Order
+
+    Order.objects.filter(pk__in=order_ids, documents_requested_at__lte=before).update(documents_requested_at=None)
@@ -0,0 +1,153 @@
+"""
+Order status events.
+
+Every status change appends an ``OrderEvent`` (previous status, new status,
+time, user). At the same time, the time the order spent in its previous
+status is added to the ``StatusDuration`` row for that status and month, so
+cycle-time reports (PI to advance, QC to shipment, ...) read a handful of
+pre-aggregated rows instead of scanning events.
+
+``Order.save`` records single changes; ``transition_orders`` moves many
+orders at once with one ``bulk_update`` and one ``bulk_create``.
+"""
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+# Status -> milestone date stamped the first time an order reaches it
+MILESTONES = {
+    'ADVANCE_RECEIVED': 'advance_date',
+    'PRODUCTION': 'production_start_date',
+    'SHIPPED': 'shipment_date',
+}
+
+_actor = contextvars.ContextVar('order_event_actor', default=None)
+
+
+@contextmanager
+def acting_user(user):
+    """Attribute events recorded inside the block to ``user``."""
+    token = _actor.set(user if getattr(user, 'is_authenticated', False) else None)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def month_start(at):
+    return timezone.localdate(at).replace(day=1)
+
+
+def stamp_milestone(order, at=None):
+    """Set the milestone date for ``order.status`` if it is still empty; returns the field name."""
+    field = MILESTONES.get(order.status)
+    if field and getattr(order, field) is None:
+        setattr(order, field, at or timezone.now())
+        return field
+    return None
+
+
+def add_durations(durations):
+    """Fold ``{(status, period): [seconds, ...]}`` into ``StatusDuration`` with F() updates."""
+    from .models import StatusDuration
+
+    for (status, period), seconds in durations.items():
+        row, _ = StatusDuration.objects.get_or_create(status=status, period=period)
+        StatusDuration.objects.filter(pk=row.pk).update(
+            count=F('count') + len(seconds),
+            total_seconds=F('total_seconds') + sum(seconds),
+            max_seconds=Greatest(F('max_seconds'), max(seconds)),
+            updated_at=timezone.now(),
+        )
+
+
+def record_transitions(changes, at=None, actor=None, note=''):
+    """
+    Append events for ``changes``, a list of ``(order, from_status)`` where
+    ``order.status`` is the new status, and update the duration roll-up.
+    """
+    from .models import OrderEvent
+
+    changes = [(order, from_status) for order, from_status in changes if order.status != from_status]
+    if not changes:
+        return []
+    at = at or timezone.now()
+    actor = actor or _actor.get()
+
+    with transaction.atomic():
+        entered = dict(
+            OrderEvent.objects.filter(order_id__in=[order.pk for order, _ in changes])
+            .values_list('order_id')
+            .annotate(last=Max('at'))
+        )
+        events = OrderEvent.objects.bulk_create([
+            OrderEvent(order=order, from_status=from_status, status=order.status, at=at, actor=actor, note=note)
+            for order, from_status in changes
+        ])
+
+        durations = defaultdict(list)
+        for order, from_status in changes:
+            since = entered.get(order.pk)
+            if since is None and from_status == 'PI_GENERATED':
+                # Orders created before events existed start at their PI date
+                since = order.pi_date
+            if from_status and since is not None:
+                durations[(from_status, month_start(at))].append(max(int((at - since).total_seconds()), 0))
+        add_durations(durations)
+    return events
+
+
+def transition_orders(orders, status, at=None, actor=None, note=''):
+    """Move ``orders`` to ``status`` with one bulk update; returns the orders that changed."""
+    from .models import Order
+
+    at = at or timezone.now()
+    changes = []
+    fields = {'status', 'updated_at'}
+    for order in orders:
+        if order.status == status:
+            continue
+        changes.append((order, order.status))
+        order.status = status
+        order.updated_at = at
+        field = stamp_milestone(order, at)
+        if field:
+            fields.add(field)
+
+    if changes:
+        with transaction.atomic():
+            Order.objects.bulk_update([order for order, _ in changes], sorted(fields))
+            record_transitions(changes, at=at, actor=actor, note=note)
+        for order, _ in changes:
+            order._loaded_status = order.status
+    return [order for order, _ in changes]
+
+
+def rebuild_durations(batch_size=2000):
+    """Recompute ``StatusDuration`` from the full event log; returns the number of rows."""
+    from .models import OrderEvent, StatusDuration
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    previous = None
+    events = OrderEvent.objects.order_by('order_id', 'at', 'id').values_list('order_id', 'status', 'at')
+    for order_id, status, at in events.iterator(chunk_size=batch_size):
+        if previous and previous[0] == order_id:
+            seconds = max(int((at - previous[2]).total_seconds()), 0)
+            total = totals[(previous[1], month_start(at))]
+            total[0] += 1
+            total[1] += seconds
+            total[2] = max(total[2], seconds)
+        previous = (order_id, status, at)
+
+    with transaction.atomic():
+        StatusDuration.objects.all().delete()
+        StatusDuration.objects.bulk_create([
+            StatusDuration(status=status, period=period, count=count, total_seconds=seconds, max_seconds=longest)
+            for (status, period), (count, seconds, longest) in totals.items()
+        ], batch_size=batch_size)
+    return len(totals)
@@ -0,0 +1,15 @@
+import django_filters
+from .models import Order
+
+
+class OrderFilter(django_filters.FilterSet):
+    """Filter by status / commercial term (comma separated allowed) and date ranges"""
+    status = django_filters.BaseInFilter(field_name='status')
+    commercial_term = django_filters.BaseInFilter(field_name='commercial_term')
+    pi_date = django_filters.DateFromToRangeFilter(field_name='pi_date')
+    production_start_date = django_filters.DateFromToRangeFilter(field_name='production_start_date')
+    shipment_date = django_filters.DateFromToRangeFilter(field_name='shipment_date')
+
+    class Meta:
+        model = Order
+        fields = ['status', 'commercial_term', 'currency', 'lead', 'pi_date', 'production_start_date', 'shipment_date']
@@ -0,0 +1,21 @@
+"""
+Django management command to rebuild the order status duration roll-up
+Usage: python manage.py rebuild_status_durations
+
+The roll-up is normally maintained as events are recorded; run this after
+importing or backfilling events.
+"""
+from django.core.management.base import BaseCommand
+
+from orders.events import rebuild_durations
+
+
+class Command(BaseCommand):
+    help = 'Recomputes StatusDuration rows from the order event log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Events read per query')
+
+    def handle(self, *args, **options):
+        rows = rebuild_durations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} status duration row(s)'))
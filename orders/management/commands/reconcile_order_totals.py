@@ -0,0 +1,53 @@
+"""
+Django management command to repair drifted order and line totals
+Usage: python manage.py reconcile_order_totals [--batch-size 500] [--dry-run]
+
+Line totals are reset to quantity * unit price, then order totals to the sum
+of their lines. Orders without lines are left alone. Work is done in
+primary-key batches, one transaction each.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from orders.models import OrderProduct
+from orders.services import drifted_lines, drifted_orders, line_total_expression, recalculate_totals
+
+
+def drifted_ids(queryset, batch_size):
+    """Yield lists of drifted primary keys, walking the table by pk."""
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+class Command(BaseCommand):
+    help = 'Finds and repairs orders whose totals drifted from their lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows fixed per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report drifted rows')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['dry_run']:
+            self.stdout.write(f'{drifted_lines().count()} line(s) and {drifted_orders().count()} order(s) have drifted')
+            return
+
+        lines = 0
+        for pks in drifted_ids(drifted_lines(), batch_size):
+            with transaction.atomic():
+                lines += OrderProduct.objects.filter(pk__in=pks).update(total_price=line_total_expression())
+
+        orders = 0
+        for pks in drifted_ids(drifted_orders(), batch_size):
+            with transaction.atomic():
+                orders += recalculate_totals(pks)
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired {lines} line total(s) and {orders} order total(s)'))
@@ -0,0 +1,56 @@
+"""
+Django management command to render order PDFs (PI, commercial invoice, packing list)
+Usage: python manage.py render_documents [--kind pi invoice] [--order 12] [--queued] [--force]
+
+Documents are rendered in a process pool owned by this command; orders whose
+document data is unchanged keep their existing files. ``--queued`` renders
+only the orders queued from the admin and dequeues them.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.documents import (
+    DOCUMENTS, clear_requests, document_pool, pending_orders, queued_orders, render_documents,
+)
+
+
+class Command(BaseCommand):
+    help = 'Renders missing or outdated order documents in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', nargs='+', choices=sorted(DOCUMENTS), help='Document kinds to render (default: all)')
+        parser.add_argument('--order', type=int, nargs='+', help='Only these order ids')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Orders submitted to the pool at a time')
+        parser.add_argument('--queued', action='store_true', help='Only orders queued from the admin')
+        parser.add_argument('--force', action='store_true', help='Re-render even if the file already exists')
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        orders = queued_orders() if options['queued'] else pending_orders()
+        if options['order']:
+            orders = orders.filter(pk__in=options['order'])
+
+        chunk_size = options['chunk_size']
+        rendered = reused = 0
+
+        def flush(pool, chunk):
+            counts = render_documents(pool, chunk, options['kind'], force=options['force'])
+            if options['queued']:
+                clear_requests([order.pk for order in chunk], started)
+            return counts
+
+        with document_pool() as pool:
+            chunk = []
+            for order in orders.iterator(chunk_size=chunk_size):
+                chunk.append(order)
+                if len(chunk) >= chunk_size:
+                    counts = flush(pool, chunk)
+                    rendered, reused = rendered + counts[0], reused + counts[1]
+                    chunk = []
+            if chunk:
+                counts = flush(pool, chunk)
+                rendered, reused = rendered + counts[0], reused + counts[1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} document(s), reused {reused} cached file(s)'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_total_amount_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSize',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('style_number', models.CharField(max_length=100)),
+                ('size', models.CharField(max_length=20)),
+                ('quantity', models.PositiveIntegerField()),
+                ('line', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sizes', to='orders.orderproduct')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sizes', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Order Size',
+                'verbose_name_plural': 'Order Sizes',
+                'ordering': ['line', 'id'],
+                'indexes': [models.Index(fields=['order', 'style_number', 'size'], name='orders_size_order_style_idx'), models.Index(fields=['size'], name='orders_size_size_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+from orders.sizes import parse_size_breakdown
+
+BATCH_SIZE = 1000
+
+
+def backfill_sizes(apps, schema_editor):
+    OrderProduct = apps.get_model('orders', 'OrderProduct')
+    OrderSize = apps.get_model('orders', 'OrderSize')
+
+    batch = []
+    lines = OrderProduct.objects.exclude(size_breakdown='').values_list(
+        'pk', 'order_id', 'style_number', 'size_breakdown'
+    )
+    for pk, order_id, style_number, size_breakdown in lines.iterator(chunk_size=BATCH_SIZE):
+        for size, quantity in parse_size_breakdown(size_breakdown).items():
+            batch.append(OrderSize(
+                order_id=order_id, line_id=pk, style_number=style_number, size=size, quantity=quantity
+            ))
+        if len(batch) >= BATCH_SIZE:
+            OrderSize.objects.bulk_create(batch)
+            batch = []
+    OrderSize.objects.bulk_create(batch)
+
+
+def clear_sizes(apps, schema_editor):
+    apps.get_model('orders', 'OrderSize').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_ordersize'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sizes, clear_sizes),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_backfill_ordersize'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusDuration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PI_GENERATED', 'PI Generated'), ('ADVANCE_RECEIVED', 'Advance Received'), ('PRODUCTION', 'In Production'), ('QC_PASSED', 'QC Passed'), ('SHIPPED', 'Shipped'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('period', models.DateField(help_text='First day of the month the orders left this status')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_seconds', models.BigIntegerField(default=0)),
+                ('max_seconds', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Status Duration',
+                'verbose_name_plural': 'Status Durations',
+                'ordering': ['period', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('status', 'period'), name='unique_status_duration_period')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(choices=[('PI_GENERATED', 'PI Generated'), ('ADVANCE_RECEIVED', 'Advance Received'), ('PRODUCTION', 'In Production'), ('QC_PASSED', 'QC Passed'), ('SHIPPED', 'Shipped'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled')], max_length=20)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_events', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Order Event',
+                'verbose_name_plural': 'Order Events',
+                'ordering': ['order', 'at', 'id'],
+                'indexes': [models.Index(fields=['order', 'at'], name='orders_event_order_at_idx'), models.Index(fields=['status', 'at'], name='orders_event_status_at_idx')],
+            },
+        ),
+    ]
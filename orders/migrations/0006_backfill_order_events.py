@@ -0,0 +1,50 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Milestones that can be reconstructed from the dates stored on the order
+MILESTONES = [
+    ('PI_GENERATED', 'pi_date'),
+    ('ADVANCE_RECEIVED', 'advance_date'),
+    ('PRODUCTION', 'production_start_date'),
+    ('SHIPPED', 'shipment_date'),
+]
+
+
+def backfill_events(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderEvent = apps.get_model('orders', 'OrderEvent')
+
+    fields = ['pk', 'status', 'updated_at'] + [field for _, field in MILESTONES]
+    batch = []
+    for row in Order.objects.values(*fields).iterator(chunk_size=BATCH_SIZE):
+        steps = [(status, row[field]) for status, field in MILESTONES if row[field]]
+        steps.sort(key=lambda step: step[1])
+        if not steps or steps[-1][0] != row['status']:
+            steps.append((row['status'], max(row['updated_at'], steps[-1][1]) if steps else row['updated_at']))
+
+        from_status = ''
+        for status, at in steps:
+            batch.append(OrderEvent(
+                order_id=row['pk'], from_status=from_status, status=status, at=at, note='Backfilled'
+            ))
+            from_status = status
+        if len(batch) >= BATCH_SIZE:
+            OrderEvent.objects.bulk_create(batch)
+            batch = []
+    OrderEvent.objects.bulk_create(batch)
+
+
+def clear_backfilled(apps, schema_editor):
+    apps.get_model('orders', 'OrderEvent').objects.filter(note='Backfilled').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_events, clear_backfilled),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_backfill_order_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='ship_by_date',
+            field=models.DateField(blank=True, help_text='Date the goods must leave the factory', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_ship_by_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='documents_requested_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Queued for the next render_documents --queued run', null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from orders.sizes import parse_size_breakdown
+
+BATCH_SIZE = 1000
+
+
+def resplit_sizes(apps, schema_editor):
+    """0004 split breakdowns on '/', turning 'S/M:10' into bogus sizes; rebuild those lines"""
+    OrderProduct = apps.get_model('orders', 'OrderProduct')
+    OrderSize = apps.get_model('orders', 'OrderSize')
+
+    lines = list(
+        OrderProduct.objects.filter(size_breakdown__contains='/').values_list(
+            'pk', 'order_id', 'style_number', 'size_breakdown'
+        )
+    )
+    for start in range(0, len(lines), BATCH_SIZE):
+        chunk = lines[start:start + BATCH_SIZE]
+        OrderSize.objects.filter(line_id__in=[pk for pk, *_ in chunk]).delete()
+        OrderSize.objects.bulk_create([
+            OrderSize(order_id=order_id, line_id=pk, style_number=style_number, size=size, quantity=quantity)
+            for pk, order_id, style_number, size_breakdown in chunk
+            for size, quantity in parse_size_breakdown(size_breakdown).items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_documents_requested_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(resplit_sizes, migrations.RunPython.noop),
+    ]
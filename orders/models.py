@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Order(models.Model):
@@ -45,7 +46,7 @@ class Order(models.Model):
     bank_details = models.TextField(blank=True)
     
     # Pricing
-    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Sum of line totals')
     currency = models.CharField(max_length=3, default='USD')
     
     # Status
@@ -56,12 +57,16 @@ class Order(models.Model):
     advance_date = models.DateTimeField(null=True, blank=True)
     production_start_date = models.DateTimeField(null=True, blank=True)
     shipment_date = models.DateTimeField(null=True, blank=True)
+    ship_by_date = models.DateField(null=True, blank=True, help_text='Date the goods must leave the factory')
     
     # Documents
     pi_url = models.FileField(upload_to='documents/pi/', blank=True)
     invoice_url = models.FileField(upload_to='documents/invoices/', blank=True)
     packing_list_url = models.FileField(upload_to='documents/packing/', blank=True)
     awb_url = models.FileField(upload_to='documents/awb/', blank=True)
+    documents_requested_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, help_text='Queued for the next render_documents --queued run'
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -72,12 +77,27 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Auto-generate PI number if not provided"""
+        """Auto-generate PI number if not provided and record status changes"""
+        from .events import record_transitions, stamp_milestone
+
         if not self.pi_number:
-            import time
-            self.pi_number = f'PI-{int(time.time())}'
+            from sequences.service import next_number
+            self.pi_number = next_number('PI')
+        previous = getattr(self, '_loaded_status', None)
+        changed = previous != self.status
+        if changed:
+            stamp_milestone(self)
         super().save(*args, **kwargs)
+        if changed:
+            record_transitions([(self, previous or '')])
+        self._loaded_status = self.status
     
     def __str__(self):
         return f'{self.pi_number} - {self.buyer_name} (${self.total_amount})'
@@ -97,9 +117,107 @@ class OrderProduct(models.Model):
     size_breakdown = models.CharField(max_length=255, blank=True, help_text='e.g., S:10, M:20, L:15')
     
     def save(self, *args, **kwargs):
-        """Auto-calculate total price"""
-        self.total_price = self.quantity * self.unit_price
+        """Auto-calculate total price, rebuild size rows and keep the order total in sync"""
+        from .services import line_total, recalculate_totals
+        from .sizes import size_rows
+
+        self.total_price = line_total(self.quantity, self.unit_price)
         super().save(*args, **kwargs)
+        self.sizes.all().delete()
+        OrderSize.objects.bulk_create(size_rows(self, OrderSize))
+        recalculate_totals([self.order_id])
+
+    def delete(self, *args, **kwargs):
+        from .services import recalculate_totals
+
+        order_id = self.order_id
+        result = super().delete(*args, **kwargs)
+        recalculate_totals([order_id])
+        return result
     
     def __str__(self):
         return f'{self.style_name} x {self.quantity}'
+
+
+class OrderSize(models.Model):
+    """
+    Quantity per size for an order line, parsed from OrderProduct.size_breakdown
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='sizes')
+    line = models.ForeignKey(OrderProduct, on_delete=models.CASCADE, related_name='sizes')
+
+    # Copied from the line so size queries don't need a join
+    style_number = models.CharField(max_length=100)
+    size = models.CharField(max_length=20)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['line', 'id']
+        verbose_name = 'Order Size'
+        verbose_name_plural = 'Order Sizes'
+        indexes = [
+            models.Index(fields=['order', 'style_number', 'size'], name='orders_size_order_style_idx'),
+            models.Index(fields=['size'], name='orders_size_size_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.style_number} {self.size} x {self.quantity}'
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of order status transitions
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events')
+    from_status = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    at = models.DateTimeField(default=timezone.now)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='order_events'
+    )
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['order', 'at', 'id']
+        verbose_name = 'Order Event'
+        verbose_name_plural = 'Order Events'
+        indexes = [
+            models.Index(fields=['order', 'at'], name='orders_event_order_at_idx'),
+            models.Index(fields=['status', 'at'], name='orders_event_status_at_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError('Order events are append-only')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'{self.order_id}: {self.from_status or "-"} -> {self.status} at {self.at:%Y-%m-%d %H:%M}'
+
+
+class StatusDuration(models.Model):
+    """
+    Time orders spent in each status, summed per month in which they left it.
+    Maintained incrementally as events are recorded.
+    """
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    period = models.DateField(help_text='First day of the month the orders left this status')
+    count = models.PositiveIntegerField(default=0)
+    total_seconds = models.BigIntegerField(default=0)
+    max_seconds = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['period', 'status']
+        verbose_name = 'Status Duration'
+        verbose_name_plural = 'Status Durations'
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'period'], name='unique_status_duration_period'),
+        ]
+
+    @property
+    def average_days(self):
+        return self.total_seconds / self.count / 86400 if self.count else None
+
+    def __str__(self):
+        return f'{self.status} {self.period:%Y-%m}: {self.count} order(s)'
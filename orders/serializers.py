@@ -0,0 +1,67 @@
+from rest_framework import serializers
+from production.serializers import ProductionSerializer
+from .models import Order, OrderEvent, OrderProduct, OrderSize
+from .sizes import parse_size_breakdown, unreadable_fragments
+
+
+class OrderSizeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderSize
+        fields = ['size', 'quantity']
+
+
+class OrderProductSerializer(serializers.ModelSerializer):
+    sizes = OrderSizeSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = OrderProduct
+        fields = [
+            'id', 'style_name', 'style_number', 'quantity', 'unit_price', 'total_price', 'size_breakdown', 'sizes'
+        ]
+        read_only_fields = ['id', 'total_price']
+
+    def validate_size_breakdown(self, value):
+        unreadable = unreadable_fragments(value)
+        if unreadable or (value.strip() and not parse_size_breakdown(value)):
+            detail = f'Could not read {", ".join(repr(part) for part in unreadable)}. ' if unreadable else ''
+            raise serializers.ValidationError(detail + 'Expected sizes like "S:10, M:20, L:15"')
+        return value
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """Order with line items, production (QC reports, shipment) and lead name"""
+    lead_name = serializers.CharField(source='lead.name', read_only=True)
+    products = OrderProductSerializer(many=True, read_only=True)
+    production = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'lead', 'lead_name', 'pi_number', 'buyer_name', 'buyer_company', 'buyer_address',
+            'buyer_email', 'buyer_phone', 'commercial_term', 'payment_terms', 'bank_details',
+            'total_amount', 'currency', 'status', 'pi_date', 'advance_date', 'production_start_date',
+            'shipment_date', 'ship_by_date', 'pi_url', 'invoice_url', 'packing_list_url', 'awb_url',
+            'products', 'production', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'pi_number', 'pi_date', 'total_amount', 'pi_url', 'invoice_url', 'packing_list_url',
+            'created_at', 'updated_at'
+        ]
+
+    def get_production(self, obj):
+        # Reverse one-to-one: missing production raises instead of returning None
+        if not hasattr(obj, 'production'):
+            return None
+        return ProductionSerializer(obj.production, context=self.context).data
+
+    def validate_currency(self, value):
+        return value.upper()
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    actor_email = serializers.EmailField(source='actor.email', read_only=True, default=None)
+
+    class Meta:
+        model = OrderEvent
+        fields = ['id', 'from_status', 'status', 'at', 'actor', 'actor_email', 'note']
+        read_only_fields = fields
@@ -0,0 +1,95 @@
+"""
+Order line maintenance.
+
+``Order.total_amount`` is the sum of its lines' ``total_price``. Lines added
+through ``add_lines`` are priced in one pass, inserted with ``bulk_create``
+and the order total is refreshed with a single aggregate ``UPDATE`` in the
+same transaction.
+"""
+from decimal import Decimal, ROUND_HALF_EVEN
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from .models import Order, OrderProduct, OrderSize
+from .sizes import size_rows
+
+CENT = Decimal('0.01')
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def line_total(quantity, unit_price):
+    return (Decimal(quantity) * Decimal(unit_price)).quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+
+def line_total_expression():
+    """``quantity * unit_price`` evaluated by the database, rounded to cents."""
+    return Round(ExpressionWrapper(F('quantity') * F('unit_price'), output_field=MONEY), 2, output_field=MONEY)
+
+
+def lines_sum():
+    """Subquery: sum of line totals for the outer order (NULL when it has no lines)."""
+    return Subquery(
+        OrderProduct.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(total=Round(Sum('total_price'), 2, output_field=MONEY))
+        .values('total'),
+        output_field=MONEY,
+    )
+
+
+def recalculate_totals(order_ids):
+    """Set ``total_amount`` of the given orders to the sum of their lines in one UPDATE."""
+    return Order.objects.filter(pk__in=list(order_ids)).update(
+        total_amount=Coalesce(lines_sum(), Value(Decimal(0)), output_field=MONEY),
+        updated_at=timezone.now(),
+    )
+
+
+def add_lines(order, lines, replace=False, batch_size=500):
+    """
+    Insert ``lines`` (dicts of OrderProduct fields) into ``order``.
+
+    With ``replace`` the existing lines are removed first. Returns the created
+    ``OrderProduct`` objects; their size rows are inserted in bulk too and
+    ``order.total_amount`` is refreshed in place.
+    """
+    objs = [
+        OrderProduct(
+            order=order,
+            style_name=line['style_name'],
+            style_number=line['style_number'],
+            quantity=line['quantity'],
+            unit_price=line['unit_price'],
+            total_price=line_total(line['quantity'], line['unit_price']),
+            size_breakdown=line.get('size_breakdown', ''),
+        )
+        for line in lines
+    ]
+    with transaction.atomic():
+        if replace:
+            order.products.all().delete()
+        OrderProduct.objects.bulk_create(objs, batch_size=batch_size)
+        OrderSize.objects.bulk_create(
+            [row for obj in objs for row in size_rows(obj, OrderSize)], batch_size=batch_size
+        )
+        recalculate_totals([order.pk])
+    order.refresh_from_db(fields=['total_amount', 'updated_at'])
+    return objs
+
+
+def drifted_lines():
+    """Lines whose stored total differs from quantity * unit price."""
+    return OrderProduct.objects.alias(expected=line_total_expression()).exclude(total_price=F('expected'))
+
+
+def drifted_orders():
+    """Orders with lines whose total differs from the sum of those lines."""
+    return (
+        Order.objects.alias(lines_total=lines_sum())
+        .filter(lines_total__isnull=False)
+        .exclude(total_amount=F('lines_total'))
+    )
@@ -0,0 +1,72 @@
+"""
+Size breakdown parsing.
+
+``OrderProduct.size_breakdown`` is free text such as ``S:10, M:20, L:15``;
+``OrderSize`` holds the same data as one row per size so size-level totals
+can be aggregated in SQL. ``parse_size_breakdown`` accepts the common ways
+people type it: ``S:10``, ``S-10``, ``S=10``, ``S 10``, ``S x 10``,
+``S10``, ``10 S``, separated by commas, semicolons, pipes or new lines.
+Slashes belong to sizes (``S/M``, ``28/30``), so they never separate.
+"""
+import re
+
+_SEPARATORS = re.compile(r'[,;|\n]+')
+_SIZE_FIRST = re.compile(r'^\s*(\S.*?)(?:\s*[:=*xX\-]\s*|\s+|(?<=[A-Za-z]))(\d+)\s*(?:pcs?)?\s*$', re.IGNORECASE)
+_QTY_FIRST = re.compile(r'^\s*(\d+)\s*(?:pcs?)?\s*(?:[xX*]\s*)?([A-Za-z].*?)\s*$', re.IGNORECASE)
+
+
+SIZE_MAX_LENGTH = 20
+
+
+def normalize_size(size):
+    return size.strip().upper().replace(' ', '')[:SIZE_MAX_LENGTH]
+
+
+def _parse_fragment(part):
+    """``(size, quantity)`` for one fragment such as ``'S:10'``, or None."""
+    match = _SIZE_FIRST.match(part)
+    if match:
+        size, quantity = match.groups()
+    else:
+        match = _QTY_FIRST.match(part)
+        if not match:
+            return None
+        quantity, size = match.groups()
+    return normalize_size(size), int(quantity)
+
+
+def _fragments(text):
+    return [part for part in _SEPARATORS.split(text or '') if part.strip()]
+
+
+def parse_size_breakdown(text):
+    """
+    Parse ``text`` into an ordered ``{size: quantity}`` dict.
+
+    Repeated sizes are added up; fragments that cannot be read are skipped.
+    """
+    sizes = {}
+    for part in _fragments(text):
+        parsed = _parse_fragment(part)
+        if parsed:
+            size, quantity = parsed
+            sizes[size] = sizes.get(size, 0) + quantity
+    return sizes
+
+
+def unreadable_fragments(text):
+    """Fragments of ``text`` that ``parse_size_breakdown`` would skip."""
+    return [part.strip() for part in _fragments(text) if not _parse_fragment(part)]
+
+
+def format_size_breakdown(sizes):
+    """Inverse of ``parse_size_breakdown``: ``{'S': 10, 'M': 20}`` -> ``'S:10, M:20'``."""
+    return ', '.join(f'{size}:{quantity}' for size, quantity in sizes.items())
+
+
+def size_rows(line, model):
+    """Unsaved ``model`` (OrderSize) rows for an OrderProduct ``line``."""
+    return [
+        model(order_id=line.order_id, line=line, style_number=line.style_number, size=size, quantity=quantity)
+        for size, quantity in parse_size_breakdown(line.size_breakdown).items()
+    ]
@@ -1,3 +1,416 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from leads.models import Lead
+from production.models import Production, QCReport, Shipment
+from . import documents
+from .bundles import CHUNK_SIZE
+from .models import Order, OrderProduct, OrderSize
+from .views import MAX_BUNDLE_ORDERS
+
+
+class OrderApiQueryCountTests(TestCase):
+    """The order list/detail cost a fixed number of queries, however many rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        cls.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def create_orders(self, count):
+        for i in range(count):
+            order = Order.objects.create(
+                lead=self.lead, buyer_name=f'Buyer {i}', buyer_email='buyer@example.com', total_amount=100
+            )
+            for j in range(3):
+                OrderProduct.objects.create(
+                    order=order, style_name='Tee', style_number=f'T{j}', quantity=10, unit_price=2
+                )
+            if i % 2:
+                production = Production.objects.create(order=order)
+                QCReport.objects.create(production=production, type='INLINE')
+                QCReport.objects.create(production=production, type='FINAL')
+                Shipment.objects.create(production=production, courier='DHL')
+
+    def test_list_queries_do_not_grow_with_page(self):
+        # count, orders (+lead/production/shipment joins), products, sizes, qc reports
+        self.create_orders(2)
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+        self.create_orders(10)
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/orders/')
+        self.assertEqual(response.data['count'], 12)
+        with_production = [row for row in response.data['results'] if row['production']]
+        self.assertEqual(len(with_production), 6)
+        self.assertEqual(len(with_production[0]['production']['qc_reports']), 2)
+        self.assertEqual(with_production[0]['production']['shipment']['courier'], 'DHL')
+
+    def test_detail_queries(self):
+        self.create_orders(2)
+        order = Order.objects.filter(production__isnull=False).first()
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/orders/{order.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['products']), 3)
+
+    def test_filters(self):
+        self.create_orders(3)
+        Order.objects.filter(pk=Order.objects.first().pk).update(status='SHIPPED')
+        response = self.client.get('/api/orders/', {'status': 'SHIPPED,DELIVERED'})
+        self.assertEqual(response.data['count'], 1)
+        response = self.client.get('/api/orders/', {'commercial_term': 'FOB'})
+        self.assertEqual(response.data['count'], 0)
+
+
+class OrderLineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        cls.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+        self.order = Order.objects.create(lead=self.lead, buyer_name='Buyer', buyer_email='buyer@example.com')
+
+    def test_bulk_lines_update_total(self):
+        lines = [
+            {'style_name': 'Tee', 'style_number': f'T{i}', 'quantity': 3, 'unit_price': '0.10'}
+            for i in range(200)
+        ]
+        # order lookup, savepoint, 2 INSERT batches (SQLite variable limit), no size
+        # rows, total UPDATE, release, refresh of the total
+        with self.assertNumQueries(7):
+            response = self.client.post(f'/api/orders/{self.order.pk}/lines/', lines, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_amount'], '60.00')
+
+        response = self.client.post(
+            f'/api/orders/{self.order.pk}/lines/', {'items': lines[:2], 'replace': True}, format='json'
+        )
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.products.count(), 2)
+        self.assertEqual(str(self.order.total_amount), '0.60')
+
+    def test_reconcile_repairs_drift(self):
+        from django.core.management import call_command
+        from .services import drifted_lines, drifted_orders
+
+        self.client.post(
+            f'/api/orders/{self.order.pk}/lines/',
+            [{'style_name': 'Tee', 'style_number': 'T1', 'quantity': 3, 'unit_price': '0.10'}],
+            format='json',
+        )
+        self.assertFalse(drifted_lines().exists())
+        self.assertFalse(drifted_orders().exists())
+
+        OrderProduct.objects.update(total_price=5)
+        Order.objects.update(total_amount=99)
+        self.assertEqual(drifted_orders().count(), 1)
+        call_command('reconcile_order_totals', stdout=open('/dev/null', 'w'))
+        self.order.refresh_from_db()
+        self.assertEqual(str(self.order.total_amount), '0.30')
+        self.assertFalse(drifted_lines().exists())
+
+
+class OrderSizeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        cls.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def test_parse_size_breakdown(self):
+        from .sizes import parse_size_breakdown
+
+        self.assertEqual(parse_size_breakdown('S:10, M:20, L:15'), {'S': 10, 'M': 20, 'L': 15})
+        self.assertEqual(parse_size_breakdown('s-10; m = 5 | xl x 3\n2XL 4'), {'S': 10, 'M': 5, 'XL': 3, '2XL': 4})
+        self.assertEqual(parse_size_breakdown('S/M:10, L/XL: 5; 28/30: 10'), {'S/M': 10, 'L/XL': 5, '28/30': 10})
+        self.assertEqual(parse_size_breakdown('10 S, 5pcs S, ???'), {'S': 15})
+        self.assertEqual(parse_size_breakdown(''), {})
+
+    def test_lines_with_unreadable_sizes_are_rejected(self):
+        order = Order.objects.create(lead=self.lead, buyer_name='A', buyer_email='a@example.com')
+        line = {'style_name': 'Tee', 'style_number': 'T1', 'quantity': 15, 'unit_price': '2'}
+        response = self.client.post(
+            f'/api/orders/{order.pk}/lines/', [{**line, 'size_breakdown': 'S:10, M twenty'}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(OrderProduct.objects.filter(order=order).exists())
+
+        response = self.client.post(
+            f'/api/orders/{order.pk}/lines/', [{**line, 'size_breakdown': 'S/M:10, L:5'}], format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            dict(OrderSize.objects.filter(line__order=order).values_list('size', 'quantity')), {'S/M': 10, 'L': 5}
+        )
+
+    def test_size_totals(self):
+        shipped = Order.objects.create(lead=self.lead, buyer_name='A', buyer_email='a@example.com', status='SHIPPED')
+        production = Order.objects.create(lead=self.lead, buyer_name='B', buyer_email='b@example.com', status='PRODUCTION')
+        OrderProduct.objects.create(order=shipped, style_name='Tee', style_number='T1', quantity=30,
+                                    unit_price=2, size_breakdown='S:10, XL:20')
+        self.client.post(f'/api/orders/{production.pk}/lines/', [
+            {'style_name': 'Tee', 'style_number': 'T1', 'quantity': 15, 'unit_price': '2', 'size_breakdown': 'XL:5, M:10'},
+            {'style_name': 'Polo', 'style_number': 'P1', 'quantity': 7, 'unit_price': '3', 'size_breakdown': 'xl-7'},
+        ], format='json')
+
+        response = self.client.get('/api/orders/size-totals/')
+        self.assertEqual(
+            {row['size']: row['quantity'] for row in response.data['data']}, {'S': 10, 'M': 10, 'XL': 32}
+        )
+
+        response = self.client.get('/api/orders/size-totals/', {'status': 'PRODUCTION', 'group_by': 'style,size'})
+        self.assertEqual(
+            [(row['style'], row['size'], row['quantity']) for row in response.data['data']],
+            [('P1', 'XL', 7), ('T1', 'M', 10), ('T1', 'XL', 5)],
+        )
+
+        response = self.client.get('/api/orders/size-totals/', {'group_by': 'period', 'period': 'month'})
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['data'][0]['quantity'], 52)
+
+        response = self.client.get('/api/orders/size-totals/', {'group_by': 'colour'})
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.seller = User.objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        cls.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def test_status_changes_are_logged_and_rolled_up(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .events import rebuild_durations, transition_orders
+        from .models import OrderEvent, StatusDuration
+
+        response = self.client.post('/api/orders/', {
+            'lead': self.lead.pk, 'buyer_name': 'A', 'buyer_email': 'a@example.com',
+        }, format='json')
+        order = Order.objects.get(pk=response.data['id'])
+        self.client.patch(f'/api/orders/{order.pk}/', {'status': 'ADVANCE_RECEIVED'}, format='json')
+
+        order.refresh_from_db()
+        self.assertIsNotNone(order.advance_date)
+        events = list(order.events.order_by('at', 'id'))
+        self.assertEqual([(e.from_status, e.status) for e in events], [('', 'PI_GENERATED'), ('PI_GENERATED', 'ADVANCE_RECEIVED')])
+        self.assertEqual(events[1].actor, self.seller)
+
+        later = timezone.now() + timedelta(days=3)
+        others = [
+            Order.objects.create(lead=self.lead, buyer_name=f'B{i}', buyer_email='b@example.com', status='ADVANCE_RECEIVED')
+            for i in range(3)
+        ]
+        changed = transition_orders(Order.objects.filter(status='ADVANCE_RECEIVED'), 'PRODUCTION', at=later)
+        self.assertEqual(len(changed), 4)
+        self.assertEqual(OrderEvent.objects.filter(status='PRODUCTION').count(), 4)
+
+        rollup = StatusDuration.objects.get(status='ADVANCE_RECEIVED')
+        self.assertEqual(rollup.count, 4)
+        self.assertAlmostEqual(rollup.average_days, 3, places=2)
+        before = list(StatusDuration.objects.values_list('status', 'count', 'total_seconds').order_by('status'))
+        rebuild_durations()
+        after = list(StatusDuration.objects.values_list('status', 'count', 'total_seconds').order_by('status'))
+        self.assertEqual(before, after)
+
+        response = self.client.get(f'/api/orders/{others[0].pk}/timeline/')
+        self.assertEqual([row['status'] for row in response.data['data']], ['ADVANCE_RECEIVED', 'PRODUCTION'])
+        self.assertTrue(response.data['data'][-1]['current'])
+
+        response = self.client.get('/api/orders/cycle-times/')
+        days = {row['status']: row['average_days'] for row in response.data['data']}
+        self.assertAlmostEqual(days['ADVANCE_RECEIVED'], 3, places=1)
+
+    def test_cycle_times_reject_invalid_dates(self):
+        for query in [{'from': '2026-02-30'}, {'to': 'last week'}]:
+            response = self.client.get('/api/orders/cycle-times/', query)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/orders/cycle-times/', {'from': '2026-02-14', 'to': '2026-03-01'})
+        self.assertEqual((response.status_code, response.data['data']), (200, []))
+
+    def test_events_are_append_only(self):
+        order = Order.objects.create(lead=self.lead, buyer_name='A', buyer_email='a@example.com')
+        event = order.events.get()
+        with self.assertRaises(ValueError):
+            event.save()
+
+
+def fake_pdf(html):
+    return html.encode()
+
+
+@mock.patch.object(documents, '_render_pdf', fake_pdf)
+class OrderDocumentTests(TestCase):
+    """Documents are content-addressed; only the command owns a render pool"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+        self.draft = Order.objects.create(lead=lead, buyer_name='Draft', buyer_email='buyer@example.com', total_amount=10)
+        self.shipped = Order.objects.create(
+            lead=lead, buyer_name='Shipped', buyer_email='buyer@example.com', total_amount=10, status='SHIPPED'
+        )
+        for order in (self.draft, self.shipped):
+            OrderProduct.objects.create(order=order, style_name='Tee', style_number='T1', quantity=5, unit_price=2)
+
+    def render(self, orders=None):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            return documents.render_documents(pool, orders or documents.pending_orders())
+
+    def test_unchanged_documents_are_not_rendered_again(self):
+        self.assertEqual(self.render(), (4, 0))
+        self.shipped.refresh_from_db()
+        self.assertTrue(self.shipped.invoice_url.name.startswith('documents/invoices/'))
+        self.assertIn(b'Shipped', self.shipped.pi_url.read())
+        self.assertEqual(Order.objects.get(pk=self.draft.pk).invoice_url.name, '')
+        self.assertEqual(self.render(), (0, 0))
+        Order.objects.update(pi_url='')
+        self.assertEqual(self.render(), (0, 2))
+        Order.objects.filter(pk=self.draft.pk).update(buyer_name='Renamed')
+        self.assertEqual(self.render(), (1, 0))
+
+    def test_admin_action_only_queues(self):
+        admin = get_user_model().objects.create_superuser(email='admin@example.com', username='admin', password='x')
+        self.client.force_login(admin)
+        with mock.patch.object(documents, 'document_pool') as pool:
+            response = self.client.post('/admin/orders/order/', {
+                'action': 'render_documents', '_selected_action': [self.shipped.pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        pool.assert_not_called()
+        self.assertIsNotNone(Order.objects.get(pk=self.shipped.pk).documents_requested_at)
+        self.assertEqual(Order.objects.get(pk=self.shipped.pk).pi_url.name, '')
+
+    def test_command_renders_and_dequeues_queued_orders(self):
+        documents.request_documents(Order.objects.filter(pk=self.shipped.pk))
+        command_pool = ThreadPoolExecutor(max_workers=2)
+        with mock.patch(
+            'orders.management.commands.render_documents.document_pool', return_value=command_pool
+        ):
+            out = StringIO()
+            call_command('render_documents', '--queued', stdout=out)
+        self.assertIn('Rendered 3 document(s)', out.getvalue())
+        self.shipped.refresh_from_db()
+        self.assertIsNone(self.shipped.documents_requested_at)
+        self.assertNotEqual(self.shipped.packing_list_url.name, '')
+        self.assertEqual(Order.objects.get(pk=self.draft.pk).pi_url.name, '')
+
+    def test_requests_after_a_run_started_stay_queued(self):
+        started = timezone.now()
+        Order.objects.filter(pk=self.shipped.pk).update(documents_requested_at=started + timedelta(seconds=1))
+        Order.objects.filter(pk=self.draft.pk).update(documents_requested_at=started - timedelta(seconds=1))
+        documents.clear_requests([self.draft.pk, self.shipped.pk], started)
+        self.assertEqual(list(documents.queued_orders().values_list('pk', flat=True)), [self.shipped.pk])
+
+
+class OrderBundleTests(TestCase):
+    """Order documents are streamed as a stored ZIP in bounded chunks"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        seller = get_user_model().objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(seller)
+        lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+        self.orders = []
+        for index in range(2):
+            order = Order.objects.create(lead=lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=10)
+            order.invoice_url.save('invoice.pdf', ContentFile(b'%PDF invoice ' + bytes([index])))
+            order.awb_url.save('awb.PDF', ContentFile(b'x' * (3 * 1024 * 1024 + index)))
+            production = Production.objects.create(order=order)
+            shipment = Shipment.objects.create(production=production)
+            shipment.packing_list_url.save('packing.pdf', ContentFile(b'packing'))
+            report = QCReport.objects.create(production=production, type='FINAL')
+            report.report_url.save('qc.pdf', ContentFile(b'qc'))
+            self.orders.append((order, report))
+        Order.objects.filter(pk=self.orders[1][0].pk).update(pi_url='documents/pi/missing.pdf')
+
+    def archive(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertIsNone(archive.testzip())
+        return archive, chunks
+
+    def test_single_order_bundle(self):
+        order, report = self.orders[0]
+        response = self.client.get(f'/api/orders/{order.pk}/bundle/')
+        folder = order.pi_number.replace('/', '-')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{folder}.zip"')
+        archive, chunks = self.archive(response)
+        day = timezone.localdate(report.date).isoformat()
+        self.assertEqual(archive.namelist(), [
+            f'{folder}/commercial-invoice.pdf', f'{folder}/awb.pdf', f'{folder}/shipment/packing-list.pdf',
+            f'{folder}/qc/final-{day}-{report.pk}.pdf',
+        ])
+        self.assertEqual(archive.read(f'{folder}/awb.pdf'), b'x' * 3 * 1024 * 1024)
+        self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()))
+        # The 3 MB file is streamed in input-sized pieces, not buffered whole
+        self.assertGreater(len(chunks), 48)
+        self.assertLess(max(len(chunk) for chunk in chunks), CHUNK_SIZE + 1024)
+
+    def test_many_orders_skip_missing_files(self):
+        ids = ','.join(str(order.pk) for order, _ in self.orders)
+        archive, _ = self.archive(self.client.get('/api/orders/bundle/', {'ids': ids}))
+        names = archive.namelist()
+        self.assertEqual(len(names), 8)
+        self.assertFalse(any('proforma-invoice' in name for name in names))
+
+    def test_bundle_many_validates_ids(self):
+        too_many = ','.join(str(pk) for pk in range(1, MAX_BUNDLE_ORDERS + 2))
+        for params, code in [({'ids': 'a'}, 400), ({}, 400), ({'ids': too_many}, 400), ({'ids': '999999'}, 404)]:
+            self.assertEqual(self.client.get('/api/orders/bundle/', params).status_code, code, params)
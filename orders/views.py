@@ -1,3 +1,229 @@
-from django.shortcuts import render
+from django.db.models import Count, DateField, Max, Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.db.models.functions import Trunc
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from .bundles import safe_name, stream_bundle
+from .filters import OrderFilter
+from .events import acting_user
+from .models import Order, OrderSize, StatusDuration
+from .serializers import OrderSerializer, OrderEventSerializer, OrderProductSerializer
+from .services import add_lines
+
+MAX_LINES = 1000
+MAX_BUNDLE_ORDERS = 100
+
+SIZE_GROUPS = {'size': 'size', 'style': 'style_number', 'period': 'period'}
+PERIODS = ['day', 'week', 'month', 'quarter', 'year']
+
+
+def order_queryset():
+    """Orders with everything the order screen shows, in a fixed number of queries"""
+    return Order.objects.select_related('lead', 'production__shipment').prefetch_related(
+        'products__sizes', 'production__qc_reports'
+    )
+
+
+class OrderViewSet(viewsets.ModelViewSet):
+    """
+    Orders / proforma invoices
+    - List/Retrieve: SELLER/ADMIN see all orders, BUYER sees orders from their own leads
+    - Create/Update/Delete: SELLER/ADMIN only
+    - lines: bulk add (or replace) line items; total_amount follows the lines
+    - size-totals: pieces per size / style / period over the filtered orders
+    - timeline: status events of one order; cycle-times: average days per status
+    - bundle: ZIP of the documents of one order (or ?ids=1,2,3), streamed as it is built
+    """
+    serializer_class = OrderSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_class = OrderFilter
+    search_fields = ['pi_number', 'buyer_name', 'buyer_company', 'buyer_email']
+    ordering_fields = ['created_at', 'pi_date', 'shipment_date', 'total_amount', 'status']
+
+    def get_queryset(self):
+        user = self.request.user
+        role = getattr(user, 'role', '').upper()
+        # Aggregates and line inserts don't serialize orders, so skip the prefetches
+        if self.action in ['lines', 'size_totals', 'timeline']:
+            queryset = Order.objects.all()
+        elif self.action in ['bundle', 'bundle_many']:
+            queryset = Order.objects.select_related('production__shipment').prefetch_related('production__qc_reports')
+        else:
+            queryset = order_queryset()
+        if role in ['SELLER', 'ADMIN']:
+            return queryset
+        if role == 'BUYER':
+            return queryset.filter(lead__user=user)
+        return Order.objects.none()
+
+    def check_write_role(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() not in ['SELLER', 'ADMIN']:
+            raise PermissionDenied(detail='Only seller or admin users can manage orders')
+
+    def perform_create(self, serializer):
+        self.check_write_role()
+        with acting_user(self.request.user):
+            serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_write_role()
+        with acting_user(self.request.user):
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_write_role()
+        instance.delete()
+
+    @action(detail=True, methods=['post'])
+    def lines(self, request, pk=None):
+        """Add up to MAX_LINES line items in one insert.
+
+        Expects a JSON list of lines, or {'items': [...], 'replace': true} to
+        replace the existing lines. The order total is recalculated in the
+        same transaction.
+        """
+        self.check_write_role()
+        order = self.get_object()
+
+        replace = False
+        items = request.data
+        if isinstance(items, dict):
+            replace = bool(items.get('replace'))
+            items = items.get('items')
+        if not isinstance(items, list) or not items:
+            return Response({'success': False, 'error': 'Expected a non-empty list of lines'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_LINES:
+            return Response({'success': False, 'error': f'At most {MAX_LINES} lines per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = OrderProductSerializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        objs = add_lines(order, serializer.validated_data, replace=replace)
+
+        return Response({
+            'success': True,
+            'created': len(objs),
+            'total_amount': str(order.total_amount),
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='size-totals')
+    def size_totals(self, request):
+        """Pieces per size, style and/or period, computed in SQL.
+
+        Accepts the same filters as the list (e.g. ?status=PRODUCTION&
+        pi_date_after=2026-10-01) plus group_by=size,style,period (default
+        size) and period=day|week|month|quarter|year (default month, by PI
+        date).
+        """
+        group_by = [key.strip() for key in request.query_params.get('group_by', 'size').split(',') if key.strip()]
+        period = request.query_params.get('period', 'month')
+        if not group_by or any(key not in SIZE_GROUPS for key in group_by):
+            return Response({'success': False, 'error': f'group_by must be one of {", ".join(SIZE_GROUPS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if period not in PERIODS:
+            return Response({'success': False, 'error': f'period must be one of {", ".join(PERIODS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        orders = self.filter_queryset(self.get_queryset()).order_by().values('pk')
+        sizes = OrderSize.objects.filter(order__in=orders)
+        if 'period' in group_by:
+            sizes = sizes.annotate(period=Trunc('order__pi_date', period, output_field=DateField()))
+
+        fields = [SIZE_GROUPS[key] for key in group_by]
+        rows = (
+            sizes.values(*fields)
+            .annotate(quantity=Sum('quantity'), orders=Count('order', distinct=True))
+            .order_by(*fields)
+        )
+        data = [
+            {**{key: row[SIZE_GROUPS[key]] for key in group_by}, 'quantity': row['quantity'], 'orders': row['orders']}
+            for row in rows
+        ]
+        return Response({'success': True, 'data': data}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """Status events of the order, oldest first, with the time spent in each status."""
+        order = self.get_object()
+        events = list(order.events.select_related('actor').order_by('at', 'id'))
+        data = OrderEventSerializer(events, many=True).data
+        now = timezone.now()
+        for row, event, following in zip(data, events, events[1:] + [None]):
+            end = following.at if following else now
+            row['duration_seconds'] = int((end - event.at).total_seconds())
+            row['current'] = following is None
+        return Response({'success': True, 'data': data}, status=status.HTTP_200_OK)
+
+    def bundle_response(self, orders, filename):
+        response = StreamingHttpResponse(stream_bundle(orders), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """PI, invoices, packing lists, AWB and QC report files of the order as one ZIP."""
+        order = self.get_object()
+        return self.bundle_response([order], f'{safe_name(order.pi_number or order.pk)}.zip')
+
+    @action(detail=False, methods=['get'], url_path='bundle')
+    def bundle_many(self, request):
+        """Documents of ?ids=1,2,3 as one ZIP with a folder per order."""
+        try:
+            ids = {int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()}
+        except ValueError:
+            return Response({'success': False, 'error': 'ids must be a comma-separated list of order ids'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not ids or len(ids) > MAX_BUNDLE_ORDERS:
+            return Response({'success': False, 'error': f'Select between 1 and {MAX_BUNDLE_ORDERS} orders'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        orders = list(self.get_queryset().filter(pk__in=ids).order_by('pk'))
+        if not orders:
+            return Response({'success': False, 'error': 'No matching orders'}, status=status.HTTP_404_NOT_FOUND)
+        return self.bundle_response(orders, f'orders-{timezone.localdate().isoformat()}.zip')
+
+    @action(detail=False, methods=['get'], url_path='cycle-times')
+    def cycle_times(self, request):
+        """Average and longest days spent per status, from the pre-aggregated roll-up.
+
+        Optional ?from=YYYY-MM-DD&to=YYYY-MM-DD limit the months in which
+        orders left the status.
+        """
+        self.check_write_role()
+        bounds = {}
+        for param in ('from', 'to'):
+            if request.query_params.get(param):
+                try:
+                    bounds[param] = parse_date(request.query_params[param])
+                except ValueError:
+                    bounds[param] = None
+                if bounds[param] is None:
+                    return Response({'success': False, 'error': f'{param} must be a date (YYYY-MM-DD)'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+        rows = StatusDuration.objects.all()
+        if 'from' in bounds:
+            rows = rows.filter(period__gte=bounds['from'].replace(day=1))
+        if 'to' in bounds:
+            rows = rows.filter(period__lte=bounds['to'])
+
+        totals = rows.values('status').annotate(
+            orders=Sum('count'), seconds=Sum('total_seconds'), longest=Max('max_seconds')
+        ).order_by('status')
+        data = [
+            {
+                'status': row['status'],
+                'orders': row['orders'],
+                'average_days': round(row['seconds'] / row['orders'] / 86400, 2) if row['orders'] else None,
+                'max_days': round(row['longest'] / 86400, 2),
+            }
+            for row in totals
+        ]
+        return Response({'success': True, 'data': data}, status=status.HTTP_200_OK)
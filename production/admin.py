@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Production, QCReport, Shipment
+from .models import (
+    DefectCode, Production, ProductionApproval, ProductionLine, ProductionStage, QCReport, Shipment, StagePlan,
+)
 
 
 class QCReportInline(admin.TabularInline):
@@ -12,17 +14,28 @@ class ShipmentInline(admin.StackedInline):
     max_num = 1
 
 
+class ProductionStageInline(admin.TabularInline):
+    model = ProductionStage
+    extra = 0
+    can_delete = False
+    readonly_fields = ['stage', 'status', 'progress', 'start_date', 'end_date', 'updated_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Production)
 class ProductionAdmin(admin.ModelAdmin):
     list_display = ['order', 'created_at']
     search_fields = ['order__pi_number']
-    inlines = [QCReportInline, ShipmentInline]
+    inlines = [ProductionStageInline, QCReportInline, ShipmentInline]
 
 
 @admin.register(QCReport)
 class QCReportAdmin(admin.ModelAdmin):
-    list_display = ['production', 'type', 'status', 'date', 'aql']
-    list_filter = ['type', 'status', 'date']
+    list_display = ['production', 'type', 'status', 'date', 'aql', 'sample_size', 'accept_number', 'reject_number']
+    list_filter = ['type', 'status', 'severity', 'date']
+    readonly_fields = ['sample_size', 'accept_number', 'reject_number']
 
 
 @admin.register(Shipment)
@@ -30,3 +43,38 @@ class ShipmentAdmin(admin.ModelAdmin):
     list_display = ['production', 'courier', 'tracking_number', 'status', 'eta']
     list_filter = ['status']
     search_fields = ['tracking_number', 'courier']
+
+
+@admin.register(ProductionStage)
+class ProductionStageAdmin(admin.ModelAdmin):
+    list_display = ['order', 'stage', 'status', 'progress', 'start_date', 'end_date']
+    list_filter = ['stage', 'status']
+    search_fields = ['order__pi_number']
+
+
+@admin.register(ProductionApproval)
+class ProductionApprovalAdmin(admin.ModelAdmin):
+    list_display = ['order', 'approval', 'status', 'date']
+    list_filter = ['approval', 'status']
+    search_fields = ['order__pi_number']
+
+
+@admin.register(DefectCode)
+class DefectCodeAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'created_at']
+    search_fields = ['code', 'name']
+
+
+@admin.register(ProductionLine)
+class ProductionLineAdmin(admin.ModelAdmin):
+    list_display = ['name', 'stage', 'daily_capacity', 'is_active']
+    list_filter = ['stage', 'is_active']
+    search_fields = ['name']
+
+
+@admin.register(StagePlan)
+class StagePlanAdmin(admin.ModelAdmin):
+    list_display = ['order', 'stage', 'line', 'quantity', 'start_date', 'end_date', 'due_date', 'is_late']
+    list_filter = ['stage', 'is_late', 'line']
+    search_fields = ['order__pi_number']
+    readonly_fields = ['planned_at']
@@ -0,0 +1,212 @@
+"""
+ISO 2859-1 single sampling plans.
+
+The master tables (II-A normal, II-B tightened, II-C reduced) are diagonal:
+the cell for sample size code letter ``i`` and AQL ``j`` only depends on
+``i + j``. Each table is therefore encoded as one short sequence of
+Ac/Re pairs and arrows, and ``PLANS`` is expanded from it at import time
+with every arrow already followed. Looking up a plan is a bisect over the
+15 lot size ranges plus one dict access.
+
+Only the AQLs used for garments (0.010 to 6.5) and the general inspection
+levels I, II and III are covered.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+AQLS = [Decimal(value) for value in [
+    '0.010', '0.015', '0.025', '0.040', '0.065', '0.10', '0.15', '0.25',
+    '0.40', '0.65', '1.0', '1.5', '2.5', '4.0', '6.5',
+]]
+AQL_INDEX = {aql: index for index, aql in enumerate(AQLS)}
+
+LEVELS = ['I', 'II', 'III']
+SEVERITIES = ['NORMAL', 'TIGHTENED', 'REDUCED']
+
+LETTERS = 'ABCDEFGHJKLMNPQRS'
+
+# Table I: upper bound of each lot size range -> code letter for levels I, II, III
+LOT_SIZES = [
+    (8, 'AAB'), (15, 'ABC'), (25, 'BCD'), (50, 'CDE'), (90, 'CEF'),
+    (150, 'DFG'), (280, 'EGH'), (500, 'FHJ'), (1200, 'GJK'), (3200, 'HKL'),
+    (10000, 'JLM'), (35000, 'KMN'), (150000, 'LNP'), (500000, 'MPQ'), (None, 'NQR'),
+]
+_LOT_BOUNDS = [bound for bound, _ in LOT_SIZES[:-1]]
+
+SAMPLE_SIZES = {
+    'NORMAL': [2, 3, 5, 8, 13, 20, 32, 50, 80, 125, 200, 315, 500, 800, 1250, 2000],
+    'TIGHTENED': [2, 3, 5, 8, 13, 20, 32, 50, 80, 125, 200, 315, 500, 800, 1250, 2000, 3150],
+    'REDUCED': [2, 2, 2, 3, 5, 8, 13, 20, 32, 50, 80, 125, 200, 315, 500, 800],
+}
+
+UP, DOWN = 'UP', 'DOWN'
+
+# Table diagonal (letter index + AQL index) -> (Ac, Re) or arrow; cells before
+# the first entry point down, cells after the last point up
+DIAGONALS = {
+    'NORMAL': (14, [
+        (0, 1), UP, DOWN, (1, 2), (2, 3), (3, 4), (5, 6), (7, 8), (10, 11), (14, 15), (21, 22),
+    ]),
+    'TIGHTENED': (16, [
+        (0, 1), DOWN, (1, 2), (2, 3), (3, 4), (5, 6), (8, 9), (12, 13), (18, 19),
+    ]),
+    'REDUCED': (14, [
+        (0, 1), UP, DOWN, (0, 2), (1, 3), (1, 4), (2, 5), (3, 6), (5, 8), (7, 10), (10, 13),
+    ]),
+}
+
+# Letter S only exists in the tightened table, for AQL 0.010
+EXCEPTIONS = {('TIGHTENED', 16, 0): (1, 2)}
+
+SamplingPlan = namedtuple('SamplingPlan', ['code_letter', 'sample_size', 'accept', 'reject'])
+
+
+def _cell(severity, letter, aql):
+    if (severity, letter, aql) in EXCEPTIONS:
+        return EXCEPTIONS[(severity, letter, aql)]
+    if letter >= len(SAMPLE_SIZES['NORMAL']):
+        return UP
+    start, cells = DIAGONALS[severity]
+    diagonal = letter + aql
+    if diagonal < start:
+        return DOWN
+    if diagonal >= start + len(cells):
+        return UP
+    return cells[diagonal - start]
+
+
+def _resolve(severity, letter, aql):
+    sizes = SAMPLE_SIZES[severity]
+    cell = _cell(severity, letter, aql)
+    if cell not in (UP, DOWN):
+        return SamplingPlan(LETTERS[letter], sizes[letter], *cell)
+    step = 1 if cell == DOWN else -1
+    # If the arrow runs off the table (very large lots at tiny AQLs), use the
+    # nearest plan in the other direction
+    for direction in (step, -step):
+        row = letter + direction
+        while 0 <= row < len(sizes):
+            cell = _cell(severity, row, aql)
+            if cell not in (UP, DOWN):
+                return SamplingPlan(LETTERS[row], sizes[row], *cell)
+            row += direction
+    raise ValueError(f'No {severity} plan for letter {LETTERS[letter]} at AQL {AQLS[aql]}')
+
+
+def _build():
+    plans = {}
+    for severity in SEVERITIES:
+        for letter in range(len(SAMPLE_SIZES['NORMAL'])):
+            for aql in range(len(AQLS)):
+                plans[(severity, LETTERS[letter], AQLS[aql])] = _resolve(severity, letter, aql)
+    return plans
+
+
+# (severity, code letter, AQL) -> SamplingPlan, arrows already followed
+PLANS = _build()
+
+
+def to_aql(value):
+    """Standard AQL for ``value`` (``2.5``, ``'2.50'``, ``Decimal``), or None."""
+    try:
+        aql = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+    return aql if aql in AQL_INDEX else None
+
+
+def code_letter(lot_size, level='II'):
+    if lot_size < 2:
+        raise ValueError('Lot size must be at least 2')
+    if level not in LEVELS:
+        raise ValueError(f'Inspection level must be one of {", ".join(LEVELS)}')
+    return LOT_SIZES[bisect_left(_LOT_BOUNDS, lot_size)][1][LEVELS.index(level)]
+
+
+def sampling_plan(lot_size, aql, level='II', severity='NORMAL'):
+    """
+    Sample size and Ac/Re for a lot. When the sample is at least as large as
+    the lot, every piece is inspected with the same Ac/Re.
+    """
+    standard = to_aql(aql)
+    if standard is None:
+        raise ValueError(f'AQL must be one of {", ".join(str(value) for value in AQLS)}')
+    if severity not in SEVERITIES:
+        raise ValueError(f'Inspection severity must be one of {", ".join(SEVERITIES)}')
+    plan = PLANS[(severity, code_letter(lot_size, level), standard)]
+    if plan.sample_size >= lot_size:
+        plan = plan._replace(sample_size=lot_size)
+    return plan
+
+
+def verdict(plan, defects):
+    """'PASS' or 'FAIL' for ``defects`` found in the sample."""
+    # Reduced plans have a gap between Ac and Re: such lots are accepted, but
+    # inspection returns to normal
+    return 'PASS' if defects < plan.reject else 'FAIL'
+
+
+def defect_total(defects):
+    """Sum of the ``count`` values of a QC report's ``defects`` JSON."""
+    total = 0
+    for entry in defects if isinstance(defects, list) else []:
+        if isinstance(entry, dict):
+            try:
+                total += max(int(entry.get('count') or 0), 0)
+            except (TypeError, ValueError):
+                continue
+    return total
+
+
+def order_quantities(order_ids):
+    """``{order id: pieces}`` from the order lines."""
+    from django.db.models import Sum
+
+    from orders.models import OrderProduct
+
+    return dict(
+        OrderProduct.objects.filter(order_id__in=order_ids)
+        .values_list('order_id')
+        .annotate(pieces=Sum('quantity'))
+        .order_by()
+    )
+
+
+def apply_plan(report, lot_size):
+    """
+    Store the sampling plan on ``report`` and, once it has results
+    (inspected pieces or defects), set its status from the defect count.
+    Reports with a non-standard AQL or no lot size get no plan.
+    Returns the plan or None.
+    """
+    lot_size = report.lot_size or lot_size
+    if not lot_size or lot_size < 2 or to_aql(report.aql) is None:
+        report.sample_size = report.accept_number = report.reject_number = None
+        return None
+    plan = sampling_plan(lot_size, report.aql, report.inspection_level, report.severity)
+    report.sample_size, report.accept_number, report.reject_number = plan.sample_size, plan.accept, plan.reject
+    if report.inspected_quantity or defect_total(report.defects):
+        report.status = verdict(plan, defect_total(report.defects))
+    return plan
+
+
+def evaluate_reports(reports, batch_size=500):
+    """
+    Apply sampling plans to many QC reports with one lot size query and one
+    ``bulk_update``; returns ``{'PASS': n, 'FAIL': n, 'PENDING': n, 'skipped': n}``.
+    """
+    from .models import QCReport
+
+    reports = list(reports.select_related('production') if hasattr(reports, 'select_related') else reports)
+    quantities = order_quantities({report.production.order_id for report in reports})
+    summary = {'PASS': 0, 'FAIL': 0, 'PENDING': 0, 'skipped': 0}
+    for report in reports:
+        if apply_plan(report, quantities.get(report.production.order_id)) is None:
+            summary['skipped'] += 1
+        else:
+            summary[report.status] = summary.get(report.status, 0) + 1
+    QCReport.objects.bulk_update(
+        reports, ['sample_size', 'accept_number', 'reject_number', 'status'], batch_size=batch_size
+    )
+    return summary
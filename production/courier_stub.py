@@ -0,0 +1,111 @@
+"""
+Stand-in courier tracking server for tests and load testing.
+
+Speaks the batch protocol of ``production.couriers.JsonCourier``. Every
+tracking number gets a stable status and ETA derived from its hash, so
+repeated syncs are deterministic. Optional latency, a request rate limit
+(answered with 429 and ``Retry-After``) and random 5xx errors make it
+usable for exercising the poller's pooling and retry behaviour::
+
+    server = start_server(port=0, latency=0.05)   # background thread
+    url = f'http://127.0.0.1:{server.server_port}/track'
+    ...
+    server.shutdown()
+"""
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.utils import timezone
+
+STATUSES = ['PENDING', 'PICKED_UP', 'IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED']
+MAX_NUMBERS = 200
+
+
+def tracking_state(number, today=None):
+    """Stable ``(status, eta)`` for a tracking number."""
+    seed = int.from_bytes(hashlib.sha256(number.encode()).digest()[:4], 'big')
+    eta = (today or timezone.localdate()) + timedelta(days=seed % 10)
+    return STATUSES[seed % len(STATUSES)], eta
+
+
+class CourierStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so client pooling is exercised
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/track':
+            return self._send(404, {'error': 'Not found'})
+        if not server.allow():
+            return self._send(429, {'error': 'Rate limit exceeded'}, {'Retry-After': '1'})
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(503, {'error': 'Try again'})
+        numbers = [n for n in parse_qs(url.query).get('tracking_numbers', [''])[0].split(',') if n]
+        if len(numbers) > MAX_NUMBERS:
+            return self._send(400, {'error': f'At most {MAX_NUMBERS} tracking numbers per request'})
+        if server.latency:
+            time.sleep(server.latency)
+        shipments = []
+        for number in numbers:
+            status, eta = tracking_state(number)
+            shipments.append({'tracking_number': number, 'status': status, 'eta': eta.isoformat()})
+        self._send(200, {'shipments': shipments})
+
+    def _send(self, code, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class CourierStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, rate=None, error_rate=0.0, verbose=False):
+        super().__init__(address, CourierStubHandler)
+        self.latency = latency
+        self.rate = rate  # requests per second, None for unlimited
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self._tokens = rate or 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Clients that time out close the connection before the answer is written
+        if self.verbose or not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """Run a stub server in a daemon thread; ``port=0`` picks a free port."""
+    server = CourierStubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,252 @@
+"""
+Courier tracking sync.
+
+``sync_shipments()`` reads open shipments in chunks, groups their tracking
+numbers per courier and polls the couriers' batch tracking endpoints
+concurrently with asyncio over one pooled ``httpx.AsyncClient``. Each
+courier has its own rate limit (``'10/second'``, same format as
+``THROTTLE_RATES``) and concurrency cap, and 429/5xx answers are retried
+with backoff. Changed shipments are written with one ``bulk_update`` per
+chunk, and the matching orders are moved to SHIPPED/DELIVERED through
+``orders.events.transition_orders`` so the status history stays complete.
+
+Couriers are configured in ``COURIER_TRACKING``::
+
+    COURIER_TRACKING = {
+        'dhl': {'url': 'https://tracking.example.com/v1/track', 'rate': '5/second', 'batch_size': 50,
+                'headers': {'Authorization': 'Bearer ...'}},
+    }
+
+Keys match ``Shipment.courier`` case-insensitively. ``JsonCourier`` speaks
+the simple batch protocol of ``production/courier_stub.py``; couriers with
+other APIs get a subclass set as ``'class'``.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+import httpx
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.module_loading import import_string
+
+from backend.throttling import parse_rate
+
+logger = logging.getLogger(__name__)
+
+# Courier status -> Shipment.status
+COURIER_STATUSES = {
+    'PICKED_UP': 'SHIPPED',
+    'IN_TRANSIT': 'SHIPPED',
+    'SHIPPED': 'SHIPPED',
+    'OUT_FOR_DELIVERY': 'SHIPPED',
+    'DELIVERED': 'DELIVERED',
+}
+
+# Order statuses in flow order; orders only ever move forward
+ORDER_FLOW = ['PI_GENERATED', 'ADVANCE_RECEIVED', 'PRODUCTION', 'QC_PASSED', 'SHIPPED', 'DELIVERED']
+
+MAX_ATTEMPTS = 4
+CHUNK_SIZE = 2000
+
+
+class CourierError(Exception):
+    pass
+
+
+def courier_key(name):
+    return str(name or '').strip().lower()
+
+
+class RateLimiter:
+    """
+    Token bucket as a schedule: each call reserves the next free slot, so
+    ``burst`` requests go out at once and the rest are spaced evenly.
+    """
+
+    def __init__(self, rate):
+        self.burst, per_second = parse_rate(rate)
+        self.interval = 1 / per_second
+        self.next_slot = 0.0
+
+    def delay(self):
+        now = time.monotonic()
+        self.next_slot = max(self.next_slot, now) + self.interval
+        return max(self.next_slot - self.burst * self.interval - now, 0)
+
+    async def acquire(self):
+        wait = self.delay()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class JsonCourier:
+    """
+    Batch JSON tracking API::
+
+        GET <url>?tracking_numbers=A,B,C
+        -> {"shipments": [{"tracking_number": "A", "status": "IN_TRANSIT", "eta": "2026-05-01"}, ...]}
+    """
+
+    def __init__(self, name, url, rate='5/second', batch_size=50, concurrency=4, headers=None, timeout=30):
+        self.name = name
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+
+    def build_request(self, client, numbers):
+        return client.build_request(
+            'GET', self.url, params={'tracking_numbers': ','.join(numbers)}, headers=self.headers, timeout=self.timeout
+        )
+
+    def parse(self, payload):
+        """Yield ``(tracking number, courier status, eta)`` from a response body."""
+        for item in payload.get('shipments') or []:
+            eta = item.get('eta')
+            yield (
+                str(item.get('tracking_number') or ''),
+                str(item.get('status') or '').upper(),
+                parse_date(str(eta)[:10]) if eta else None,
+            )
+
+    async def track(self, client, slots, numbers):
+        """``{tracking number: (status, eta)}`` for one batch."""
+        for attempt in range(MAX_ATTEMPTS):
+            await self.limiter.acquire()
+            async with slots:
+                response = await client.send(self.build_request(client, numbers))
+            if response.status_code == 429 or response.status_code >= 500:
+                try:
+                    wait = float(response.headers.get('Retry-After', ''))
+                except ValueError:
+                    wait = 2 ** attempt
+                await asyncio.sleep(min(wait, 60))
+                continue
+            response.raise_for_status()
+            return {number: (status, eta) for number, status, eta in self.parse(response.json())}
+        raise CourierError(f'{self.name}: gave up after {MAX_ATTEMPTS} attempts')
+
+
+def couriers():
+    """Configured courier clients by ``courier_key``."""
+    clients = {}
+    for name, options in getattr(settings, 'COURIER_TRACKING', {}).items():
+        options = dict(options)
+        cls = import_string(options.pop('class', 'production.couriers.JsonCourier'))
+        clients[courier_key(name)] = cls(name, **options)
+    return clients
+
+
+async def poll(batches, connections):
+    """
+    Track ``[(courier, [numbers])]`` concurrently; returns
+    ``({(courier name, number): (status, eta)}, failed batch count)``.
+    """
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    slots = {}
+    results = {}
+    failed = 0
+    async with httpx.AsyncClient(limits=limits) as client:
+        async def run(courier, numbers):
+            if courier.name not in slots:
+                slots[courier.name] = asyncio.Semaphore(courier.concurrency)
+            try:
+                return courier, await courier.track(client, slots[courier.name], numbers)
+            except (httpx.HTTPError, CourierError, ValueError) as e:
+                logger.warning('Tracking %s batch of %d failed: %s', courier.name, len(numbers), e)
+                return courier, None
+
+        for courier, tracked in await asyncio.gather(*(run(courier, numbers) for courier, numbers in batches)):
+            if tracked is None:
+                failed += 1
+                continue
+            for number, value in tracked.items():
+                results[(courier.name, number)] = value
+    return results, failed
+
+
+def _advance_orders(shipments, at):
+    """Move orders forward to the status implied by their shipment."""
+    from orders.events import transition_orders
+    from orders.models import Order
+
+    targets = {shipment.production.order_id: shipment.status for shipment in shipments}
+    moved = 0
+    by_status = defaultdict(list)
+    for order in Order.objects.filter(pk__in=list(targets)).exclude(status='CANCELLED'):
+        target = targets[order.pk]
+        if order.status in ORDER_FLOW and ORDER_FLOW.index(order.status) < ORDER_FLOW.index(target):
+            by_status[target].append(order)
+    for status, orders in by_status.items():
+        moved += len(transition_orders(orders, status, at=at, note='Courier tracking'))
+    return moved
+
+
+def _sync_chunk(shipments, clients, summary):
+    from .models import Shipment
+
+    batches = []
+    by_courier = defaultdict(set)
+    for shipment in shipments:
+        by_courier[courier_key(shipment.courier)].add(shipment.tracking_number.strip())
+    for key, numbers in by_courier.items():
+        courier = clients[key]
+        numbers = sorted(numbers)
+        for start in range(0, len(numbers), courier.batch_size):
+            batches.append((courier, numbers[start:start + courier.batch_size]))
+
+    connections = getattr(settings, 'COURIER_TRACKING_CONNECTIONS', 20)
+    results, failed = asyncio.run(poll(batches, connections))
+    summary['requests'] += len(batches)
+    summary['failed'] += failed
+
+    now = timezone.now()
+    changed = []
+    for shipment in shipments:
+        tracked = results.get((clients[courier_key(shipment.courier)].name, shipment.tracking_number.strip()))
+        if tracked is None:
+            continue
+        summary['polled'] += 1
+        courier_status, eta = tracked
+        status = COURIER_STATUSES.get(courier_status, shipment.status)
+        eta = eta or shipment.eta
+        if (status, eta) != (shipment.status, shipment.eta):
+            shipment.status, shipment.eta, shipment.updated_at = status, eta, now
+            changed.append(shipment)
+    if changed:
+        Shipment.objects.bulk_update(changed, ['status', 'eta', 'updated_at'], batch_size=500)
+        summary['updated'] += len(changed)
+        summary['orders'] += _advance_orders([s for s in changed if s.status in ORDER_FLOW], now)
+
+
+def sync_shipments(shipments=None, chunk_size=CHUNK_SIZE):
+    """
+    Poll tracking for every undelivered shipment (or ``shipments``, a
+    queryset) whose courier is configured; returns counts of requests,
+    polled/updated shipments, moved orders and failed batches.
+    """
+    from .models import Shipment
+
+    clients = couriers()
+    summary = {'requests': 0, 'polled': 0, 'updated': 0, 'orders': 0, 'failed': 0, 'skipped': 0}
+    queryset = (Shipment.objects.all() if shipments is None else shipments).exclude(status='DELIVERED').exclude(tracking_number='')
+
+    ids = []
+    for pk, courier in queryset.order_by('pk').values_list('pk', 'courier'):
+        if courier_key(courier) in clients:
+            ids.append(pk)
+        else:
+            summary['skipped'] += 1
+    for start in range(0, len(ids), chunk_size):
+        chunk = list(
+            Shipment.objects.filter(pk__in=ids[start:start + chunk_size])
+            .select_related('production')
+            .only('id', 'courier', 'tracking_number', 'status', 'eta', 'updated_at', 'production__order_id')
+        )
+        _sync_chunk(chunk, clients, summary)
+    return summary
@@ -0,0 +1,274 @@
+"""
+QC defect analytics.
+
+On every ``QCReport`` save its ``defects`` JSON (``[{description, count}]``)
+is normalised into ``DefectCode`` rows and written to ``DefectFact`` with
+the order, supplier (the order's manufacturing PO supplier), style, QC type
+and week copied in.
+
+``DefectFrame`` loads the facts matching a filter as NumPy arrays once and
+answers Pareto, rate-per-1000 and weekly trend questions with
+``np.unique``/``np.bincount`` instead of Python loops. Endpoint results are
+cached under a version number that is bumped whenever a report is saved.
+"""
+import hashlib
+import json
+import re
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+# Query parameter -> DefectFact column
+DIMENSIONS = {
+    'defect': 'defect_id',
+    'supplier': 'supplier_id',
+    'style': 'style_number',
+    'qc_type': 'qc_type',
+    'week': 'week',
+    'order': 'order_id',
+}
+
+VERSION_KEY = 'defect-analytics:version'
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def _singular(word):
+    if len(word) > 4 and word.endswith(('ches', 'shes', 'sses', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def normalize_description(description):
+    """``'Broken  Stitches!'`` -> ``('broken-stitch', 'Broken stitch')``; empty text gives None."""
+    words = [_singular(word) for word in _NON_WORD.sub(' ', str(description).lower()).split()]
+    if not words:
+        return None
+    name = ' '.join(words)
+    return slugify(name)[:100], name.capitalize()
+
+
+def _defect_codes(names):
+    """``{code: DefectCode id}`` for ``{code: display name}``, creating missing codes."""
+    from .models import DefectCode
+
+    if not names:
+        return {}
+    DefectCode.objects.bulk_create(
+        [DefectCode(code=code, name=name) for code, name in names.items()],
+        ignore_conflicts=True,
+    )
+    return dict(DefectCode.objects.filter(code__in=list(names)).values_list('code', 'id'))
+
+
+def _order_dimensions(order_ids):
+    """Supplier and single style (if the order has exactly one) per order."""
+    from orders.models import OrderProduct
+    from purchase_orders.models import PurchaseOrder
+
+    suppliers = {}
+    rows = (
+        PurchaseOrder.objects.filter(linked_order_id__in=order_ids, type='MANUFACTURING')
+        .exclude(status='CANCELLED')
+        .order_by('linked_order_id', 'created_at')
+        .values_list('linked_order_id', 'supplier_id')
+    )
+    for order_id, supplier_id in rows:
+        suppliers[order_id] = supplier_id  # latest PO wins
+
+    styles = {}
+    for order_id, style_number in (
+        OrderProduct.objects.filter(order_id__in=order_ids).values_list('order_id', 'style_number').distinct()
+    ):
+        styles.setdefault(order_id, set()).add(style_number)
+    return suppliers, {order_id: next(iter(s)) for order_id, s in styles.items() if len(s) == 1}
+
+
+def record_defects(reports):
+    """Rewrite the fact rows of ``reports`` (QCReport instances) in one transaction."""
+    from .models import DefectFact, QCReport
+
+    reports = list(reports)
+    if not reports:
+        return 0
+    order_ids = dict(
+        QCReport.objects.filter(pk__in=[report.pk for report in reports])
+        .values_list('pk', 'production__order_id')
+    )
+    suppliers, styles = _order_dimensions(set(order_ids.values()))
+
+    parsed = []
+    names = {}
+    for report in reports:
+        entries = []
+        for entry in report.defects if isinstance(report.defects, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            normalized = normalize_description(entry.get('description') or entry.get('name') or '')
+            try:
+                count = max(int(entry.get('count') or 0), 0)
+            except (TypeError, ValueError):
+                count = 0
+            if normalized and count:
+                names.setdefault(*normalized)
+                entries.append((normalized[0], count, str(entry.get('style') or entry.get('style_number') or '')))
+        parsed.append((report, entries))
+    codes = _defect_codes(names)
+
+    facts = []
+    for report, entries in parsed:
+        order_id = order_ids[report.pk]
+        day = timezone.localdate(report.date) if report.date else timezone.localdate()
+        common = dict(
+            report_id=report.pk,
+            order_id=order_id,
+            supplier_id=suppliers.get(order_id),
+            qc_type=report.type,
+            date=day,
+            week=day - timedelta(days=day.weekday()),
+            inspected=report.inspected_quantity or 0,
+        )
+        if not entries:
+            facts.append(DefectFact(defect_id=None, count=0, style_number=styles.get(order_id, ''), **common))
+        for code, count, style in entries:
+            facts.append(DefectFact(
+                defect_id=codes[code], count=count, style_number=style or styles.get(order_id, ''), **common
+            ))
+
+    with transaction.atomic():
+        DefectFact.objects.filter(report_id__in=[report.pk for report in reports]).delete()
+        DefectFact.objects.bulk_create(facts, batch_size=1000)
+        transaction.on_commit(bump_version)
+    return len(facts)
+
+
+class DefectFrame:
+    """Defect facts as column arrays."""
+
+    COLUMNS = [
+        'report_id', 'defect_id', 'supplier_id', 'order_id', 'style_number', 'qc_type', 'week', 'count', 'inspected',
+    ]
+
+    def __init__(self, rows):
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(self.COLUMNS)
+        self.columns = {}
+        for name, values in zip(self.COLUMNS, columns):
+            if name in ('count', 'inspected'):
+                self.columns[name] = np.array(values, dtype=np.int64)
+            elif name in ('report_id', 'defect_id', 'supplier_id', 'order_id'):
+                self.columns[name] = np.array([-1 if value is None else value for value in values], dtype=np.int64)
+            else:
+                self.columns[name] = np.array(values, dtype=object)
+        self.count = self.columns['count']
+        self.inspected = self.columns['inspected']
+        _, self.report_index = np.unique(self.columns['report_id'], return_inverse=True)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        return cls(queryset.order_by().values_list(*cls.COLUMNS))
+
+    def __len__(self):
+        return len(self.count)
+
+    def group(self, dimension):
+        """(labels, inverse index) of ``dimension`` over the rows."""
+        values = self.columns[DIMENSIONS[dimension]]
+        if values.dtype == object:
+            values = values.astype(str)
+        return np.unique(values, return_inverse=True)
+
+    def _inspected(self, inverse, size):
+        # Each report's inspected pieces count once per group it falls in
+        pairs = self.report_index * size + inverse
+        _, first = np.unique(pairs, return_index=True)
+        return np.bincount(inverse[first], weights=self.inspected[first], minlength=size)
+
+    def total_inspected(self):
+        _, first = np.unique(self.report_index, return_index=True)
+        return int(self.inspected[first].sum())
+
+    def totals(self, dimension):
+        """Defects, inspected pieces and defects per 1000 pieces per group."""
+        labels, inverse = self.group(dimension)
+        defects = np.bincount(inverse, weights=self.count, minlength=len(labels))
+        if dimension == 'defect':
+            # Every inspected piece could have had any defect
+            keep = labels >= 0
+            labels, defects = labels[keep], defects[keep]
+            inspected = np.full(len(labels), self.total_inspected(), dtype=np.float64)
+        else:
+            inspected = self._inspected(inverse, len(labels))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(inspected > 0, defects * 1000 / inspected, np.nan)
+        return labels, defects.astype(np.int64), inspected.astype(np.int64), rates
+
+    def pareto(self, limit=None):
+        """Defect codes by count, largest first, with share and cumulative share (%)."""
+        mask = self.columns['defect_id'] >= 0
+        labels, inverse = np.unique(self.columns['defect_id'][mask], return_inverse=True)
+        counts = np.bincount(inverse, weights=self.count[mask], minlength=len(labels)).astype(np.int64)
+        order = np.argsort(-counts, kind='stable')
+        labels, counts = labels[order], counts[order]
+        total = counts.sum()
+        share = counts * 100 / total if total else np.zeros(len(counts))
+        cumulative = np.cumsum(share)
+        if limit:
+            labels, counts, share, cumulative = labels[:limit], counts[:limit], share[:limit], cumulative[:limit]
+        return labels, counts, share, cumulative
+
+    def trend(self, dimension=None):
+        """Weekly defects, inspected pieces and rate, optionally split by ``dimension``."""
+        weeks, week_index = self.group('week')
+        if dimension is None:
+            keys, inverse, split = [None], np.zeros(len(self), dtype=np.int64), 1
+        else:
+            keys, inverse = self.group(dimension)
+            split = len(keys)
+        cells = week_index * split + inverse
+        size = len(weeks) * split
+        defects = np.bincount(cells, weights=self.count, minlength=size)
+        inspected = self._inspected(cells, size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(inspected > 0, defects * 1000 / inspected, np.nan)
+        occupied = np.flatnonzero(np.bincount(cells, minlength=size))
+        return [
+            (weeks[cell // split], keys[cell % split], int(defects[cell]), int(inspected[cell]), rates[cell])
+            for cell in occupied
+        ]
+
+
+# --- caching --------------------------------------------------------------
+
+def analytics_cache():
+    return caches[getattr(settings, 'DEFECT_ANALYTICS_CACHE', 'default')]
+
+
+def bump_version():
+    cache = analytics_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Evicted: a fresh seed cannot collide with a version results were stored under
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def cached(params, compute):
+    """Result of ``compute()`` cached until the next QC report save (at most DEFECT_ANALYTICS_TIMEOUT)."""
+    cache = analytics_cache()
+    version = cache.get_or_set(VERSION_KEY, time.time_ns, None)
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f'defect-analytics:{version}:{digest}'
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, getattr(settings, 'DEFECT_ANALYTICS_TIMEOUT', 3600))
+    return result
@@ -0,0 +1,40 @@
+"""
+Django management command to run the stand-in courier tracking server
+Usage: python manage.py courier_stub [--port 8765] [--latency 0.05] [--rate 100] [--error-rate 0.01]
+
+Point a courier at it for local testing or load tests, e.g.
+COURIER_STUB_URL=http://127.0.0.1:8765/track python manage.py sync_shipments
+"""
+from django.core.management.base import BaseCommand
+
+from production.courier_stub import CourierStubServer
+
+
+class Command(BaseCommand):
+    help = 'Runs a local courier tracking API that answers with stable fake statuses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+        parser.add_argument('--rate', type=float, help='Requests per second before answering 429')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 503')
+        parser.add_argument('--verbose-log', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        server = CourierStubServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            rate=options['rate'],
+            error_rate=options['error_rate'],
+            verbose=options['verbose_log'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Courier stub listening on http://{options['host']}:{server.server_port}/track"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,37 @@
+"""
+Django management command to load confirmed orders onto production lines
+Usage: python manage.py plan_capacity [--date 2026-01-05]
+
+Replaces every StagePlan row with projected stage dates and late flags.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from production.planning import plan_capacity
+
+
+class Command(BaseCommand):
+    help = 'Schedules confirmed orders onto production lines (earliest due date first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Plan as of this date (YYYY-MM-DD), defaults to today')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError('--date must be YYYY-MM-DD')
+
+        started = time.monotonic()
+        summary = plan_capacity(today)
+        self.stdout.write(self.style.SUCCESS(
+            f"Planned {summary['stages']} stage(s) for {summary['orders']} order(s) in "
+            f"{time.monotonic() - started:.1f}s; {summary['late_orders']} order(s) late"
+        ))
+        if summary['unplanned_stages']:
+            self.stdout.write(self.style.WARNING(
+                f"No active line for: {', '.join(summary['unplanned_stages'])}"
+            ))
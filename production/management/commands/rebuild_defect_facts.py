@@ -0,0 +1,31 @@
+"""
+Django management command to rebuild QC defect facts from report JSON
+Usage: python manage.py rebuild_defect_facts [--batch-size 500]
+
+Facts are written whenever a QC report is saved; run this once for reports
+created before defect analytics existed, or after renaming defect codes.
+"""
+from django.core.management.base import BaseCommand
+
+from production.defects import record_defects
+from production.models import QCReport
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds DefectFact rows for every QC report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Reports processed per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        reports = QCReport.objects.order_by('pk').only('pk', 'type', 'date', 'defects', 'inspected_quantity')
+        batch = []
+        facts = 0
+        for report in reports.iterator(chunk_size=batch_size):
+            batch.append(report)
+            if len(batch) >= batch_size:
+                facts += record_defects(batch)
+                batch = []
+        facts += record_defects(batch)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {facts} defect fact row(s)'))
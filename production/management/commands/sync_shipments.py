@@ -0,0 +1,41 @@
+"""
+Django management command to sync shipment status and ETA from courier tracking APIs
+Usage: python manage.py sync_shipments [--courier dhl] [--chunk-size 2000]
+
+Couriers are configured in COURIER_TRACKING; orders move to SHIPPED or
+DELIVERED with their shipments. Run it from cron, e.g. every 30 minutes.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Trim
+
+from production.couriers import sync_shipments
+from production.models import Shipment
+
+
+class Command(BaseCommand):
+    help = 'Polls courier tracking for undelivered shipments and updates shipments and orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courier', help='Only shipments of this courier')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Shipments per poll round and bulk update')
+
+    def handle(self, *args, **options):
+        shipments = Shipment.objects.all()
+        if options['courier']:
+            # Same matching as COURIER_TRACKING keys: trimmed, case-insensitive
+            shipments = shipments.annotate(courier_name=Trim('courier')).filter(
+                courier_name__iexact=options['courier'].strip()
+            )
+
+        started = time.monotonic()
+        summary = sync_shipments(shipments, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Polled {summary['polled']} shipment(s) in {summary['requests']} request(s) "
+            f"({time.monotonic() - started:.1f}s): {summary['updated']} updated, {summary['orders']} order(s) moved"
+        ))
+        if summary['failed']:
+            self.stdout.write(self.style.WARNING(f"{summary['failed']} batch(es) failed; they are retried on the next run"))
+        if summary['skipped']:
+            self.stdout.write(f"{summary['skipped']} shipment(s) skipped: courier not in COURIER_TRACKING")
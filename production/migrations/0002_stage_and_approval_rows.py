@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_backfill_order_events'),
+        ('production', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductionApproval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('approval', models.CharField(help_text='e.g., fabric, color, fit', max_length=50)),
+                ('status', models.CharField(default='PENDING', max_length=20)),
+                ('date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='production_approvals', to='orders.order')),
+                ('production', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_rows', to='production.production')),
+            ],
+            options={
+                'verbose_name': 'Production Approval',
+                'verbose_name_plural': 'Production Approvals',
+                'ordering': ['production', 'id'],
+                'indexes': [models.Index(fields=['approval', 'status'], name='production_approval_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('production', 'approval'), name='unique_production_approval')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductionStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(help_text='e.g., cutting, stitching, finishing', max_length=50)),
+                ('status', models.CharField(default='PENDING', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='production_stages', to='orders.order')),
+                ('production', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_rows', to='production.production')),
+            ],
+            options={
+                'verbose_name': 'Production Stage',
+                'verbose_name_plural': 'Production Stages',
+                'ordering': ['production', 'id'],
+                'indexes': [models.Index(fields=['stage', 'status', 'start_date'], name='production_stage_status_idx'), models.Index(fields=['status', 'updated_at'], name='production_stage_updated_idx')],
+                'constraints': [models.UniqueConstraint(fields=('production', 'stage'), name='unique_production_stage')],
+            },
+        ),
+    ]
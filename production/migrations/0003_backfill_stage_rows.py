@@ -0,0 +1,38 @@
+from django.db import migrations
+
+from production.tracking import approval_rows, stage_rows
+
+BATCH_SIZE = 500
+
+
+def backfill_rows(apps, schema_editor):
+    Production = apps.get_model('production', 'Production')
+    ProductionStage = apps.get_model('production', 'ProductionStage')
+    ProductionApproval = apps.get_model('production', 'ProductionApproval')
+
+    stages, approvals = [], []
+    for production in Production.objects.only('pk', 'order_id', 'stages', 'approvals').iterator(chunk_size=BATCH_SIZE):
+        stages.extend(stage_rows(production, ProductionStage))
+        approvals.extend(approval_rows(production, ProductionApproval))
+        if len(stages) + len(approvals) >= BATCH_SIZE:
+            ProductionStage.objects.bulk_create(stages)
+            ProductionApproval.objects.bulk_create(approvals)
+            stages, approvals = [], []
+    ProductionStage.objects.bulk_create(stages)
+    ProductionApproval.objects.bulk_create(approvals)
+
+
+def clear_rows(apps, schema_editor):
+    apps.get_model('production', 'ProductionStage').objects.all().delete()
+    apps.get_model('production', 'ProductionApproval').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0002_stage_and_approval_rows'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rows, clear_rows),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_backfill_order_events'),
+        ('production', '0003_backfill_stage_rows'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DefectCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(help_text='e.g., broken-stitch', max_length=100, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Defect Code',
+                'verbose_name_plural': 'Defect Codes',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='inspected_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Pieces inspected'),
+        ),
+        migrations.CreateModel(
+            name='DefectFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qc_type', models.CharField(max_length=10)),
+                ('style_number', models.CharField(blank=True, max_length=100)),
+                ('date', models.DateField()),
+                ('week', models.DateField(help_text='Monday of the report week')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('inspected', models.PositiveIntegerField(default=0, help_text='Pieces inspected in the report')),
+                ('defect', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='facts', to='production.defectcode')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='defect_facts', to='orders.order')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='defect_facts', to='production.qcreport')),
+                ('supplier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='defect_facts', to='suppliers.supplier')),
+            ],
+            options={
+                'verbose_name': 'Defect Fact',
+                'verbose_name_plural': 'Defect Facts',
+                'indexes': [models.Index(fields=['date'], name='production_defect_date_idx'), models.Index(fields=['supplier', 'date'], name='production_defect_supplier_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0004_defect_facts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='qcreport',
+            name='accept_number',
+            field=models.PositiveIntegerField(blank=True, help_text='Ac: most defects that still pass', null=True),
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='inspection_level',
+            field=models.CharField(choices=[('I', 'Level I'), ('II', 'Level II'), ('III', 'Level III')], default='II', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='lot_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Pieces in the lot; defaults to the order quantity', null=True),
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='reject_number',
+            field=models.PositiveIntegerField(blank=True, help_text='Re: fewest defects that fail', null=True),
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='sample_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='qcreport',
+            name='severity',
+            field=models.CharField(choices=[('NORMAL', 'Normal'), ('TIGHTENED', 'Tightened'), ('REDUCED', 'Reduced')], default='NORMAL', max_length=10),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_ship_by_date'),
+        ('production', '0005_sampling_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductionLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('stage', models.CharField(help_text='e.g., cutting, stitching, finishing', max_length=50)),
+                ('daily_capacity', models.PositiveIntegerField(help_text='Pieces per working day')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Production Line',
+                'verbose_name_plural': 'Production Lines',
+                'ordering': ['stage', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StagePlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=50)),
+                ('sequence', models.PositiveSmallIntegerField(help_text='Position of the stage in the flow')),
+                ('quantity', models.PositiveIntegerField(help_text='Pieces still to run through the stage')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('due_date', models.DateField(help_text='Ship-by date of the order')),
+                ('is_late', models.BooleanField(default=False, help_text='Stage ends after the ship-by date')),
+                ('planned_at', models.DateTimeField()),
+                ('line', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plans', to='production.productionline')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_plans', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Stage Plan',
+                'verbose_name_plural': 'Stage Plans',
+                'ordering': ['order', 'sequence'],
+                'indexes': [models.Index(fields=['line', 'start_date'], name='production_plan_line_idx'), models.Index(fields=['is_late', 'due_date'], name='production_plan_late_idx')],
+                'constraints': [models.UniqueConstraint(fields=('order', 'stage'), name='unique_stage_plan')],
+            },
+        ),
+    ]
@@ -22,10 +22,85 @@ class Production(models.Model):
         verbose_name = 'Production'
         verbose_name_plural = 'Productions'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_tracking = (instance.__dict__.get('stages'), instance.__dict__.get('approvals'))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Mirror stages/approvals JSON into indexed rows when it changes"""
+        from .tracking import sync_tracking
+
+        super().save(*args, **kwargs)
+        if getattr(self, '_loaded_tracking', None) != (self.stages, self.approvals):
+            sync_tracking(self)
+            self._loaded_tracking = (self.stages, self.approvals)
+    
     def __str__(self):
         return f'Production for {self.order.pi_number}'
 
 
+class ProductionStage(models.Model):
+    """
+    One production stage of an order, mirrored from Production.stages
+    """
+    production = models.ForeignKey(Production, on_delete=models.CASCADE, related_name='stage_rows')
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='production_stages')
+    
+    stage = models.CharField(max_length=50, help_text='e.g., cutting, stitching, finishing')
+    status = models.CharField(max_length=20, default='PENDING')
+    progress = models.PositiveSmallIntegerField(default=0)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['production', 'id']
+        verbose_name = 'Production Stage'
+        verbose_name_plural = 'Production Stages'
+        constraints = [
+            models.UniqueConstraint(fields=['production', 'stage'], name='unique_production_stage'),
+        ]
+        indexes = [
+            models.Index(fields=['stage', 'status', 'start_date'], name='production_stage_status_idx'),
+            models.Index(fields=['status', 'updated_at'], name='production_stage_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.stage} {self.status} ({self.progress}%)'
+
+
+class ProductionApproval(models.Model):
+    """
+    One pre-production approval of an order, mirrored from Production.approvals
+    """
+    production = models.ForeignKey(Production, on_delete=models.CASCADE, related_name='approval_rows')
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='production_approvals')
+    
+    approval = models.CharField(max_length=50, help_text='e.g., fabric, color, fit')
+    status = models.CharField(max_length=20, default='PENDING')
+    date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['production', 'id']
+        verbose_name = 'Production Approval'
+        verbose_name_plural = 'Production Approvals'
+        constraints = [
+            models.UniqueConstraint(fields=['production', 'approval'], name='unique_production_approval'),
+        ]
+        indexes = [
+            models.Index(fields=['approval', 'status'], name='production_approval_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.approval} {self.status}'
+
+
 class QCReport(models.Model):
     """
     Quality Control reports
@@ -43,12 +118,33 @@ class QCReport(models.Model):
         ('PENDING', 'Pending'),
     ]
     
+    LEVEL_CHOICES = [
+        ('I', 'Level I'),
+        ('II', 'Level II'),
+        ('III', 'Level III'),
+    ]
+    
+    SEVERITY_CHOICES = [
+        ('NORMAL', 'Normal'),
+        ('TIGHTENED', 'Tightened'),
+        ('REDUCED', 'Reduced'),
+    ]
+    
     production = models.ForeignKey(Production, on_delete=models.CASCADE, related_name='qc_reports')
     
     type = models.CharField(max_length=10, choices=QC_TYPE_CHOICES)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
     date = models.DateTimeField(auto_now_add=True)
     aql = models.DecimalField(max_digits=4, decimal_places=2, default=2.5, help_text='Acceptable Quality Level')
+    inspected_quantity = models.PositiveIntegerField(default=0, help_text='Pieces inspected')
+    
+    # ISO 2859-1 sampling plan, filled in on save from the lot size and AQL
+    lot_size = models.PositiveIntegerField(null=True, blank=True, help_text='Pieces in the lot; defaults to the order quantity')
+    inspection_level = models.CharField(max_length=3, choices=LEVEL_CHOICES, default='II')
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES, default='NORMAL')
+    sample_size = models.PositiveIntegerField(null=True, blank=True)
+    accept_number = models.PositiveIntegerField(null=True, blank=True, help_text='Ac: most defects that still pass')
+    reject_number = models.PositiveIntegerField(null=True, blank=True, help_text='Re: fewest defects that fail')
     
     # Defects stored as JSON: [{description: "...", count: 5}, ...]
     defects = models.JSONField(default=list, blank=True)
@@ -62,10 +158,131 @@ class QCReport(models.Model):
         verbose_name = 'QC Report'
         verbose_name_plural = 'QC Reports'
     
+    def save(self, *args, **kwargs):
+        """Apply the sampling plan (PASS/FAIL from the defects) and refresh the defect fact rows"""
+        from .aql import apply_plan, order_quantities
+        from .defects import record_defects
+
+        order_id = self.production.order_id
+        apply_plan(self, self.lot_size or order_quantities([order_id]).get(order_id))
+        super().save(*args, **kwargs)
+        record_defects([self])
+    
+    def delete(self, *args, **kwargs):
+        from .defects import bump_version
+
+        result = super().delete(*args, **kwargs)
+        bump_version()
+        return result
+    
     def __str__(self):
         return f'{self.get_type_display()} - {self.production.order.pi_number} ({self.get_status_display()})'
 
 
+class DefectCode(models.Model):
+    """
+    Normalised defect type; QC report descriptions are mapped to these on save
+    """
+    code = models.SlugField(max_length=100, unique=True, help_text='e.g., broken-stitch')
+    name = models.CharField(max_length=255)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['code']
+        verbose_name = 'Defect Code'
+        verbose_name_plural = 'Defect Codes'
+    
+    def __str__(self):
+        return self.name
+
+
+class DefectFact(models.Model):
+    """
+    Defect count per QC report and defect code, with the dimensions used by
+    defect analytics copied in. Reports without defects get one row with no
+    defect code so their inspected pieces still count in rates.
+    """
+    report = models.ForeignKey(QCReport, on_delete=models.CASCADE, related_name='defect_facts')
+    defect = models.ForeignKey(DefectCode, on_delete=models.PROTECT, null=True, blank=True, related_name='facts')
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='defect_facts')
+    supplier = models.ForeignKey(
+        'suppliers.Supplier', on_delete=models.SET_NULL, null=True, blank=True, related_name='defect_facts'
+    )
+    
+    qc_type = models.CharField(max_length=10)
+    style_number = models.CharField(max_length=100, blank=True)
+    date = models.DateField()
+    week = models.DateField(help_text='Monday of the report week')
+    count = models.PositiveIntegerField(default=0)
+    inspected = models.PositiveIntegerField(default=0, help_text='Pieces inspected in the report')
+    
+    class Meta:
+        verbose_name = 'Defect Fact'
+        verbose_name_plural = 'Defect Facts'
+        indexes = [
+            models.Index(fields=['date'], name='production_defect_date_idx'),
+            models.Index(fields=['supplier', 'date'], name='production_defect_supplier_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.report_id}: {self.defect_id} x {self.count}'
+
+
+class ProductionLine(models.Model):
+    """
+    A line or section of the factory that runs one production stage
+    """
+    name = models.CharField(max_length=100, unique=True)
+    stage = models.CharField(max_length=50, help_text='e.g., cutting, stitching, finishing')
+    daily_capacity = models.PositiveIntegerField(help_text='Pieces per working day')
+    is_active = models.BooleanField(default=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['stage', 'name']
+        verbose_name = 'Production Line'
+        verbose_name_plural = 'Production Lines'
+    
+    def __str__(self):
+        return f'{self.name} ({self.stage}, {self.daily_capacity}/day)'
+
+
+class StagePlan(models.Model):
+    """
+    Projected dates of one stage of an order, written by the capacity planner
+    """
+    order = models.ForeignKey('orders.Order', on_delete=models.CASCADE, related_name='stage_plans')
+    line = models.ForeignKey(ProductionLine, on_delete=models.CASCADE, related_name='plans')
+    
+    stage = models.CharField(max_length=50)
+    sequence = models.PositiveSmallIntegerField(help_text='Position of the stage in the flow')
+    quantity = models.PositiveIntegerField(help_text='Pieces still to run through the stage')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    due_date = models.DateField(help_text='Ship-by date of the order')
+    is_late = models.BooleanField(default=False, help_text='Stage ends after the ship-by date')
+    
+    planned_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['order', 'sequence']
+        verbose_name = 'Stage Plan'
+        verbose_name_plural = 'Stage Plans'
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'stage'], name='unique_stage_plan'),
+        ]
+        indexes = [
+            models.Index(fields=['line', 'start_date'], name='production_plan_line_idx'),
+            models.Index(fields=['is_late', 'due_date'], name='production_plan_late_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.order_id} {self.stage}: {self.start_date} - {self.end_date}'
+
+
 class Shipment(models.Model):
     """
     Shipment details for an order
@@ -0,0 +1,158 @@
+"""
+Capacity planning.
+
+Confirmed orders are loaded onto production lines earliest-due-date first.
+Each line keeps a list of pieces already booked per working day (its
+capacity buckets); an order's stage is poured into the free capacity of the
+line that would finish it soonest, starting no earlier than the end of the
+previous stage, so later orders backfill whatever room earlier ones leave.
+
+The whole plan is rebuilt in memory from three queries (lines, orders with
+their quantities, stage progress) and written back with one delete and one
+``bulk_create``, so re-planning after any change is cheap.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+# Orders with the advance in hand are on the factory plan
+CONFIRMED_ORDER_STATUSES = ['ADVANCE_RECEIVED', 'PRODUCTION']
+
+
+def stage_sequence():
+    return [stage.strip().lower() for stage in getattr(settings, 'PRODUCTION_STAGE_SEQUENCE', []) if stage.strip()]
+
+
+class WorkingCalendar:
+    """Working dates from ``start`` on, generated as far as they are needed."""
+
+    def __init__(self, start, weekdays):
+        if not weekdays:
+            raise ValueError('At least one working weekday is required')
+        self.days = []
+        self.weekdays = set(weekdays)
+        self._next = start
+
+    def __getitem__(self, index):
+        while len(self.days) <= index:
+            if self._next.weekday() in self.weekdays:
+                self.days.append(self._next)
+            self._next += timedelta(days=1)
+        return self.days[index]
+
+
+class LineLoad:
+    """Pieces booked per working day on one line."""
+
+    def __init__(self, line):
+        self.line = line
+        self.capacity = line.daily_capacity
+        self.booked = []
+        self.cursor = 0  # first day that still has free capacity
+
+    def _free(self, day):
+        return self.capacity - (self.booked[day] if day < len(self.booked) else 0)
+
+    def finish(self, quantity, earliest):
+        """Last day ``quantity`` would occupy if loaded from ``earliest``."""
+        day = max(earliest, self.cursor)
+        while True:
+            quantity -= self._free(day)
+            if quantity <= 0:
+                return day
+            day += 1
+
+    def book(self, quantity, earliest):
+        """Load ``quantity`` into the free capacity from ``earliest``; returns (first day, last day)."""
+        day = max(earliest, self.cursor)
+        first = None
+        while quantity > 0:
+            free = self._free(day)
+            if free > 0:
+                if day >= len(self.booked):
+                    self.booked.extend([0] * (day + 1 - len(self.booked)))
+                take = min(free, quantity)
+                self.booked[day] += take
+                quantity -= take
+                first = day if first is None else first
+            day += 1
+        while self.cursor < len(self.booked) and self.booked[self.cursor] >= self.capacity:
+            self.cursor += 1
+        return first, day - 1
+
+
+def remaining_quantity(pieces, status, progress):
+    if status == 'COMPLETED':
+        return 0
+    return -(-pieces * (100 - progress) // 100)
+
+
+def plan_capacity(today=None, batch_size=1000):
+    """
+    Rebuild every ``StagePlan`` row; returns a summary with the number of
+    planned orders, late orders and stages that have no active line.
+    """
+    from orders.models import Order
+
+    from .models import ProductionLine, ProductionStage, StagePlan
+
+    today = today or timezone.localdate()
+    now = timezone.now()
+    calendar = WorkingCalendar(today, getattr(settings, 'PRODUCTION_WORKING_DAYS', range(6)))
+    lead_time = timedelta(days=getattr(settings, 'PRODUCTION_DEFAULT_LEAD_DAYS', 60))
+    stages = stage_sequence()
+
+    loads = {stage: [] for stage in stages}
+    for line in ProductionLine.objects.filter(is_active=True, daily_capacity__gt=0, stage__in=stages).order_by('id'):
+        loads[line.stage].append(LineLoad(line))
+
+    orders = (
+        Order.objects.filter(status__in=CONFIRMED_ORDER_STATUSES)
+        .annotate(pieces=Sum('products__quantity'))
+        .filter(pieces__gt=0)
+        .values_list('id', 'ship_by_date', 'pi_date', 'pieces')
+        .order_by()
+    )
+    orders = [
+        (ship_by or timezone.localdate(pi_date) + lead_time, order_id, pieces)
+        for order_id, ship_by, pi_date, pieces in orders
+    ]
+    orders.sort()
+    progress = {
+        (order_id, stage): (status, progress)
+        for order_id, stage, status, progress in ProductionStage.objects.filter(
+            order__status__in=CONFIRMED_ORDER_STATUSES, stage__in=stages
+        ).values_list('order_id', 'stage', 'status', 'progress')
+    }
+
+    plans = []
+    late = set()
+    for due, order_id, pieces in orders:
+        earliest = 0
+        for sequence, stage in enumerate(stages):
+            quantity = remaining_quantity(pieces, *progress.get((order_id, stage), ('PENDING', 0)))
+            if not quantity or not loads[stage]:
+                continue
+            load = min(loads[stage], key=lambda candidate: candidate.finish(quantity, earliest))
+            first, last = load.book(quantity, earliest)
+            end_date = calendar[last]
+            if end_date > due:
+                late.add(order_id)
+            plans.append(StagePlan(
+                order_id=order_id, line=load.line, stage=stage, sequence=sequence, quantity=quantity,
+                start_date=calendar[first], end_date=end_date, due_date=due, is_late=end_date > due, planned_at=now,
+            ))
+            earliest = last
+
+    with transaction.atomic():
+        StagePlan.objects.all().delete()
+        StagePlan.objects.bulk_create(plans, batch_size=batch_size)
+    return {
+        'orders': len(orders),
+        'stages': len(plans),
+        'late_orders': len(late),
+        'unplanned_stages': [stage for stage in stages if not loads[stage]],
+    }
@@ -0,0 +1,69 @@
+from rest_framework import serializers
+from .aql import AQLS, to_aql
+from .models import Production, ProductionLine, QCReport, Shipment, StagePlan
+
+
+class QCReportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QCReport
+        fields = [
+            'id', 'production', 'type', 'status', 'date', 'aql', 'inspected_quantity', 'lot_size',
+            'inspection_level', 'severity', 'sample_size', 'accept_number', 'reject_number',
+            'defects', 'report_url', 'images'
+        ]
+        read_only_fields = ['id', 'date', 'sample_size', 'accept_number', 'reject_number']
+
+    def validate_aql(self, value):
+        if to_aql(value) is None:
+            raise serializers.ValidationError(f'AQL must be one of {", ".join(str(aql) for aql in AQLS)}')
+        return value
+
+
+class ShipmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Shipment
+        fields = [
+            'id', 'production', 'courier', 'tracking_number', 'etd', 'eta', 'invoice_url',
+            'packing_list_url', 'awb_url', 'status', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class ProductionSerializer(serializers.ModelSerializer):
+    qc_reports = QCReportSerializer(many=True, read_only=True)
+    shipment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Production
+        fields = ['id', 'order', 'approvals', 'stages', 'qc_reports', 'shipment', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def get_shipment(self, obj):
+        if not hasattr(obj, 'shipment'):
+            return None
+        return ShipmentSerializer(obj.shipment, context=self.context).data
+
+
+class ProductionLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductionLine
+        fields = ['id', 'name', 'stage', 'daily_capacity', 'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+        # Form posts omit unchecked booleans; keep new lines active
+        extra_kwargs = {'is_active': {'default': True}}
+
+    def validate_stage(self, value):
+        return value.strip().lower()
+
+
+class StagePlanSerializer(serializers.ModelSerializer):
+    pi_number = serializers.CharField(source='order.pi_number', read_only=True)
+    line_name = serializers.CharField(source='line.name', read_only=True)
+
+    class Meta:
+        model = StagePlan
+        fields = [
+            'id', 'order', 'pi_number', 'stage', 'sequence', 'line', 'line_name', 'quantity',
+            'start_date', 'end_date', 'due_date', 'is_late', 'planned_at'
+        ]
+        read_only_fields = fields
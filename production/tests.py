@@ -1,3 +1,452 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from leads.models import Lead
+from orders.models import Order, OrderEvent, OrderProduct
+from purchase_orders.models import PurchaseOrder
+from suppliers.models import Supplier
+from .aql import PLANS, SAMPLE_SIZES, sampling_plan, to_aql
+from .courier_stub import start_server, tracking_state
+from .couriers import COURIER_STATUSES, sync_shipments
+from .defects import VERSION_KEY, DefectFrame, bump_version
+from .models import (
+    DefectCode, Production, ProductionApproval, ProductionLine, ProductionStage, QCReport, Shipment, StagePlan,
+)
+from .planning import LineLoad, WorkingCalendar, plan_capacity, remaining_quantity
+
+
+class ProductionTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = get_user_model().objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        cls.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.seller)
+
+    def order(self, **values):
+        values.setdefault('status', 'PRODUCTION')
+        return Order.objects.create(
+            lead=self.lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=100, **values
+        )
+
+
+class WipTrackingTests(ProductionTestCase):
+    """Stage/approval rows mirror the JSON and only change when their values do"""
+
+    def setUp(self):
+        super().setUp()
+        self.started = (timezone.localdate() - timedelta(days=10)).isoformat()
+        self.productions = [
+            Production.objects.create(
+                order=self.order(),
+                stages={
+                    'Cutting': {'status': 'COMPLETED', 'progress': 100},
+                    'stitching': {'status': 'IN_PROGRESS', 'progress': 40 + index, 'startDate': f'{self.started}T10:00:00Z'},
+                },
+                approvals={'fabric': {'status': 'PENDING'}, 'color': {'status': 'APPROVED', 'date': '2026-10-01'}},
+            )
+            for index in range(3)
+        ]
+
+    def age_rows(self):
+        long_ago = timezone.now() - timedelta(days=30)
+        ProductionStage.objects.update(updated_at=long_ago)
+        ProductionApproval.objects.update(updated_at=long_ago)
+        return long_ago
+
+    def test_rows_mirror_json(self):
+        production = self.productions[0]
+        self.assertEqual(
+            list(production.stage_rows.values_list('stage', 'status', 'progress').order_by('stage')),
+            [('cutting', 'COMPLETED', 100), ('stitching', 'IN_PROGRESS', 40)],
+        )
+        self.assertEqual(production.stage_rows.get(stage='stitching').start_date.isoformat(), self.started)
+        production.stages = {'cutting': {'status': 'COMPLETED'}}
+        production.approvals = {'fabric': 'approved'}
+        production.save()
+        self.assertEqual(list(production.stage_rows.values_list('stage', flat=True)), ['cutting'])
+        self.assertEqual(list(production.approval_rows.values_list('approval', 'status')), [('fabric', 'APPROVED')])
+
+    def test_sync_touches_only_changed_rows(self):
+        long_ago = self.age_rows()
+        production = self.productions[0]
+        production.stages = {**production.stages, 'stitching': {**production.stages['stitching'], 'progress': 80}}
+        production.approvals = {**production.approvals, 'notes_only': {'status': 'PENDING'}}
+        production.save()
+
+        touched = ProductionStage.objects.filter(updated_at__gt=long_ago)
+        self.assertEqual(list(touched.values_list('production_id', 'stage', 'progress')), [(production.pk, 'stitching', 80)])
+        self.assertEqual(
+            list(ProductionApproval.objects.filter(updated_at__gt=long_ago).values_list('approval', flat=True)),
+            ['notes_only'],
+        )
+
+    def test_progress_since_counts_changed_stages(self):
+        self.age_rows()
+        for production in self.productions:
+            # Re-saving unchanged JSON with a fresh dict still leaves the rows alone
+            production.stages = {key: dict(value) for key, value in production.stages.items()}
+            production.stages['Cutting']['progress'] = 100
+            production.save()
+        production = self.productions[1]
+        production.stages = {**production.stages, 'stitching': {**production.stages['stitching'], 'progress': 90}}
+        production.save()
+
+        response = self.client.get('/api/production/wip/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(data['progress'], [{'stage': 'stitching', 'rows': 1, 'average_progress': 90.0}])
+        self.assertEqual(data['pending_approvals'], [{'approval': 'fabric', 'orders': 3}])
+        self.assertEqual(len(data['stuck']), 3)
+        self.assertEqual(
+            self.client.get('/api/production/wip/', {'stage': 'Stitching', 'stuck_days': 20}).data['data']['stuck'], []
+        )
+        self.assertEqual(self.client.get('/api/production/wip/', {'stuck_days': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/production/wip/', {'since': '2026-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/production/wip/', {'since': 'monday'}).status_code, 400)
+
+
+class DefectAnalyticsTests(ProductionTestCase):
+    """Defect Pareto, rates and trends from the fact rows, cached until the next QC save"""
+
+    url = '/api/production/qc-reports/analytics/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.supplier = Supplier.objects.create(name='Stitch Co')
+        for index in range(3):
+            order = self.order()
+            OrderProduct.objects.create(
+                order=order, style_name='Tee', style_number=f'T{index % 2}', quantity=10, unit_price=1
+            )
+            if index < 2:
+                PurchaseOrder.objects.create(
+                    supplier=self.supplier, type='MANUFACTURING', linked_order=order, total_amount=1
+                )
+            self.production = Production.objects.create(order=order)
+            response = self.client.post('/api/production/qc-reports/', {
+                'production': self.production.pk, 'type': 'FINAL', 'inspected_quantity': 200,
+                'defects': [
+                    {'description': 'Broken Stitches', 'count': 3},
+                    {'description': 'broken stitch', 'count': 1},
+                    {'description': 'Stain', 'count': index},
+                ],
+            }, format='json')
+            self.assertEqual(response.status_code, 201, response.data)
+        self.last_order = order
+        QCReport.objects.create(production=self.production, type='INLINE', inspected_quantity=100)
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['data']
+
+    def test_pareto_merges_spelling_variants(self):
+        self.assertEqual(sorted(DefectCode.objects.values_list('code', flat=True)), ['broken-stitch', 'stain'])
+        pareto = self.get()
+        self.assertEqual(
+            [(row['name'], row['count'], row['share'], row['cumulative']) for row in pareto],
+            [('Broken stitch', 12, 80.0, 80.0), ('Stain', 3, 20.0, 100.0)],
+        )
+
+    def test_rates_per_1000_pieces(self):
+        rates = self.get(view='rates')
+        self.assertEqual(
+            [(row['supplier'], row['defects'], row['inspected'], row['per_1000']) for row in rates],
+            [(None, 6, 300, 20.0), (self.supplier.pk, 9, 400, 22.5)],
+        )
+        by_style = self.get(view='rates', by='style')
+        self.assertEqual([(row['style'], row['defects'], row['inspected']) for row in by_style],
+                         [('T0', 10, 500), ('T1', 5, 200)])
+        filtered = self.get(view='rates', by='qc_type', supplier=self.supplier.pk)
+        self.assertEqual([(row['qc_type'], row['inspected']) for row in filtered], [('FINAL', 400)])
+
+    def test_trend_by_week(self):
+        trend = self.get(view='trend', by='qc_type')
+        week = (timezone.localdate() - timedelta(days=timezone.localdate().weekday())).isoformat()
+        self.assertEqual(
+            [(row['week'], row['qc_type'], row['defects'], row['inspected']) for row in trend],
+            [(week, 'FINAL', 15, 600), (week, 'INLINE', 0, 100)],
+        )
+
+    def test_results_are_cached_until_a_report_is_saved(self):
+        self.get()
+        with self.assertNumQueries(0):
+            self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            QCReport.objects.create(
+                production=self.production, type='INLINE', inspected_quantity=100,
+                defects=[{'description': 'Hole', 'count': 20}],
+            )
+        self.assertEqual(self.get()[0]['name'], 'Hole')
+
+    def test_evicted_version_does_not_bring_back_old_results(self):
+        self.get()
+        cache.delete(VERSION_KEY)
+        bump_version()
+        with mock.patch.object(DefectFrame, 'from_queryset', wraps=DefectFrame.from_queryset) as load:
+            self.get()
+        load.assert_called_once()
+
+    def test_invalid_filters_are_rejected(self):
+        for params in [{'view': 'chart'}, {'by': 'colour'}, {'from': '2026-13-40'}, {'to': 'soon'},
+                       {'supplier': 'abc'}, {'order': '1.5'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertFalse(response.data['success'])
+        self.assertEqual(self.get(order=self.last_order.pk, view='rates', by='order')[0]['inspected'], 300)
+
+
+class SamplingPlanTests(SimpleTestCase):
+    """Plans match ISO 2859-1 tables I, II-A, II-B and II-C, arrows included"""
+
+    def test_table_lookups(self):
+        cases = [
+            ((1000, '2.5'), ('J', 80, 5, 6)),
+            ((1000, '4.0'), ('J', 80, 7, 8)),
+            ((1000, '0.65'), ('J', 80, 1, 2)),
+            ((5000, '2.5'), ('L', 200, 10, 11)),
+            ((5000, '4.0', 'II', 'TIGHTENED'), ('L', 200, 12, 13)),
+            ((1000, '2.5', 'II', 'REDUCED'), ('J', 32, 2, 5)),
+            ((1000, '6.5', 'I'), ('G', 32, 5, 6)),
+            ((200000, '1.0', 'III'), ('Q', 1250, 21, 22)),
+            # Arrows: down to the first plan of the column, capped at the lot size
+            ((8, '2.5'), ('C', 5, 0, 1)),
+            ((1000, '0.010'), ('Q', 1000, 0, 1)),
+        ]
+        for args, expected in cases:
+            self.assertEqual(tuple(sampling_plan(*args)), expected, args)
+
+    def test_every_cell_resolves_to_a_plan(self):
+        for (severity, letter, aql), plan in PLANS.items():
+            self.assertLess(plan.accept, plan.reject, (severity, letter, aql))
+            self.assertIn(plan.sample_size, SAMPLE_SIZES[severity])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(to_aql('2.50'), Decimal('2.5'))
+        self.assertIsNone(to_aql('2.2'))
+        for args in [(1000, '2.2'), (1, '2.5'), (1000, '2.5', 'IV'), (1000, '2.5', 'II', 'STRICT')]:
+            with self.assertRaises(ValueError):
+                sampling_plan(*args)
+
+
+class QCReportPlanTests(ProductionTestCase):
+    """QC reports get their plan and PASS/FAIL from the order quantity"""
+
+    url = '/api/production/qc-reports/'
+
+    def setUp(self):
+        super().setUp()
+        order = self.order()
+        OrderProduct.objects.create(order=order, style_name='Tee', style_number='T', quantity=1000, unit_price=1)
+        self.order_id = order.pk
+        self.production = Production.objects.create(order=order)
+
+    def test_sampling_plan_endpoint(self):
+        response = self.client.get(f'{self.url}sampling-plan/', {'order': self.order_id})
+        self.assertEqual(response.data['data'], {
+            'lot_size': 1000, 'code_letter': 'J', 'sample_size': 80, 'accept': 5, 'reject': 6,
+        })
+        response = self.client.get(f'{self.url}sampling-plan/', {'lot_size': 5000, 'aql': '4.0', 'severity': 'tightened'})
+        self.assertEqual((response.data['data']['accept'], response.data['data']['reject']), (12, 13))
+        for params in [{'lot_size': 5000, 'aql': '3'}, {'lot_size': 'many'}, {'order': 'x'}]:
+            self.assertEqual(self.client.get(f'{self.url}sampling-plan/', params).status_code, 400, params)
+
+    def test_reports_pass_or_fail_on_reject_number(self):
+        for count, verdict in [(5, 'PASS'), (6, 'FAIL')]:
+            response = self.client.post(self.url, {
+                'production': self.production.pk, 'type': 'FINAL', 'defects': [{'description': 'Stain', 'count': count}],
+            }, format='json')
+            self.assertEqual(response.status_code, 201, response.data)
+            report = QCReport.objects.get(pk=response.data['id'])
+            self.assertEqual((report.sample_size, report.accept_number, report.status), (80, 5, verdict))
+        response = self.client.post(self.url, {'production': self.production.pk, 'type': 'FINAL', 'aql': '2.2'},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_evaluate_reapplies_plans(self):
+        report = QCReport.objects.create(production=self.production, type='INLINE')
+        self.assertEqual((report.status, report.sample_size), ('PENDING', 80))
+        QCReport.objects.filter(pk=report.pk).update(aql='1.5', inspected_quantity=80, defects=[{'count': 4}])
+        response = self.client.post(f'{self.url}evaluate/')
+        self.assertEqual(response.data['data'], {'PASS': 0, 'FAIL': 1, 'PENDING': 0, 'skipped': 0})
+        report.refresh_from_db()
+        self.assertEqual((report.accept_number, report.reject_number, report.status), (3, 4, 'FAIL'))
+
+
+class PlannerUnitTests(SimpleTestCase):
+    """Working calendar, line buckets and remaining quantities"""
+
+    def test_calendar_skips_non_working_days(self):
+        calendar = WorkingCalendar(date(2026, 10, 23), range(5))
+        self.assertEqual([calendar[0], calendar[1], calendar[5]], [date(2026, 10, 23), date(2026, 10, 26), date(2026, 10, 30)])
+        with self.assertRaises(ValueError):
+            WorkingCalendar(date(2026, 10, 23), [])
+
+    def test_line_load_backfills_free_capacity(self):
+        load = LineLoad(ProductionLine(name='S1', stage='stitching', daily_capacity=500))
+        self.assertEqual(load.book(1200, 1), (1, 3))
+        self.assertEqual(load.booked, [0, 500, 500, 200])
+        self.assertEqual(load.finish(800, 0), 3)
+        self.assertEqual(load.book(800, 0), (0, 3))
+        self.assertEqual(load.booked, [500, 500, 500, 500])
+        self.assertEqual(load.cursor, 4)
+
+    def test_remaining_quantity_rounds_up(self):
+        self.assertEqual(remaining_quantity(601, 'IN_PROGRESS', 50), 301)
+        self.assertEqual(remaining_quantity(600, 'COMPLETED', 10), 0)
+
+
+@override_settings(PRODUCTION_STAGE_SEQUENCE=['cutting', 'stitching'], PRODUCTION_WORKING_DAYS=range(5))
+class CapacityPlanTests(ProductionTestCase):
+    """Confirmed orders are loaded onto the lines earliest due date first"""
+
+    today = date(2026, 10, 19)  # a Monday
+
+    def setUp(self):
+        super().setUp()
+        ProductionLine.objects.create(name='C1', stage='cutting', daily_capacity=1000)
+        self.s1 = ProductionLine.objects.create(name='S1', stage='stitching', daily_capacity=500)
+        self.s2 = ProductionLine.objects.create(name='S2', stage='stitching', daily_capacity=300)
+        ProductionLine.objects.create(name='Old', stage='stitching', daily_capacity=5000, is_active=False)
+        self.rush = self.planned_order(2000, 1, status='ADVANCE_RECEIVED')
+        self.soon = self.planned_order(1000, 3)
+        self.later = self.planned_order(600, 30)
+        self.planned_order(5000, 2, status='PI_GENERATED')
+        Production.objects.create(order=self.later, stages={
+            'cutting': {'status': 'COMPLETED'}, 'stitching': {'status': 'IN_PROGRESS', 'progress': 50},
+        })
+
+    def planned_order(self, pieces, due_in, **values):
+        order = self.order(ship_by_date=self.today + timedelta(days=due_in), **values)
+        OrderProduct.objects.create(order=order, style_name='Tee', style_number='T', quantity=pieces, unit_price=1)
+        return order
+
+    def plans(self, order):
+        return list(StagePlan.objects.filter(order=order).values_list(
+            'stage', 'line__name', 'quantity', 'start_date', 'end_date', 'is_late',
+        ))
+
+    def test_earliest_due_date_first_with_backfill(self):
+        with self.assertNumQueries(7):
+            summary = plan_capacity(self.today)
+        self.assertEqual(summary, {'orders': 3, 'stages': 5, 'late_orders': 2, 'unplanned_stages': []})
+        day = lambda offset: self.today + timedelta(days=offset)
+        self.assertEqual(self.plans(self.rush), [
+            ('cutting', 'C1', 2000, day(0), day(1), False),
+            ('stitching', 'S1', 2000, day(1), day(4), True),
+        ])
+        # S1 is busy until Friday, so the smaller line finishes sooner (over the weekend)
+        self.assertEqual(self.plans(self.soon), [
+            ('cutting', 'C1', 1000, day(2), day(2), False),
+            ('stitching', 'S2', 1000, day(2), day(7), True),
+        ])
+        # Half stitched, cutting done: the rest fits into Monday's free capacity on S1
+        self.assertEqual(self.plans(self.later), [('stitching', 'S1', 300, day(0), day(0), False)])
+
+    def test_replan_replaces_the_plan_and_schedule_filters(self):
+        plan_capacity(self.today)
+        self.soon.status = 'DELIVERED'
+        self.soon.save()
+        response = self.client.post('/api/production/lines/replan/')
+        self.assertEqual(response.data['data']['orders'], 2)
+        self.assertFalse(StagePlan.objects.filter(order=self.soon).exists())
+
+        response = self.client.get('/api/production/lines/schedule/', {'stage': 'Stitching', 'line': self.s1.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(self.client.get('/api/production/lines/schedule/', {'order': 'x'}).status_code, 400)
+
+    @override_settings(PRODUCTION_STAGE_SEQUENCE=['cutting', 'stitching', 'packing'])
+    def test_stages_without_lines_are_reported(self):
+        self.assertEqual(plan_capacity(self.today)['unplanned_stages'], ['packing'])
+
+
+class CourierSyncTests(ProductionTestCase):
+    """sync_shipments against the courier stub server"""
+
+    def setUp(self):
+        super().setUp()
+        self.shipments = []
+        for index in range(24):
+            production = Production.objects.create(order=self.order(status='QC_PASSED'))
+            self.shipments.append(Shipment.objects.create(
+                production=production, courier=' Stub ' if index % 8 else 'Other', tracking_number=f'TRK{index:04d}',
+            ))
+
+    def serve(self, **options):
+        server = start_server(**options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f'http://127.0.0.1:{server.server_port}/track'
+
+    def couriers(self, url, **options):
+        return override_settings(COURIER_TRACKING={
+            'stub': {'url': url, 'rate': '100/second', 'batch_size': 5, 'concurrency': 2, **options},
+        })
+
+    def test_statuses_are_mapped_and_orders_advanced(self):
+        with self.couriers(self.serve()):
+            summary = sync_shipments()
+        self.assertEqual((summary['requests'], summary['polled'], summary['skipped'], summary['failed']), (5, 21, 3, 0))
+
+        for shipment in Shipment.objects.select_related('production__order'):
+            order_status = shipment.production.order.status
+            if shipment.courier == 'Other':
+                self.assertEqual((shipment.status, shipment.eta, order_status), ('PENDING', None, 'QC_PASSED'))
+                continue
+            courier_status, eta = tracking_state(shipment.tracking_number)
+            expected = COURIER_STATUSES.get(courier_status, 'PENDING')
+            self.assertEqual((shipment.status, shipment.eta), (expected, eta), shipment.tracking_number)
+            self.assertEqual(order_status, expected if expected != 'PENDING' else 'QC_PASSED')
+        self.assertEqual(
+            OrderEvent.objects.filter(note='Courier tracking').count(),
+            Order.objects.filter(status__in=['SHIPPED', 'DELIVERED']).count(),
+        )
+
+    def test_resync_is_idempotent(self):
+        with self.couriers(self.serve()):
+            first = sync_shipments()
+            events = OrderEvent.objects.count()
+            delivered = Shipment.objects.filter(status='DELIVERED').count()
+            second = sync_shipments()
+        self.assertGreater(first['updated'], 0)
+        # Delivered shipments are no longer polled, nothing else changed
+        self.assertEqual(second['polled'], first['polled'] - delivered)
+        self.assertEqual((second['updated'], second['orders']), (0, 0))
+        self.assertEqual(OrderEvent.objects.count(), events)
+
+    def test_rate_limited_batches_are_retried(self):
+        # One request per second: the second batch gets 429 + Retry-After: 1
+        with self.couriers(self.serve(rate=1), batch_size=20, concurrency=1):
+            summary = sync_shipments()
+        self.assertEqual((summary['requests'], summary['polled'], summary['failed']), (2, 21, 0))
+
+    def test_server_errors_back_off_then_give_up(self):
+        with self.couriers(self.serve(error_rate=1.0)), \
+                mock.patch('production.couriers.asyncio.sleep', new_callable=mock.AsyncMock) as sleep:
+            summary = sync_shipments(Shipment.objects.filter(tracking_number='TRK0001'))
+        self.assertEqual((summary['requests'], summary['failed'], summary['updated']), (1, 1, 0))
+        self.assertEqual([call.args[0] for call in sleep.await_args_list], [1, 2, 4, 8])
+
+    def test_timeouts_fail_the_batch_only(self):
+        with self.couriers(self.serve(latency=0.5), timeout=0.05):
+            out = StringIO()
+            call_command('sync_shipments', '--courier', 'stub', stdout=out)
+        self.assertIn('5 batch(es) failed', out.getvalue())
+        self.assertFalse(Shipment.objects.exclude(status='PENDING').exists())
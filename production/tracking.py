@@ -0,0 +1,125 @@
+"""
+Stage and approval rows derived from ``Production.stages`` / ``approvals``.
+
+The JSON dicts stay the API shape the frontend reads and writes; on every
+save they are mirrored into ``ProductionStage`` and ``ProductionApproval``
+rows so WIP questions ("orders stuck in stitching", "pending fabric
+approvals") are indexed ``GROUP BY`` queries instead of JSON decoding.
+"""
+from datetime import date, datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def normalize_key(key):
+    return str(key).strip().lower().replace(' ', '_')[:50]
+
+
+def to_date(value):
+    """Date from 'YYYY-MM-DD', an ISO datetime string or a date; None if unreadable."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = parse_date(value[:10])
+        if parsed:
+            return parsed
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    return parsed.date() if parsed else None
+
+
+def to_progress(value):
+    try:
+        return min(max(int(float(value)), 0), 100)
+    except (TypeError, ValueError):
+        return 0
+
+
+def stage_rows(production, model):
+    rows = {}
+    for key, data in (production.stages or {}).items():
+        data = data if isinstance(data, dict) else {'status': data}
+        status = str(data.get('status') or 'PENDING').upper()[:20]
+        progress = to_progress(data.get('progress', 100 if status == 'COMPLETED' else 0))
+        rows[normalize_key(key)] = model(
+            production=production,
+            order_id=production.order_id,
+            stage=normalize_key(key),
+            status=status,
+            progress=progress,
+            start_date=to_date(data.get('startDate') or data.get('start_date')),
+            end_date=to_date(data.get('endDate') or data.get('end_date')),
+        )
+    return list(rows.values())
+
+
+def approval_rows(production, model):
+    rows = {}
+    for key, data in (production.approvals or {}).items():
+        data = data if isinstance(data, dict) else {'status': data}
+        rows[normalize_key(key)] = model(
+            production=production,
+            order_id=production.order_id,
+            approval=normalize_key(key),
+            status=str(data.get('status') or 'PENDING').upper()[:20],
+            date=to_date(data.get('date')),
+            notes=str(data.get('notes') or ''),
+        )
+    return list(rows.values())
+
+
+def _replace(model, manager, rows, key_field, fields):
+    """
+    Make ``manager``'s rows match ``rows``: drop removed keys, insert new ones
+    and update only rows whose values changed, so ``updated_at`` keeps
+    meaning "last changed" for ``progress_since``.
+    """
+    attnames = [model._meta.get_field(field).attname for field in fields]
+    existing = {row[0]: row[1:] for row in manager.values_list(key_field, 'pk', *attnames)}
+    keys = [getattr(row, key_field) for row in rows]
+    if set(existing) - set(keys):
+        manager.exclude(**{f'{key_field}__in': keys}).delete()
+
+    now = timezone.now()
+    created = []
+    changed = []
+    for row in rows:
+        current = existing.get(getattr(row, key_field))
+        if current is None:
+            created.append(row)
+        elif tuple(getattr(row, attname) for attname in attnames) != current[1:]:
+            row.pk = current[0]
+            row.updated_at = now
+            changed.append(row)
+    if created:
+        # A concurrent sync may have inserted the same key since we read
+        model.objects.bulk_create(
+            created,
+            update_conflicts=True,
+            unique_fields=['production', key_field],
+            update_fields=[*fields, 'updated_at'],
+        )
+    if changed:
+        model.objects.bulk_update(changed, [*fields, 'updated_at'])
+
+
+def sync_tracking(production):
+    """Upsert the stage/approval rows of ``production`` from its JSON and drop removed keys."""
+    from .models import ProductionApproval, ProductionStage
+
+    with transaction.atomic():
+        _replace(
+            ProductionStage, production.stage_rows, stage_rows(production, ProductionStage), 'stage',
+            ['order', 'status', 'progress', 'start_date', 'end_date'],
+        )
+        _replace(
+            ProductionApproval, production.approval_rows, approval_rows(production, ProductionApproval), 'approval',
+            ['order', 'status', 'date', 'notes'],
+        )
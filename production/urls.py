@@ -0,0 +1,9 @@
+from rest_framework.routers import DefaultRouter
+from .views import ProductionLineViewSet, ProductionViewSet, QCReportViewSet
+
+router = DefaultRouter()
+router.register(r'lines', ProductionLineViewSet, basename='production-line')
+router.register(r'qc-reports', QCReportViewSet, basename='qc-report')
+router.register(r'', ProductionViewSet, basename='production')
+
+urlpatterns = router.urls
@@ -1,3 +1,369 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+import numpy as np
+
+from django.db.models import Avg, Count, F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .aql import evaluate_reports, order_quantities, sampling_plan
+from .defects import DIMENSIONS, DefectFrame, cached
+from .models import DefectCode, DefectFact, Production, ProductionApproval, ProductionLine, ProductionStage, QCReport, StagePlan
+from .planning import plan_capacity
+from .serializers import ProductionLineSerializer, ProductionSerializer, QCReportSerializer, StagePlanSerializer
+
+# Orders whose production is still on the floor
+ACTIVE_ORDER_STATUSES = ['PI_GENERATED', 'ADVANCE_RECEIVED', 'PRODUCTION', 'QC_PASSED']
+MAX_STUCK_ROWS = 200
+ANALYTICS_VIEWS = ['pareto', 'rates', 'trend']
+
+
+class ProductionViewSet(viewsets.ModelViewSet):
+    """
+    Production tracking (SELLER/ADMIN only)
+    - List/Retrieve/Create/Update: stages and approvals as JSON, mirrored into indexed rows
+    - wip: floor dashboard aggregated in SQL over active orders
+    """
+    serializer_class = ProductionSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['order', 'order__status']
+    search_fields = ['order__pi_number', 'order__buyer_name']
+    ordering_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() in ['SELLER', 'ADMIN']:
+            return Production.objects.select_related('order', 'shipment').prefetch_related('qc_reports').order_by('-created_at')
+        return Production.objects.none()
+
+    def check_write_role(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() not in ['SELLER', 'ADMIN']:
+            raise PermissionDenied(detail='Only seller or admin users can manage production')
+
+    def perform_create(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_write_role()
+        instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def wip(self, request):
+        """Work in progress across active orders.
+
+        - stages: orders and average progress per stage and status
+        - pending_approvals: orders waiting per approval type
+        - progress_since: average progress per stage of rows updated since
+          ?since=YYYY-MM-DD (default: start of this week)
+        - stuck: unfinished stages started more than ?stuck_days (default 7)
+          days ago, optionally only ?stage=stitching
+        """
+        self.check_write_role()
+        params = request.query_params
+        today = timezone.localdate()
+        try:
+            stuck_days = int(params.get('stuck_days', 7))
+        except ValueError:
+            return Response({'success': False, 'error': 'stuck_days must be a number'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        since = today - timedelta(days=today.weekday())
+        if params.get('since'):
+            try:
+                since = parse_date(params['since'])
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({'success': False, 'error': 'since must be a date (YYYY-MM-DD)'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        stages = ProductionStage.objects.filter(order__status__in=ACTIVE_ORDER_STATUSES)
+        approvals = ProductionApproval.objects.filter(order__status__in=ACTIVE_ORDER_STATUSES)
+        if params.get('stage'):
+            stages = stages.filter(stage=params['stage'].strip().lower())
+
+        by_stage = (
+            stages.values('stage', 'status')
+            .annotate(orders=Count('order', distinct=True), average_progress=Avg('progress'))
+            .order_by('stage', 'status')
+        )
+        pending = (
+            approvals.filter(status='PENDING')
+            .values('approval')
+            .annotate(orders=Count('order', distinct=True))
+            .order_by('-orders', 'approval')
+        )
+        recent = (
+            stages.filter(updated_at__date__gte=since)
+            .values('stage')
+            .annotate(rows=Count('id'), average_progress=Avg('progress'))
+            .order_by('stage')
+        )
+        stuck = (
+            stages.exclude(status='COMPLETED')
+            .filter(start_date__lte=today - timedelta(days=stuck_days))
+            .annotate(pi_number=F('order__pi_number'), buyer_name=F('order__buyer_name'))
+            .values('order_id', 'pi_number', 'buyer_name', 'stage', 'status', 'progress', 'start_date')
+            .order_by('start_date', 'order_id')[:MAX_STUCK_ROWS]
+        )
+
+        def rounded(rows):
+            return [{**row, 'average_progress': round(row['average_progress'] or 0, 1)} for row in rows]
+
+        return Response({
+            'success': True,
+            'data': {
+                'stages': rounded(by_stage),
+                'pending_approvals': list(pending),
+                'progress_since': since,
+                'progress': rounded(recent),
+                'stuck': [{**row, 'days': (today - row['start_date']).days} for row in stuck],
+            },
+        }, status=status.HTTP_200_OK)
+
+
+def _rate(value):
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def _label_names(dimension, labels):
+    """Display names for defect / supplier ids; other dimensions are shown as stored."""
+    if dimension == 'defect':
+        return dict(DefectCode.objects.filter(pk__in=[int(label) for label in labels]).values_list('pk', 'name'))
+    if dimension == 'supplier':
+        from suppliers.models import Supplier
+        return dict(Supplier.objects.filter(pk__in=[int(label) for label in labels]).values_list('pk', 'name'))
+    return {}
+
+
+def _label(value, names):
+    if isinstance(value, np.integer):
+        value = int(value)
+        if value < 0:
+            return None, None
+    return value, names.get(value, value)
+
+
+class QCReportViewSet(viewsets.ModelViewSet):
+    """
+    QC reports (SELLER/ADMIN only)
+    - Create/Update: sample size, Ac/Re and PASS/FAIL are set from the ISO 2859-1 tables
+    - sampling-plan: plan for a lot size or an order
+    - evaluate: re-apply plans to every QC report of active orders
+    - analytics: defect Pareto, defects per 1000 pieces and weekly trends
+    """
+    serializer_class = QCReportSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['production', 'production__order', 'type', 'status']
+    ordering_fields = ['date']
+
+    def get_queryset(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() in ['SELLER', 'ADMIN']:
+            return QCReport.objects.all()
+        return QCReport.objects.none()
+
+    def check_write_role(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() not in ['SELLER', 'ADMIN']:
+            raise PermissionDenied(detail='Only seller or admin users can manage QC reports')
+
+    def perform_create(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_write_role()
+        instance.delete()
+
+    @action(detail=False, methods=['get'], url_path='sampling-plan')
+    def sampling_plan(self, request):
+        """Sample size and Ac/Re for ?lot_size=N or ?order=<id> (order quantity).
+
+        Optional: ?aql=2.5&level=I|II|III&severity=NORMAL|TIGHTENED|REDUCED
+        """
+        self.check_write_role()
+        params = request.query_params
+        try:
+            if params.get('order'):
+                lot_size = order_quantities([int(params['order'])]).get(int(params['order']))
+            else:
+                lot_size = int(params.get('lot_size', ''))
+        except ValueError:
+            return Response({'success': False, 'error': 'Provide lot_size or order as a number'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not lot_size:
+            return Response({'success': False, 'error': 'The order has no quantity'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            plan = sampling_plan(
+                lot_size,
+                params.get('aql', '2.5'),
+                params.get('level', 'II').upper(),
+                params.get('severity', 'NORMAL').upper(),
+            )
+        except ValueError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'success': True, 'data': {'lot_size': lot_size, **plan._asdict()}},
+                        status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def evaluate(self, request):
+        """Apply sampling plans and PASS/FAIL to all QC reports of active orders"""
+        self.check_write_role()
+        summary = evaluate_reports(QCReport.objects.filter(production__order__status__in=ACTIVE_ORDER_STATUSES))
+        return Response({'success': True, 'data': summary}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """Defect analytics, cached until the next QC report is saved.
+
+        ?view=pareto (default) | rates | trend
+        ?by=defect|supplier|style|qc_type|week|order (rates and trend)
+        Filters: ?from=YYYY-MM-DD&to=YYYY-MM-DD&supplier=&style=&qc_type=&order=
+        """
+        self.check_write_role()
+        params = request.query_params
+        view = params.get('view', 'pareto')
+        by = params.get('by') or ('supplier' if view == 'rates' else None)
+        if view not in ANALYTICS_VIEWS:
+            return Response({'success': False, 'error': f'view must be one of {", ".join(ANALYTICS_VIEWS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if by is not None and by not in DIMENSIONS:
+            return Response({'success': False, 'error': f'by must be one of {", ".join(DIMENSIONS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        facts = DefectFact.objects.all()
+        for param, lookup in [('from', 'date__gte'), ('to', 'date__lte')]:
+            if params.get(param):
+                try:
+                    day = parse_date(params[param])
+                except ValueError:
+                    day = None
+                if day is None:
+                    return Response({'success': False, 'error': f'{param} must be a date (YYYY-MM-DD)'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                facts = facts.filter(**{lookup: day})
+        key = {name: params.get(name) for name in ['from', 'to', 'style', 'qc_type']}
+        for param in ['supplier', 'order']:
+            if params.get(param):
+                try:
+                    key[param] = int(params[param])
+                except ValueError:
+                    return Response({'success': False, 'error': f'{param} must be an id'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+        for param in ['supplier', 'style', 'qc_type', 'order']:
+            if key.get(param):
+                facts = facts.filter(**{DIMENSIONS[param]: key[param]})
+
+        key.update(view=view, by=by)
+
+        def compute():
+            frame = DefectFrame.from_queryset(facts)
+            if view == 'pareto':
+                labels, counts, share, cumulative = frame.pareto(limit=50)
+                names = _label_names('defect', labels)
+                return [
+                    {'defect': int(label), 'name': names.get(int(label)), 'count': int(count),
+                     'share': round(float(pct), 2), 'cumulative': round(float(cum), 2)}
+                    for label, count, pct, cum in zip(labels, counts, share, cumulative)
+                ]
+            if view == 'rates':
+                labels, defects, inspected, rates = frame.totals(by)
+                names = _label_names(by, labels) if by in ('defect', 'supplier') else {}
+                rows = []
+                for label, count, pieces, rate in zip(labels, defects, inspected, rates):
+                    value, name = _label(label, names)
+                    rows.append({by: value, 'name': name, 'defects': int(count), 'inspected': int(pieces),
+                                 'per_1000': _rate(rate)})
+                return rows
+            rows = frame.trend(by)
+            names = _label_names(by, {key for _, key, *_ in rows}) if by in ('defect', 'supplier') else {}
+            data = []
+            for week, label, count, pieces, rate in rows:
+                row = {'week': week, 'defects': count, 'inspected': pieces, 'per_1000': _rate(rate)}
+                if by is not None:
+                    row[by], row['name'] = _label(label, names)
+                data.append(row)
+            return data
+
+        return Response({'success': True, 'data': cached(key, compute)}, status=status.HTTP_200_OK)
+
+
+class ProductionLineViewSet(viewsets.ModelViewSet):
+    """
+    Production lines and their capacity (SELLER/ADMIN only)
+    - schedule: projected stage dates per order from the last plan
+    - replan: load confirmed orders onto the lines again
+    """
+    serializer_class = ProductionLineSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['stage', 'is_active']
+    search_fields = ['name']
+
+    def get_queryset(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() in ['SELLER', 'ADMIN']:
+            return ProductionLine.objects.all()
+        return ProductionLine.objects.none()
+
+    def check_write_role(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() not in ['SELLER', 'ADMIN']:
+            raise PermissionDenied(detail='Only seller or admin users can manage production lines')
+
+    def perform_create(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_write_role()
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        self.check_write_role()
+        instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def schedule(self, request):
+        """Planned stages, filtered by ?order=, ?line=, ?stage= or ?late=true"""
+        self.check_write_role()
+        params = request.query_params
+        plans = StagePlan.objects.select_related('order', 'line').order_by('due_date', 'order_id', 'sequence')
+        for param in ['order', 'line']:
+            if params.get(param):
+                try:
+                    plans = plans.filter(**{param: int(params[param])})
+                except ValueError:
+                    return Response({'success': False, 'error': f'{param} must be an id'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+        if params.get('stage'):
+            plans = plans.filter(stage=params['stage'].strip().lower())
+        if params.get('late', '').lower() in ['1', 'true', 'yes']:
+            plans = plans.filter(order__stage_plans__is_late=True).distinct()
+
+        page = self.paginate_queryset(plans)
+        if page is not None:
+            return self.get_paginated_response(StagePlanSerializer(page, many=True).data)
+        return Response({'success': True, 'data': StagePlanSerializer(plans, many=True).data},
+                        status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def replan(self, request):
+        """Rebuild the plan for all confirmed orders"""
+        self.check_write_role()
+        return Response({'success': True, 'data': plan_capacity()}, status=status.HTTP_200_OK)
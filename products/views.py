@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from .models import Product
 from .serializers import ProductSerializer
+from backend.throttling import IPBucketThrottle, UserBucketThrottle
 from rest_framework.decorators import action
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
@@ -26,6 +27,12 @@ class ProductViewSet(viewsets.ModelViewSet):
     filterset_fields = ['category', 'sub_category']
     search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'name', 'moq']
+    throttle_scope = 'upload_image'
+
+    def get_throttles(self):
+        if self.action == 'upload_image':
+            return [IPBucketThrottle(), UserBucketThrottle()]
+        return super().get_throttles()
 
     def create(self, request, *args, **kwargs):
         user = request.user
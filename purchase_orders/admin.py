@@ -5,21 +5,22 @@ from .models import PurchaseOrder, POItem, POPayment
 class POItemInline(admin.TabularInline):
     model = POItem
     extra = 1
+    raw_id_fields = ['component']
     readonly_fields = ['amount']
 
 
 class POPaymentInline(admin.TabularInline):
     model = POPayment
     extra = 0
-    readonly_fields = ['date', 'created_at']
+    readonly_fields = ['created_at']
 
 
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
-    list_display = ['po_number', 'supplier', 'type', 'total_amount', 'status', 'created_at']
+    list_display = ['po_number', 'supplier', 'type', 'total_amount', 'amount_paid', 'status', 'created_at']
     list_filter = ['type', 'status', 'created_at']
     search_fields = ['po_number', 'supplier__name']
-    readonly_fields = ['po_number', 'created_at', 'updated_at']
+    readonly_fields = ['po_number', 'amount_paid', 'created_at', 'updated_at']
     inlines = [POItemInline, POPaymentInline]
     
     fieldsets = (
@@ -27,7 +28,7 @@ class PurchaseOrderAdmin(admin.ModelAdmin):
             'fields': ('po_number', 'supplier', 'type', 'linked_order', 'status')
         }),
         ('Pricing & Delivery', {
-            'fields': ('total_amount', 'delivery_date')
+            'fields': ('total_amount', 'amount_paid', 'currency', 'delivery_date')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -0,0 +1,51 @@
+"""
+Django management command to import PO payments from a CSV file
+Usage: python manage.py import_po_payments payments.csv [--dry-run]
+
+Columns: po_number, amount, and optionally date (YYYY-MM-DD), method,
+reference. The whole file is posted in one transaction: PO amounts paid,
+statuses and the supplier ledger are updated in bulk, or nothing is.
+"""
+import csv
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from purchase_orders.payments import import_payments
+
+
+class Command(BaseCommand):
+    help = 'Imports PO payments from CSV in a single transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file with po_number, amount[, date, method, reference]')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the file')
+
+    def handle(self, *args, **options):
+        rows = []
+        try:
+            with open(options['file'], newline='', encoding='utf-8-sig') as handle:
+                for line, row in enumerate(csv.DictReader(handle), start=2):
+                    if not row.get('po_number') or not row.get('amount'):
+                        raise CommandError(f'Line {line}: po_number and amount are required')
+                    if row.get('date'):
+                        day = parse_date(row['date'].strip())
+                        if day is None:
+                            raise CommandError(f'Line {line}: date must be YYYY-MM-DD')
+                        row['date'] = timezone.make_aware(datetime.combine(day, time(12)))
+                    rows.append(row)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(rows)} payment(s) read')
+            return
+        try:
+            payments = import_payments(rows)
+        except (ValueError, ArithmeticError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(payments)} payment(s) against {len({p.purchase_order_id for p in payments})} PO(s)'
+        ))
@@ -0,0 +1,34 @@
+"""
+Django management command to raise draft purchase orders from confirmed orders
+Usage: python manage.py run_mrp [--dry-run]
+
+Explodes every confirmed order through its costing sheet, nets the result
+against POs already linked to the order and creates DRAFT POs and items for
+the shortfall in bulk. Safe to re-run: covered requirements are skipped.
+"""
+from django.core.management.base import BaseCommand
+
+from purchase_orders.mrp import run_mrp
+
+
+class Command(BaseCommand):
+    help = 'Creates draft purchase orders for unordered material of confirmed orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be ordered')
+
+    def handle(self, *args, **options):
+        summary = run_mrp(dry_run=options['dry_run'])
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['purchase_orders']} PO(s) with {summary['items']} item(s) "
+            f"for {summary['orders']} order(s)"
+        ))
+        if summary['unmatched_styles']:
+            self.stdout.write(self.style.WARNING(
+                f"No costing for style(s): {', '.join(summary['unmatched_styles'])}"
+            ))
+        if summary['unsourced_categories']:
+            self.stdout.write(self.style.WARNING(
+                f"No supplier for: {', '.join(summary['unsourced_categories'])}"
+            ))
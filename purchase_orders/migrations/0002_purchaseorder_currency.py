@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='currency',
+            field=models.CharField(default='INR', max_length=3),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0002_purchaseorder_currency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='amount_paid',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0, help_text='Sum of payments, kept by purchase_orders.payments', max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='popayment',
+            name='date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def backfill_amount_paid(apps, schema_editor):
+    PurchaseOrder = apps.get_model('purchase_orders', 'PurchaseOrder')
+    POPayment = apps.get_model('purchase_orders', 'POPayment')
+
+    paid = Subquery(
+        POPayment.objects.filter(purchase_order=OuterRef('pk'))
+        .order_by()
+        .values('purchase_order')
+        .annotate(total=Sum('amount'))
+        .values('total'),
+        output_field=MONEY,
+    )
+    PurchaseOrder.objects.update(amount_paid=Coalesce(paid, Value(Decimal(0)), output_field=MONEY))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0003_po_amount_paid'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_amount_paid, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('costings', '0003_bill_of_materials'),
+        ('purchase_orders', '0004_backfill_amount_paid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poitem',
+            name='component',
+            field=models.ForeignKey(blank=True, help_text='BOM component bought on this line (used by MRP netting)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='po_items', to='costings.component'),
+        ),
+    ]
@@ -1,5 +1,5 @@
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction
+from django.utils import timezone
 
 
 class PurchaseOrder(models.Model):
@@ -35,6 +35,10 @@ class PurchaseOrder(models.Model):
     
     # Pricing
     total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    amount_paid = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, db_index=True, help_text='Sum of payments, kept by purchase_orders.payments'
+    )
+    currency = models.CharField(max_length=3, default='INR')
     delivery_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=PO_STATUS_CHOICES, default='DRAFT')
     
@@ -48,21 +52,26 @@ class PurchaseOrder(models.Model):
         verbose_name_plural = 'Purchase Orders'
     
     def save(self, *args, **kwargs):
-        """Auto-generate PO number and update supplier ledger"""
+        """Auto-generate PO number and post the bill to the supplier ledger"""
+        from suppliers.ledger import bill_entry, post
+
         is_new = self.pk is None
         
         if not self.po_number:
-            import time
-            self.po_number = f'PO-{int(time.time())}'
+            from sequences.service import next_number
+            self.po_number = next_number('PO')
         
-        super().save(*args, **kwargs)
+        if not is_new and kwargs.get('update_fields') is None:
+            # amount_paid only moves with payments; never write back a stale copy
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'amount_paid'
+            ]
         
-        # Update supplier ledger when creating PO
-        if is_new:
-            supplier = self.supplier
-            supplier.total_billed += self.total_amount
-            supplier.balance += self.total_amount
-            supplier.save()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                post([bill_entry(self)])
     
     def __str__(self):
         return f'{self.po_number} - {self.supplier.name} (${self.total_amount})'
@@ -73,6 +82,14 @@ class POItem(models.Model):
     Line items in a Purchase Order
     """
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='items')
+    component = models.ForeignKey(
+        'costings.Component',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='po_items',
+        help_text='BOM component bought on this line (used by MRP netting)'
+    )
     
     description = models.CharField(max_length=255)
     quantity = models.DecimalField(max_digits=10, decimal_places=2)
@@ -96,7 +113,7 @@ class POPayment(models.Model):
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, related_name='payments')
     
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(default=timezone.now)
     method = models.CharField(max_length=100, blank=True, help_text='e.g., Bank Transfer, Cash')
     reference = models.CharField(max_length=255, blank=True, help_text='Transaction reference')
     proof_url = models.FileField(upload_to='po_payments/', blank=True)
@@ -109,27 +126,15 @@ class POPayment(models.Model):
         verbose_name_plural = 'PO Payments'
     
     def save(self, *args, **kwargs):
-        """Update supplier ledger and PO status on payment"""
+        """Add the payment to the PO's amount_paid and status and to the supplier ledger"""
+        from .payments import apply_payments
+
         is_new = self.pk is None
         
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            # Update supplier ledger
-            supplier = self.purchase_order.supplier
-            supplier.total_paid += self.amount
-            supplier.balance -= self.amount
-            supplier.save()
-            
-            # Update PO status based on total payments
-            po = self.purchase_order
-            total_paid = po.payments.aggregate(Sum('amount'))['amount__sum'] or 0
-            
-            if total_paid >= po.total_amount:
-                po.status = 'COMPLETED'
-            else:
-                po.status = 'PARTIAL_RECEIVED'
-            po.save()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                apply_payments([self])
     
     def __str__(self):
         return f'Payment ${self.amount} for {self.purchase_order.po_number}'
@@ -0,0 +1,267 @@
+"""
+Material requirements planning.
+
+``run_mrp()`` explodes the whole confirmed order book in one pass. Each
+order line is matched to its costing sheet by style number (preferring a
+sheet of the order's lead), and its pieces are multiplied through the
+sheet: every BOM line (component consumption incl. wastage), the sheet's
+own fabric consumption, trims and packing per garment, and cut & make.
+
+Requirements are summed per order and key (the component, or the PO type
+and supplier category for sheet-level costs) and netted against the items
+already on non-cancelled POs linked to the same order; items without a
+component count towards the category of their PO's supplier. Shortfalls become DRAFT
+purchase orders, one per order, PO type, supplier and currency. Lines go
+to the component's supplier, or else to the first supplier of the
+matching category (fabric, trims, packing, manufacturing).
+
+Reads are a fixed number of queries and writes are two ``bulk_create``
+calls plus one ledger posting, however many orders are open. The orders
+are locked (``SELECT ... FOR UPDATE``) for the whole run, so concurrent runs
+are serialised. Since new items are netted on the next run, running it
+again creates nothing until orders or costings change.
+"""
+from collections import defaultdict
+from decimal import ROUND_CEILING, Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import POItem, PurchaseOrder
+
+CENT = Decimal('0.01')
+
+# Component type -> (PO type, supplier category)
+COMPONENT_SOURCES = {
+    'FABRIC': ('FABRIC', 'FABRIC'),
+    'TRIM': ('TRIM', 'TRIMS'),
+    'PACKING': ('TRIM', 'PACKING'),
+    'OTHER': ('TRIM', 'TRIMS'),
+}
+
+# Costing sheet cost per garment -> (PO type, supplier category, description)
+SHEET_SOURCES = [
+    ('trim_cost', 'TRIM', 'TRIMS', 'Trims'),
+    ('packing_cost', 'TRIM', 'PACKING', 'Packing'),
+    ('cm_cost', 'MANUFACTURING', 'MANUFACTURING', 'Cut & make'),
+]
+
+
+def sheet_requirements(costing):
+    """
+    ``[(PO type, category, label, unit, quantity per garment, rate)]`` for
+    the costs entered on the sheet itself rather than as BOM lines.
+    """
+    lines = []
+    if costing.fabric_consumption and costing.fabric_cost:
+        lines.append(('FABRIC', 'FABRIC', 'Fabric', '', costing.fabric_consumption, costing.fabric_cost))
+    for field, po_type, category, label in SHEET_SOURCES:
+        if getattr(costing, field):
+            lines.append((po_type, category, label, 'pcs', Decimal(1), getattr(costing, field)))
+    return lines
+
+
+def _costings(products):
+    """``{(style number, lead id): Costing}``, the latest sheet per style also under lead None."""
+    from costings.models import Costing
+
+    styles = {style for _, _, style, _ in products}
+    costings = {}
+    for costing in Costing.objects.filter(style_number__in=styles).exclude(style_number='').order_by('created_at', 'id'):
+        costings[(costing.style_number, costing.lead_id)] = costing
+        costings[(costing.style_number, None)] = costing
+    return costings
+
+
+def _bom_lines(costing_ids):
+    """``{costing id: [(component id, type, description, unit, quantity per garment, price, currency, supplier id)]}``"""
+    from costings.bom import effective_quantity
+    from costings.models import CostingComponent
+
+    lines = defaultdict(list)
+    for row in CostingComponent.objects.filter(costing_id__in=list(costing_ids)).values_list(
+        'costing_id', 'component_id', 'component__type', 'component__code', 'component__name', 'component__unit',
+        'consumption', 'wastage', 'component__price', 'component__currency', 'component__supplier_id',
+    ).order_by('costing_id', 'component__code'):
+        costing_id, component_id, kind, code, name, unit, consumption, wastage, price, currency, supplier_id = row
+        lines[costing_id].append((
+            component_id, kind, f'{code} - {name}', unit, effective_quantity(consumption, wastage),
+            price, currency, supplier_id,
+        ))
+    return lines
+
+
+def _default_suppliers():
+    """``{category: supplier id}``, the first supplier of each category by name."""
+    from suppliers.models import Supplier
+
+    defaults = {}
+    for pk, category in Supplier.objects.exclude(category='').order_by('name', 'id').values_list('pk', 'category'):
+        defaults.setdefault(category, pk)
+    return defaults
+
+
+def explode(orders):
+    """
+    Gross requirements of ``orders`` (a queryset); returns
+    ``(requirements, unmatched style numbers)`` where requirements maps
+    ``(order id, PO type, component id, '')`` for BOM lines and
+    ``(order id, PO type, None, category)`` for sheet-level costs to a dict
+    with ``quantity``, ``description``, ``unit``, ``rate``, ``currency``,
+    ``supplier`` and ``category``. Sheet-level costs of several styles in one
+    order are summed at their average rate, in the first sheet's currency.
+    """
+    from currencies.rates import conversion_factor, get_rates
+    from orders.models import OrderProduct
+
+    products = list(
+        OrderProduct.objects.filter(order__in=orders, quantity__gt=0)
+        .values_list('order_id', 'order__lead_id', 'style_number', 'quantity')
+        .order_by('order_id', 'id')
+    )
+    costings = _costings(products)
+    bom = _bom_lines({costing.pk for costing in costings.values()})
+
+    requirements = {}
+    unmatched = set()
+    rates = None
+
+    def add(key, quantity, **details):
+        if key in requirements:
+            requirements[key]['quantity'] += quantity
+        else:
+            requirements[key] = {'quantity': quantity, **details}
+
+    for order_id, lead_id, style, pieces in products:
+        costing = costings.get((style, lead_id)) or costings.get((style, None))
+        if costing is None:
+            unmatched.add(style)
+            continue
+        for component_id, kind, description, unit, per_piece, price, currency, supplier_id in bom[costing.pk]:
+            po_type, category = COMPONENT_SOURCES.get(kind, COMPONENT_SOURCES['OTHER'])
+            add(
+                (order_id, po_type, component_id, ''), per_piece * pieces, description=description, unit=unit,
+                rate=price, currency=currency, supplier=supplier_id, category=category,
+            )
+        for po_type, category, label, unit, per_piece, rate in sheet_requirements(costing):
+            # One line per order and category, whichever styles it is for
+            key = (order_id, po_type, None, category)
+            quantity = per_piece * pieces
+            requirement = requirements.setdefault(key, {
+                'quantity': Decimal(0), 'value': Decimal(0), 'label': label, 'styles': [], 'unit': unit,
+                'currency': costing.currency, 'supplier': None, 'category': category,
+            })
+            if costing.currency.upper() != requirement['currency'].upper():
+                rates = rates if rates is not None else get_rates()
+                rate *= conversion_factor(costing.currency, requirement['currency'], rates)
+            requirement['quantity'] += quantity
+            requirement['value'] += quantity * rate
+            sheet_style = costing.style_number or costing.style_name
+            if sheet_style not in requirement['styles']:
+                requirement['styles'].append(sheet_style)
+
+    for requirement in requirements.values():
+        if 'value' in requirement:
+            requirement['description'] = f"{requirement.pop('label')} for {', '.join(requirement.pop('styles'))}"
+            requirement['rate'] = requirement.pop('value') / requirement['quantity']
+    return requirements, sorted(unmatched)
+
+
+def ordered_quantities(order_ids):
+    """
+    Quantities already on non-cancelled POs, keyed like ``explode``
+    requirements: items without a component count towards the category of
+    their PO's supplier.
+    """
+    ordered = defaultdict(Decimal)
+    rows = (
+        POItem.objects.filter(purchase_order__linked_order_id__in=list(order_ids))
+        .exclude(purchase_order__status='CANCELLED')
+        .values_list(
+            'purchase_order__linked_order_id', 'purchase_order__type', 'component_id',
+            'purchase_order__supplier__category',
+        )
+        .annotate(total=Sum('quantity'))
+        .order_by()
+    )
+    for order_id, po_type, component_id, category, total in rows:
+        ordered[(order_id, po_type, component_id, '' if component_id else category)] += total
+    return ordered
+
+
+def plan_purchases(orders):
+    """
+    Net requirements of ``orders`` as unsaved DRAFT purchase orders; returns
+    ``(purchase orders, items, summary)``. Items reference their PO object.
+    """
+    requirements, unmatched = explode(orders)
+    ordered = ordered_quantities({key[0] for key in requirements})
+    defaults = _default_suppliers()
+
+    lines = defaultdict(list)
+    unsourced = set()
+    for key in sorted(requirements, key=lambda key: (key[0], key[1], requirements[key]['description'])):
+        requirement = requirements[key]
+        quantity = (requirement['quantity'] - ordered.get(key, 0)).quantize(CENT, rounding=ROUND_CEILING)
+        if quantity <= 0:
+            continue
+        supplier_id = requirement['supplier'] or defaults.get(requirement['category'])
+        if supplier_id is None:
+            unsourced.add(requirement['category'])
+            continue
+        order_id, po_type, component_id, _ = key
+        rate = Decimal(requirement['rate']).quantize(CENT)
+        lines[(order_id, po_type, supplier_id, requirement['currency'])].append(POItem(
+            component_id=component_id, description=requirement['description'][:255], quantity=quantity,
+            unit=requirement['unit'] or '', rate=rate, amount=(quantity * rate).quantize(CENT),
+        ))
+
+    pos = []
+    items = []
+    for (order_id, po_type, supplier_id, currency), po_items in lines.items():
+        po = PurchaseOrder(
+            supplier_id=supplier_id, type=po_type, linked_order_id=order_id, currency=currency, status='DRAFT',
+            total_amount=sum((item.amount for item in po_items), Decimal(0)),
+        )
+        for item in po_items:
+            item.purchase_order = po
+        pos.append(po)
+        items.extend(po_items)
+    summary = {
+        'orders': len({key[0] for key in lines}),
+        'purchase_orders': len(pos),
+        'items': len(items),
+        'unmatched_styles': unmatched,
+        'unsourced_categories': sorted(unsourced),
+    }
+    return pos, items, summary
+
+
+def run_mrp(orders=None, dry_run=False, batch_size=500):
+    """
+    Create DRAFT POs for the unordered requirements of ``orders`` (default:
+    every confirmed order) and post their bills to the supplier ledger.
+    Returns the ``plan_purchases`` summary.
+    """
+    from orders.models import Order
+    from production.planning import CONFIRMED_ORDER_STATUSES
+    from sequences.service import assign_numbers
+    from suppliers.ledger import bill_entry, post
+
+    if orders is None:
+        orders = Order.objects.filter(status__in=CONFIRMED_ORDER_STATUSES)
+    with transaction.atomic():
+        # Concurrent runs over the same orders wait here and then net against
+        # the POs this one commits, instead of planning the same shortfall twice
+        locked = list(
+            Order.objects.select_for_update().filter(pk__in=orders.values('pk')).order_by('pk').values_list('pk', flat=True)
+        )
+        pos, items, summary = plan_purchases(Order.objects.filter(pk__in=locked))
+        if dry_run or not pos:
+            return summary
+        assign_numbers(pos, 'PO', 'po_number')
+        PurchaseOrder.objects.bulk_create(pos, batch_size=batch_size)
+        POItem.objects.bulk_create(items, batch_size=batch_size)
+        # bulk_create skips PurchaseOrder.save, which posts the bill
+        post([bill_entry(po) for po in pos], batch_size=batch_size)
+    return summary
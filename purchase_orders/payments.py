@@ -0,0 +1,83 @@
+"""
+PO payment posting.
+
+``PurchaseOrder.amount_paid`` is the running sum of its payments. New
+payments move it with one ``UPDATE`` per batch, ``amount_paid = amount_paid
++ CASE id WHEN ... END``, and the same statement sets the status from the
+new amount (COMPLETED once fully paid, PARTIAL_RECEIVED before that), so
+paying never re-aggregates earlier payments or rewrites the whole PO row.
+The supplier ledger is posted in the same transaction.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+
+from .models import POPayment, PurchaseOrder
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def apply_payments(payments):
+    """Add saved ``payments`` to their POs' ``amount_paid``/status and to the supplier ledger."""
+    from suppliers.ledger import payment_entry, post
+
+    added = defaultdict(Decimal)
+    for payment in payments:
+        added[payment.purchase_order_id] += Decimal(payment.amount)
+    if not added:
+        return 0
+
+    delta = Case(
+        *[When(pk=po_id, then=Value(amount)) for po_id, amount in added.items()],
+        default=Value(Decimal(0)),
+        output_field=MONEY,
+    )
+    with transaction.atomic(savepoint=False):
+        updated = PurchaseOrder.objects.filter(pk__in=list(added)).update(
+            amount_paid=F('amount_paid') + delta,
+            status=Case(
+                When(status='CANCELLED', then=F('status')),
+                When(total_amount__lte=F('amount_paid') + delta, then=Value('COMPLETED')),
+                default=Value('PARTIAL_RECEIVED'),
+            ),
+        )
+        suppliers = dict(PurchaseOrder.objects.filter(pk__in=list(added)).order_by().values_list('pk', 'supplier_id'))
+        post([payment_entry(payment, suppliers[payment.purchase_order_id]) for payment in payments])
+    return updated
+
+
+def import_payments(rows, batch_size=500):
+    """
+    Create payments from dicts with ``po_number``, ``amount`` and optionally
+    ``date``, ``method`` and ``reference``, all in one transaction. Raises
+    ValueError (before writing anything) for unknown PO numbers or
+    non-positive amounts. Returns the created payments.
+    """
+    rows = list(rows)
+    numbers = {str(row['po_number']).strip() for row in rows}
+    pos = dict(PurchaseOrder.objects.filter(po_number__in=numbers).values_list('po_number', 'pk'))
+    missing = sorted(numbers - set(pos))
+    if missing:
+        raise ValueError(f'Unknown PO number(s): {", ".join(missing[:20])}')
+
+    payments = []
+    for row in rows:
+        amount = Decimal(str(row['amount']))
+        if amount <= 0:
+            raise ValueError(f'Payment amounts must be positive (PO {row["po_number"]}: {amount})')
+        payment = POPayment(
+            purchase_order_id=pos[str(row['po_number']).strip()],
+            amount=amount,
+            method=row.get('method') or '',
+            reference=row.get('reference') or '',
+        )
+        if row.get('date'):
+            payment.date = row['date']
+        payments.append(payment)
+
+    with transaction.atomic():
+        POPayment.objects.bulk_create(payments, batch_size=batch_size)
+        apply_payments(payments)
+    return payments
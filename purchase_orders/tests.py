@@ -1,3 +1,180 @@
+from decimal import Decimal
+
+from unittest import mock
+
+from django.db.models.query import QuerySet
 from django.test import TestCase
 
-# Create your tests here.
+from costings.models import Component, Costing, CostingComponent
+from leads.models import Lead
+from orders.models import Order, OrderProduct
+from suppliers.models import Supplier
+from .models import POItem, POPayment, PurchaseOrder
+from .mrp import run_mrp
+from .payments import import_payments
+
+
+class POPaymentTests(TestCase):
+    """amount_paid and status follow payments without re-aggregating them"""
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name='Stitch Co', category='MANUFACTURING')
+        self.po = PurchaseOrder.objects.create(
+            supplier=self.supplier, type='MANUFACTURING', total_amount=Decimal('1000.00'), status='SENT'
+        )
+
+    def test_payments_update_amount_paid_and_status(self):
+        POPayment.objects.create(purchase_order=self.po, amount=Decimal('600.00'))
+        self.po.refresh_from_db()
+        self.assertEqual((self.po.amount_paid, self.po.status), (Decimal('600.00'), 'PARTIAL_RECEIVED'))
+
+        POPayment.objects.create(purchase_order=self.po, amount=Decimal('400.00'))
+        self.po.refresh_from_db()
+        self.assertEqual((self.po.amount_paid, self.po.status), (Decimal('1000.00'), 'COMPLETED'))
+
+    def test_payment_runs_fixed_queries(self):
+        for _ in range(5):
+            POPayment.objects.create(purchase_order=self.po, amount=Decimal('1.00'))
+        # savepoint, insert, PO update, supplier lookup, ledger insert, supplier update, release
+        with self.assertNumQueries(7):
+            POPayment.objects.create(purchase_order=self.po, amount=Decimal('1.00'))
+
+    def test_stale_po_save_keeps_amount_paid(self):
+        stale = PurchaseOrder.objects.get(pk=self.po.pk)
+        POPayment.objects.create(purchase_order=self.po, amount=Decimal('250.00'))
+        stale.delivery_date = '2026-01-31'
+        stale.save()
+        self.po.refresh_from_db()
+        self.assertEqual(self.po.amount_paid, Decimal('250.00'))
+
+    def test_cancelled_po_keeps_status(self):
+        PurchaseOrder.objects.filter(pk=self.po.pk).update(status='CANCELLED')
+        POPayment.objects.create(purchase_order=self.po, amount=Decimal('100.00'))
+        self.po.refresh_from_db()
+        self.assertEqual((self.po.amount_paid, self.po.status), (Decimal('100.00'), 'CANCELLED'))
+
+    def test_import_posts_all_payments_in_one_update(self):
+        other = PurchaseOrder.objects.create(supplier=self.supplier, type='FABRIC', total_amount=Decimal('50.00'))
+        rows = [
+            {'po_number': self.po.po_number, 'amount': '300'},
+            {'po_number': self.po.po_number, 'amount': '200', 'reference': 'UTR-2'},
+            {'po_number': other.po_number, 'amount': '50'},
+        ]
+        import_payments(rows)
+
+        self.assertEqual(
+            dict(PurchaseOrder.objects.values_list('pk', 'amount_paid')),
+            {self.po.pk: Decimal('500.00'), other.pk: Decimal('50.00')},
+        )
+        other.refresh_from_db()
+        self.supplier.refresh_from_db()
+        self.assertEqual(other.status, 'COMPLETED')
+        self.assertEqual(self.supplier.total_paid, Decimal('550.00'))
+        self.assertEqual(self.supplier.balance, Decimal('500.00'))
+
+    def test_import_rejects_unknown_po_without_writing(self):
+        with self.assertRaises(ValueError):
+            import_payments([
+                {'po_number': self.po.po_number, 'amount': '10'},
+                {'po_number': 'PO/NOPE', 'amount': '10'},
+            ])
+        self.assertFalse(POPayment.objects.exists())
+
+
+class MRPTests(TestCase):
+    """Confirmed orders are exploded through their costings into draft POs, once"""
+
+    def setUp(self):
+        self.mill = Supplier.objects.create(name='Mill', category='FABRIC')
+        self.factory = Supplier.objects.create(name='Factory', category='MANUFACTURING')
+        self.trims = Supplier.objects.create(name='Trims Co', category='TRIMS')
+        lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+        costing = Costing.objects.create(
+            style_name='Tee', style_number='T1', fabric_cost=0, fabric_consumption=0, cm_cost=Decimal('1.50'),
+        )
+        jersey = Component.objects.create(
+            code='JER', name='Jersey', type='FABRIC', unit='m', price=Decimal('3.2500'), supplier=self.mill
+        )
+        button = Component.objects.create(code='BTN', name='Button', type='TRIM', unit='pcs', price=Decimal('0.05'))
+        CostingComponent.objects.create(costing=costing, component=jersey, consumption=Decimal('1.2'), wastage=5)
+        CostingComponent.objects.create(costing=costing, component=button, consumption=3)
+        self.order = Order.objects.create(
+            lead=lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=0, status='PRODUCTION'
+        )
+        OrderProduct.objects.create(order=self.order, style_name='Tee', style_number='T1', quantity=100, unit_price=5)
+        OrderProduct.objects.create(order=self.order, style_name='Polo', style_number='P9', quantity=10, unit_price=5)
+        draft = Order.objects.create(lead=lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=0)
+        OrderProduct.objects.create(order=draft, style_name='Tee', style_number='T1', quantity=50, unit_price=5)
+
+    def items(self):
+        return {
+            (po_type, supplier, description): quantity
+            for po_type, supplier, description, quantity in POItem.objects.values_list(
+                'purchase_order__type', 'purchase_order__supplier__name', 'description', 'quantity'
+            )
+        }
+
+    def test_explodes_confirmed_orders_into_draft_pos(self):
+        summary = run_mrp()
+
+        self.assertEqual((summary['purchase_orders'], summary['items']), (3, 3))
+        self.assertEqual(summary['unmatched_styles'], ['P9'])
+        self.assertEqual(self.items(), {
+            ('FABRIC', 'Mill', 'JER - Jersey'): Decimal('126.00'),
+            ('TRIM', 'Trims Co', 'BTN - Button'): Decimal('300.00'),
+            ('MANUFACTURING', 'Factory', 'Cut & make for T1'): Decimal('100.00'),
+        })
+        self.assertEqual(set(PurchaseOrder.objects.values_list('status', 'linked_order')), {('DRAFT', self.order.pk)})
+        fabric = PurchaseOrder.objects.get(type='FABRIC')
+        self.assertEqual(fabric.total_amount, Decimal('409.50'))
+        self.assertTrue(fabric.po_number)
+        self.mill.refresh_from_db()
+        self.assertEqual(self.mill.balance, Decimal('409.50'))
+
+    def test_rerun_nets_against_existing_pos(self):
+        run_mrp()
+        self.assertEqual(run_mrp()['purchase_orders'], 0)
+
+        first_run = list(PurchaseOrder.objects.values_list('pk', flat=True))
+        PurchaseOrder.objects.filter(type='MANUFACTURING').update(status='CANCELLED')
+        OrderProduct.objects.create(order=self.order, style_name='Tee', style_number='T1', quantity=20, unit_price=5)
+        # order lock, 5 reads, PO numbers, 3 inserts and one supplier update each, whatever the number of orders
+        with self.assertNumQueries(19):
+            summary = run_mrp()
+
+        self.assertEqual((summary['purchase_orders'], summary['items']), (3, 3))
+        self.assertEqual(
+            sorted(POItem.objects.exclude(purchase_order__in=first_run).values_list('description', 'quantity')),
+            [('BTN - Button', Decimal('60.00')), ('Cut & make for T1', Decimal('120.00')),
+             ('JER - Jersey', Decimal('25.20'))],
+        )
+
+    def test_sheet_lines_net_by_category(self):
+        Costing.objects.create(style_name='Polo', style_number='P9', fabric_cost=0, fabric_consumption=0,
+                               cm_cost=Decimal('3.00'))
+        summary = run_mrp()
+        self.assertEqual(summary['unmatched_styles'], [])
+        cm = POItem.objects.get(purchase_order__type='MANUFACTURING')
+        # 100 Tees at 1.50 and 10 Polos at 3.00 on one line
+        self.assertEqual((cm.description, cm.quantity, cm.rate), ('Cut & make for T1, P9', Decimal('110.00'),
+                                                                   Decimal('1.64')))
+
+        # A manual line for the factory counts, whatever its description
+        manual = PurchaseOrder.objects.create(
+            supplier=self.factory, type='MANUFACTURING', linked_order=self.order, total_amount=0
+        )
+        POItem.objects.create(purchase_order=manual, description='CMT charges', quantity=15, rate=1, amount=15)
+        OrderProduct.objects.create(order=self.order, style_name='Polo', style_number='P9', quantity=20, unit_price=5)
+        run_mrp()
+        self.assertEqual(
+            list(POItem.objects.filter(purchase_order__type='MANUFACTURING').exclude(
+                purchase_order__in=[cm.purchase_order_id, manual.pk]
+            ).values_list('description', 'quantity')),
+            [('Cut & make for T1, P9', Decimal('5.00'))],
+        )
+
+    def test_orders_are_locked_while_planning(self):
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as lock:
+            run_mrp(dry_run=True)
+        self.assertEqual([call.args[0].model for call in lock.call_args_list], [Order])
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20)),
+                ('fiscal_year', models.CharField(help_text='e.g., 2026-27', max_length=7)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Document Sequence',
+                'verbose_name_plural': 'Document Sequences',
+                'ordering': ['prefix', '-fiscal_year'],
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'fiscal_year'), name='unique_sequence_prefix_year')],
+            },
+        ),
+    ]
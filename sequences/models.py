@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class DocumentSequence(models.Model):
+    """
+    Last issued counter per document prefix and financial year
+    """
+    prefix = models.CharField(max_length=20)
+    fiscal_year = models.CharField(max_length=7, help_text='e.g., 2026-27')
+    last_value = models.PositiveBigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['prefix', '-fiscal_year']
+        verbose_name = 'Document Sequence'
+        verbose_name_plural = 'Document Sequences'
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'fiscal_year'], name='unique_sequence_prefix_year'),
+        ]
+    
+    def __str__(self):
+        return f'{self.prefix} {self.fiscal_year}: {self.last_value}'
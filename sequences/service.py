@@ -0,0 +1,105 @@
+"""
+Document number sequences, e.g. ``PI/2026-27/000123``.
+
+Counters live in ``DocumentSequence``, one row per prefix and financial
+year. ``reserve()`` claims a contiguous block with a single
+``UPDATE ... SET last_value = last_value + n`` inside a transaction, so
+concurrent processes can never receive the same number. Each process keeps
+the unused part of its last block (``DOCUMENT_NUMBER_BLOCK_SIZE``, default 1)
+in memory; a larger block saves round trips at the cost of gaps when a
+process exits with numbers left over.
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DocumentSequence
+
+
+def fiscal_year(day=None):
+    """Financial year label for ``day``, e.g. ``'2026-27'`` (April start by default)."""
+    day = day or timezone.localdate()
+    start_month = getattr(settings, 'FISCAL_YEAR_START_MONTH', 4)
+    start = day.year if day.month >= start_month else day.year - 1
+    if start_month == 1:
+        return str(start)
+    return f'{start}-{(start + 1) % 100:02d}'
+
+
+def format_number(prefix, year, value):
+    template = getattr(settings, 'DOCUMENT_NUMBER_FORMAT', '{prefix}/{year}/{value:06d}')
+    return template.format(prefix=prefix, year=year, value=value)
+
+
+def reserve(prefix, count=1, year=None):
+    """Claim ``count`` consecutive counter values; returns them as a ``range``."""
+    year = year or fiscal_year()
+    with transaction.atomic():
+        sequence, _ = DocumentSequence.objects.get_or_create(prefix=prefix, fiscal_year=year)
+        rows = DocumentSequence.objects.filter(pk=sequence.pk)
+        rows.update(last_value=F('last_value') + count, updated_at=timezone.now())
+        last_value = rows.values_list('last_value', flat=True).get()
+    return range(last_value - count + 1, last_value + 1)
+
+
+class BlockAllocator:
+    """Hands out numbers from per-process reserved blocks."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._blocks = {}
+
+    def take(self, prefix, count=1, year=None):
+        """Return ``count`` formatted numbers for ``prefix``."""
+        year = year or fiscal_year()
+        key = (prefix, year)
+        block_size = max(getattr(settings, 'DOCUMENT_NUMBER_BLOCK_SIZE', 1), 1)
+
+        with self._lock:
+            values = []
+            current = self._blocks.get(key)
+            if current:
+                values.extend(current[:count])
+                self._blocks[key] = current[count:]
+
+            missing = count - len(values)
+            if missing:
+                # Reserve what is missing plus spares for later calls in this process
+                fresh = reserve(prefix, missing + block_size - 1, year)
+                values.extend(fresh[:missing])
+                spare = fresh[missing:]
+                if spare:
+                    # A rolled-back reservation must not leave usable numbers behind
+                    transaction.on_commit(lambda: self._stash(key, spare))
+
+        return [format_number(prefix, year, value) for value in values]
+
+    def _stash(self, key, spare):
+        with self._lock:
+            self._blocks[key] = spare
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+
+
+allocator = BlockAllocator()
+
+
+def next_number(prefix):
+    return allocator.take(prefix, 1)[0]
+
+
+def assign_numbers(objs, prefix, field):
+    """
+    Fill ``field`` on every object in ``objs`` that has no number yet, using
+    one reservation for the whole list (for use before ``bulk_create``).
+    """
+    pending = [obj for obj in objs if not getattr(obj, field)]
+    if pending:
+        for obj, number in zip(pending, allocator.take(prefix, len(pending))):
+            setattr(obj, field, number)
+    return objs
@@ -0,0 +1,94 @@
+from datetime import date
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from leads.models import Lead
+from orders.models import Order
+
+from .models import DocumentSequence
+from .service import allocator, assign_numbers, fiscal_year, format_number, reserve
+
+
+class Rollback(Exception):
+    pass
+
+
+class SequenceTests(TestCase):
+    """Counters hand out gap-free numbers, or blocks of them per process"""
+
+    def setUp(self):
+        allocator.clear()
+        self.addCleanup(allocator.clear)
+        self.lead = Lead.objects.create(name='Buyer', email='buyer@example.com', country='DE', product_type='T-Shirts')
+        self.year = fiscal_year()
+
+    def order(self, **values):
+        return Order(lead=self.lead, buyer_name='Buyer', buyer_email='buyer@example.com', total_amount=1, **values)
+
+    def last_value(self, prefix):
+        return DocumentSequence.objects.get(prefix=prefix, fiscal_year=self.year).last_value
+
+    def test_fiscal_year_and_format(self):
+        self.assertEqual(fiscal_year(date(2026, 4, 1)), '2026-27')
+        self.assertEqual(fiscal_year(date(2026, 3, 31)), '2025-26')
+        with override_settings(FISCAL_YEAR_START_MONTH=1):
+            self.assertEqual(fiscal_year(date(2026, 3, 31)), '2026')
+        self.assertEqual(format_number('PI', '2026-27', 123), 'PI/2026-27/000123')
+
+    def test_reserve_claims_consecutive_ranges(self):
+        self.assertEqual(reserve('X', 3, '2026-27'), range(1, 4))
+        self.assertEqual(reserve('X', 2, '2026-27'), range(4, 6))
+        self.assertEqual(reserve('X', 1, '2025-26'), range(1, 2))
+
+    def test_numbers_are_gap_free_across_rollbacks(self):
+        first = self.order()
+        first.save()
+        with self.assertRaises(Rollback):
+            with transaction.atomic():
+                self.order().save()
+                raise Rollback
+        second = self.order()
+        second.save()
+        self.assertEqual(
+            [first.pi_number, second.pi_number],
+            [format_number('PI', self.year, 1), format_number('PI', self.year, 2)],
+        )
+
+    def test_assign_numbers_uses_one_reservation(self):
+        numbered = self.order(pi_number='PI/manual/1')
+        orders = [numbered] + [self.order() for _ in range(4)]
+        DocumentSequence.objects.create(prefix='PI', fiscal_year=self.year)
+        # savepoint, counter lookup, update, read back, release
+        with self.assertNumQueries(5):
+            assign_numbers(orders, 'PI', 'pi_number')
+        self.assertEqual(numbered.pi_number, 'PI/manual/1')
+        self.assertEqual(
+            [order.pi_number for order in orders[1:]],
+            [format_number('PI', self.year, value) for value in range(1, 5)],
+        )
+        self.assertEqual(self.last_value('PI'), 4)
+
+    @override_settings(DOCUMENT_NUMBER_BLOCK_SIZE=10)
+    def test_blocks_are_served_from_memory(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(allocator.take('PO'), [format_number('PO', self.year, 1)])
+        self.assertEqual(self.last_value('PO'), 10)
+        with self.assertNumQueries(0):
+            numbers = allocator.take('PO', 9)
+        self.assertEqual(numbers, [format_number('PO', self.year, value) for value in range(2, 11)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(allocator.take('PO', 2), [format_number('PO', self.year, 11), format_number('PO', self.year, 12)])
+        # the two missing numbers plus a block of spares
+        self.assertEqual(self.last_value('PO'), 21)
+
+    @override_settings(DOCUMENT_NUMBER_BLOCK_SIZE=10)
+    def test_rolled_back_block_is_not_reused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(Rollback):
+                with transaction.atomic():
+                    allocator.take('PO')
+                    raise Rollback
+        self.assertEqual(allocator._blocks, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(allocator.take('PO'), [format_number('PO', self.year, 1)])
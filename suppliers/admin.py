@@ -1,5 +1,17 @@
 from django.contrib import admin
-from .models import Supplier
+from .models import Supplier, SupplierBalanceSnapshot, SupplierLedgerEntry
+
+
+class SupplierLedgerEntryInline(admin.TabularInline):
+    model = SupplierLedgerEntry
+    extra = 0
+    can_delete = False
+    fields = ['posted_at', 'kind', 'billed', 'paid', 'purchase_order', 'payment', 'note']
+    readonly_fields = fields
+    ordering = ['-posted_at', '-id']
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Supplier)
@@ -8,6 +20,7 @@ class SupplierAdmin(admin.ModelAdmin):
     list_filter = ['category', 'created_at']
     search_fields = ['name', 'contact_person', 'email']
     readonly_fields = ['total_billed', 'total_paid', 'balance', 'created_at', 'updated_at']
+    inlines = [SupplierLedgerEntryInline]
     
     fieldsets = (
         ('Basic Information', {
@@ -22,3 +35,20 @@ class SupplierAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(SupplierLedgerEntry)
+class SupplierLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ['supplier', 'kind', 'billed', 'paid', 'purchase_order', 'posted_at']
+    list_filter = ['kind', 'posted_at']
+    search_fields = ['supplier__name', 'purchase_order__po_number', 'note']
+    raw_id_fields = ['supplier', 'purchase_order', 'payment']
+
+
+@admin.register(SupplierBalanceSnapshot)
+class SupplierBalanceSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['supplier', 'period_end', 'total_billed', 'total_paid', 'balance']
+    list_filter = ['period_end']
+    search_fields = ['supplier__name']
+    raw_id_fields = ['supplier']
+    readonly_fields = ['supplier', 'period_end', 'closing_at', 'total_billed', 'total_paid', 'balance', 'created_at']
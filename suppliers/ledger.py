@@ -0,0 +1,270 @@
+"""
+Supplier ledger.
+
+Bills (purchase orders) and payments are appended as ``SupplierLedgerEntry``
+rows, and the cached ``Supplier`` totals are moved with ``F()`` expressions
+in the same transaction: ``UPDATE ... SET total_paid = total_paid + x``
+is applied by the database row by row, so concurrent postings for one
+supplier cannot overwrite each other and each posting costs one INSERT and
+one UPDATE per supplier whatever the history size. ``rebuild_totals``
+recomputes the cached totals from the entries.
+
+Past balances come from month-end ``SupplierBalanceSnapshot`` rows
+(``close_months``): ``balances_at`` starts from each supplier's latest
+snapshot before the date and adds only the entries posted after it, and
+``aging`` buckets the last 90 days of entries in one grouped query, with
+everything older falling into 90+. Posting an entry dated inside an
+already closed month drops the snapshots it invalidates; the next
+``close_months`` run writes them again.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DateField, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Least, Round, TruncMonth
+from django.utils import timezone
+
+from .models import Supplier, SupplierBalanceSnapshot, SupplierLedgerEntry
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Decimal('0.00')
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Upper bounds (days old) of the aging buckets; older amounts are 'over_90'
+AGING_BUCKETS = [('current', 30), ('days_31_60', 60), ('days_61_90', 90)]
+
+
+def post(entries, batch_size=500):
+    """Insert ``entries`` and add them to their suppliers' totals in one transaction."""
+    entries = list(entries)
+    if not entries:
+        return []
+    totals = defaultdict(lambda: [ZERO, ZERO])
+    for entry in entries:
+        totals[entry.supplier_id][0] += Decimal(entry.billed)
+        totals[entry.supplier_id][1] += Decimal(entry.paid)
+
+    now = timezone.now()
+    earliest = min(entry.posted_at for entry in entries)
+    # Part of the caller's transaction when there is one; no savepoint needed
+    with transaction.atomic(savepoint=False):
+        SupplierLedgerEntry.objects.bulk_create(entries, batch_size=batch_size)
+        # Only closed months have snapshots, so current postings skip this
+        if earliest < day_start(timezone.localdate().replace(day=1)):
+            SupplierBalanceSnapshot.objects.filter(supplier_id__in=list(totals), closing_at__gt=earliest).delete()
+        # Fixed lock order so two multi-supplier postings cannot deadlock
+        for supplier_id in sorted(totals):
+            billed, paid = totals[supplier_id]
+            Supplier.objects.filter(pk=supplier_id).update(
+                total_billed=F('total_billed') + billed,
+                total_paid=F('total_paid') + paid,
+                balance=F('balance') + billed - paid,
+                updated_at=now,
+            )
+    return entries
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def bill_entry(po):
+    return SupplierLedgerEntry(
+        supplier_id=po.supplier_id, kind='BILL', billed=po.total_amount, purchase_order=po,
+        posted_at=po.created_at or timezone.now(), note=po.po_number,
+    )
+
+
+def payment_entry(payment, supplier_id):
+    return SupplierLedgerEntry(
+        supplier_id=supplier_id, kind='PAYMENT', paid=payment.amount, purchase_order_id=payment.purchase_order_id,
+        payment=payment, posted_at=payment.date or timezone.now(), note=payment.reference,
+    )
+
+
+def _entry_sum(field):
+    return Coalesce(
+        Subquery(
+            SupplierLedgerEntry.objects.filter(supplier=OuterRef('pk'))
+            .order_by()
+            .values('supplier')
+            .annotate(total=Round(Sum(field), 2, output_field=MONEY))
+            .values('total'),
+            output_field=MONEY,
+        ),
+        Value(ZERO),
+        output_field=MONEY,
+    )
+
+
+def drifted_suppliers():
+    """Suppliers whose cached totals differ from the sum of their entries."""
+    return Supplier.objects.annotate(ledger_billed=_entry_sum('billed'), ledger_paid=_entry_sum('paid')).filter(
+        ~Q(total_billed=F('ledger_billed'))
+        | ~Q(total_paid=F('ledger_paid'))
+        | ~Q(balance=F('ledger_billed') - F('ledger_paid'))
+    )
+
+
+def rebuild_totals(supplier_ids=None):
+    """Reset cached totals from the ledger with one UPDATE; returns the number of suppliers."""
+    suppliers = Supplier.objects.all() if supplier_ids is None else Supplier.objects.filter(pk__in=list(supplier_ids))
+    with transaction.atomic():
+        return suppliers.update(
+            total_billed=_entry_sum('billed'),
+            total_paid=_entry_sum('paid'),
+            balance=_entry_sum('billed') - _entry_sum('paid'),
+            updated_at=timezone.now(),
+        )
+
+
+def last_closed_month():
+    """Last day of the previous month."""
+    return timezone.localdate().replace(day=1) - timedelta(days=1)
+
+
+def close_months(through=None, batch_size=500):
+    """
+    Write the missing month-end snapshots of every supplier up to the month
+    of ``through`` (default and upper limit: last month). Each supplier
+    resumes from its latest snapshot, so a monthly run only reads that
+    month's entries. Returns the number of snapshots written.
+    """
+    closed = last_closed_month()
+    through = min(next_month(through) - timedelta(days=1), closed) if through else closed
+
+    latest = SupplierBalanceSnapshot.objects.filter(
+        supplier=OuterRef('supplier'), period_end__lte=through
+    ).order_by('-period_end')
+    starts = {
+        snapshot.supplier_id: snapshot
+        for snapshot in SupplierBalanceSnapshot.objects.filter(pk=Subquery(latest.values('pk')[:1]))
+    }
+
+    # One range per resume point (normally a single one) plus full history for new suppliers
+    resume = defaultdict(list)
+    for supplier_id, snapshot in starts.items():
+        resume[snapshot.closing_at].append(supplier_id)
+    ranges = ~Q(supplier_id__in=list(starts))
+    for closing_at, supplier_ids in resume.items():
+        ranges |= Q(supplier_id__in=supplier_ids, posted_at__gte=closing_at)
+    months = (
+        SupplierLedgerEntry.objects.filter(ranges, posted_at__lt=day_start(next_month(through)))
+        .annotate(month=TruncMonth('posted_at', output_field=DateField()))
+        .values_list('supplier_id', 'month')
+        .annotate(billed=Round(Sum('billed'), 2, output_field=MONEY), paid=Round(Sum('paid'), 2, output_field=MONEY))
+        .order_by()
+    )
+    activity = defaultdict(dict)
+    for supplier_id, month, billed, paid in months:
+        activity[supplier_id][month] = (billed, paid)
+
+    snapshots = []
+    for supplier_id in set(starts) | set(activity):
+        if supplier_id in starts:
+            start = starts[supplier_id]
+            month, billed, paid = next_month(start.period_end), start.total_billed, start.total_paid
+        else:
+            month, billed, paid = min(activity[supplier_id]), ZERO, ZERO
+        while month <= through:
+            month_billed, month_paid = activity[supplier_id].get(month, (ZERO, ZERO))
+            billed, paid = billed + month_billed, paid + month_paid
+            following = next_month(month)
+            snapshots.append(SupplierBalanceSnapshot(
+                supplier_id=supplier_id, period_end=following - timedelta(days=1), closing_at=day_start(following),
+                total_billed=billed, total_paid=paid, balance=billed - paid,
+            ))
+            month = following
+    SupplierBalanceSnapshot.objects.bulk_create(snapshots, batch_size=batch_size, ignore_conflicts=True)
+    return len(snapshots)
+
+
+def _delta_sum(field, cutoff):
+    return Coalesce(
+        Subquery(
+            SupplierLedgerEntry.objects.filter(
+                supplier=OuterRef('pk'),
+                posted_at__gte=Coalesce(OuterRef('snapshot_at'), Value(EPOCH)),
+                posted_at__lt=cutoff,
+            )
+            .order_by()
+            .values('supplier')
+            .annotate(total=Round(Sum(field), 2, output_field=MONEY))
+            .values('total'),
+            output_field=MONEY,
+        ),
+        Value(ZERO),
+        output_field=MONEY,
+    )
+
+
+def balances_at(day, suppliers=None):
+    """
+    Suppliers annotated with ``billed_at``, ``paid_at`` and ``balance_at``:
+    their ledger totals at the end of ``day``, from the nearest snapshot
+    plus the entries posted after it.
+    """
+    cutoff = day_start(day + timedelta(days=1))
+    snapshots = SupplierBalanceSnapshot.objects.filter(supplier=OuterRef('pk'), closing_at__lte=cutoff).order_by('-closing_at')
+
+    def snapshot(field):
+        return Coalesce(Subquery(snapshots.values(field)[:1], output_field=MONEY), Value(ZERO), output_field=MONEY)
+
+    return (
+        (Supplier.objects.all() if suppliers is None else suppliers)
+        .annotate(
+            snapshot_at=Subquery(snapshots.values('closing_at')[:1]),
+            billed_at=snapshot('total_billed') + _delta_sum('billed', cutoff),
+            paid_at=snapshot('total_paid') + _delta_sum('paid', cutoff),
+        )
+        .annotate(balance_at=F('billed_at') - F('paid_at'))
+    )
+
+
+def aging(day, suppliers=None):
+    """
+    Payables aging at the end of ``day``, one dict per supplier with a
+    balance: ``current`` (0-30 days), ``days_31_60``, ``days_61_90`` and
+    ``over_90``. Payments are aged with the bill they pay, other entries
+    from their own date. Only the last 90 days of entries are read, in one
+    grouped query; ``over_90`` is the rest of ``balances_at``.
+    """
+    cutoff = day_start(day + timedelta(days=1))
+    window = day_start(day - timedelta(days=AGING_BUCKETS[-1][1]))
+    suppliers = Supplier.objects.all() if suppliers is None else suppliers
+
+    # An entry is never younger than its own date, so everything aged within
+    # the window was also posted within it
+    amount = F('billed') - F('paid')
+    buckets = {}
+    lower = None
+    for name, days in AGING_BUCKETS:
+        since = day_start(day - timedelta(days=days))
+        condition = Q(aged_from__gte=since) if lower is None else Q(aged_from__gte=since, aged_from__lt=lower)
+        buckets[name] = Coalesce(Round(Sum(amount, filter=condition), 2, output_field=MONEY), Value(ZERO), output_field=MONEY)
+        lower = since
+    recent = {
+        row.pop('supplier'): row
+        for row in SupplierLedgerEntry.objects.filter(supplier__in=suppliers, posted_at__gte=window, posted_at__lt=cutoff)
+        .annotate(aged_from=Least(Coalesce('purchase_order__created_at', 'posted_at'), 'posted_at'))
+        .values('supplier')
+        .annotate(**buckets)
+        .order_by()
+    }
+
+    report = []
+    for pk, name, balance in balances_at(day, suppliers).order_by('name', 'pk').values_list('pk', 'name', 'balance_at'):
+        row = recent.get(pk, dict.fromkeys(buckets, ZERO))
+        if not balance and not any(row.values()):
+            continue
+        report.append({
+            'supplier': pk, 'name': name, 'balance': balance, **row,
+            'over_90': balance - sum(row.values(), ZERO),
+        })
+    return report
@@ -0,0 +1,29 @@
+"""
+Django management command to write month-end supplier balance snapshots
+Usage: python manage.py close_supplier_months [--through 2026-03-31]
+
+Snapshots every supplier's ledger totals at the end of each closed month
+that has no snapshot yet. Run it after month end (e.g. from cron on the 1st);
+balance-at-date and aging queries then only replay the entries posted since.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from suppliers.ledger import close_months
+
+
+class Command(BaseCommand):
+    help = 'Writes missing month-end supplier balance snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', help='Close months up to this date (YYYY-MM-DD), defaults to last month')
+
+    def handle(self, *args, **options):
+        through = None
+        if options['through']:
+            through = parse_date(options['through'])
+            if through is None:
+                raise CommandError('--through must be YYYY-MM-DD')
+
+        written = close_months(through)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} snapshot(s)'))
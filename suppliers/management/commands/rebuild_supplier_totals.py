@@ -0,0 +1,30 @@
+"""
+Django management command to rebuild supplier totals from the ledger
+Usage: python manage.py rebuild_supplier_totals [--dry-run]
+
+Supplier.total_billed / total_paid / balance are reset to the sums of their
+SupplierLedgerEntry rows with one UPDATE. Drift only happens when totals
+are edited outside suppliers.ledger (raw SQL, fixtures, old data).
+"""
+from django.core.management.base import BaseCommand
+
+from suppliers.ledger import drifted_suppliers, rebuild_totals
+
+
+class Command(BaseCommand):
+    help = 'Recomputes cached supplier totals from ledger entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only list suppliers whose totals drifted')
+
+    def handle(self, *args, **options):
+        drifted = list(drifted_suppliers().values_list('pk', 'name', 'balance', 'ledger_billed', 'ledger_paid'))
+        for pk, name, balance, billed, paid in drifted:
+            self.stdout.write(f'{name} (#{pk}): balance {balance}, ledger {billed - paid}')
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(drifted)} supplier(s) have drifted')
+            return
+
+        rebuilt = rebuild_totals([pk for pk, *_ in drifted])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt totals of {rebuilt} supplier(s)'))
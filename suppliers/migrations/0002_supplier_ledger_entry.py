@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0002_purchaseorder_currency'),
+        ('suppliers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('BILL', 'Bill'), ('PAYMENT', 'Payment'), ('OPENING', 'Opening Balance'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('billed', models.DecimalField(decimal_places=2, default=0, help_text='Added to total billed', max_digits=12)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, help_text='Added to total paid', max_digits=12)),
+                ('posted_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Date of the bill or payment')),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='purchase_orders.popayment')),
+                ('purchase_order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='purchase_orders.purchaseorder')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='suppliers.supplier')),
+            ],
+            options={
+                'verbose_name': 'Supplier Ledger Entry',
+                'verbose_name_plural': 'Supplier Ledger Entries',
+                'ordering': ['supplier', 'posted_at', 'id'],
+                'indexes': [models.Index(fields=['supplier', 'posted_at'], name='suppliers_ledger_posted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_ledger(apps, schema_editor):
+    Supplier = apps.get_model('suppliers', 'Supplier')
+    SupplierLedgerEntry = apps.get_model('suppliers', 'SupplierLedgerEntry')
+    PurchaseOrder = apps.get_model('purchase_orders', 'PurchaseOrder')
+    POPayment = apps.get_model('purchase_orders', 'POPayment')
+
+    sums = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    batch = []
+
+    def flush():
+        SupplierLedgerEntry.objects.bulk_create(batch)
+        batch.clear()
+
+    bills = PurchaseOrder.objects.values_list('pk', 'supplier_id', 'total_amount', 'created_at', 'po_number')
+    for pk, supplier_id, amount, created_at, po_number in bills.iterator(chunk_size=BATCH_SIZE):
+        batch.append(SupplierLedgerEntry(
+            supplier_id=supplier_id, kind='BILL', billed=amount, purchase_order_id=pk,
+            posted_at=created_at, note=po_number,
+        ))
+        sums[supplier_id][0] += amount
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    payments = POPayment.objects.values_list(
+        'pk', 'purchase_order_id', 'purchase_order__supplier_id', 'amount', 'date', 'reference'
+    )
+    for pk, po_id, supplier_id, amount, date, reference in payments.iterator(chunk_size=BATCH_SIZE):
+        batch.append(SupplierLedgerEntry(
+            supplier_id=supplier_id, kind='PAYMENT', paid=amount, purchase_order_id=po_id, payment_id=pk,
+            posted_at=date, note=reference,
+        ))
+        sums[supplier_id][1] += amount
+        if len(batch) >= BATCH_SIZE:
+            flush()
+
+    # Totals entered by hand (or seeded) before the ledger existed become opening balances
+    for pk, billed, paid, created_at in Supplier.objects.values_list('pk', 'total_billed', 'total_paid', 'created_at'):
+        extra_billed, extra_paid = billed - sums[pk][0], paid - sums[pk][1]
+        if extra_billed or extra_paid:
+            batch.append(SupplierLedgerEntry(
+                supplier_id=pk, kind='OPENING', billed=extra_billed, paid=extra_paid,
+                posted_at=created_at, note='Totals before the ledger',
+            ))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+    flush()
+
+
+def clear_ledger(apps, schema_editor):
+    apps.get_model('suppliers', 'SupplierLedgerEntry').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0002_supplier_ledger_entry'),
+        ('purchase_orders', '0002_purchaseorder_currency'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ledger, clear_ledger),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suppliers', '0003_backfill_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateField(help_text='Last day of the closed month')),
+                ('closing_at', models.DateTimeField(help_text='Start of the next month; entries before it are included')),
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='suppliers.supplier')),
+            ],
+            options={
+                'verbose_name': 'Supplier Balance Snapshot',
+                'verbose_name_plural': 'Supplier Balance Snapshots',
+                'ordering': ['supplier', '-period_end'],
+                'indexes': [models.Index(fields=['supplier', 'closing_at'], name='suppliers_snapshot_closing_idx')],
+                'constraints': [models.UniqueConstraint(fields=('supplier', 'period_end'), name='suppliers_snapshot_period_uniq')],
+            },
+        ),
+    ]
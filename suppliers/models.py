@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Supplier(models.Model):
@@ -28,7 +29,7 @@ class Supplier(models.Model):
     bank_name = models.CharField(max_length=255, blank=True)
     ifsc_code = models.CharField(max_length=20, blank=True)
     
-    # Ledger - Auto-updated via PO transactions
+    # Ledger - running sums of SupplierLedgerEntry rows (see suppliers/ledger.py)
     total_billed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -44,3 +45,79 @@ class Supplier(models.Model):
     
     def __str__(self):
         return f'{self.name} ({self.get_category_display()})'
+
+
+class SupplierLedgerEntry(models.Model):
+    """
+    Append-only supplier ledger. Supplier.total_billed / total_paid / balance
+    are running sums of these rows.
+    """
+    
+    KIND_CHOICES = [
+        ('BILL', 'Bill'),
+        ('PAYMENT', 'Payment'),
+        ('OPENING', 'Opening Balance'),
+        ('ADJUSTMENT', 'Adjustment'),
+    ]
+    
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='ledger_entries')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    billed = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Added to total billed')
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Added to total paid')
+    
+    # Source documents
+    purchase_order = models.ForeignKey(
+        'purchase_orders.PurchaseOrder', on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries'
+    )
+    payment = models.ForeignKey(
+        'purchase_orders.POPayment', on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries'
+    )
+    
+    posted_at = models.DateTimeField(default=timezone.now, help_text='Date of the bill or payment')
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['supplier', 'posted_at', 'id']
+        verbose_name = 'Supplier Ledger Entry'
+        verbose_name_plural = 'Supplier Ledger Entries'
+        indexes = [
+            models.Index(fields=['supplier', 'posted_at'], name='suppliers_ledger_posted_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError('Ledger entries are append-only; post an adjustment instead')
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.supplier_id}: +{self.billed} billed / +{self.paid} paid'
+
+
+class SupplierBalanceSnapshot(models.Model):
+    """
+    Month-end closing of a supplier's ledger: the totals of every entry
+    posted before ``closing_at``. Written by suppliers.ledger.close_months.
+    """
+    
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='balance_snapshots')
+    period_end = models.DateField(help_text='Last day of the closed month')
+    closing_at = models.DateTimeField(help_text='Start of the next month; entries before it are included')
+    total_billed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['supplier', '-period_end']
+        verbose_name = 'Supplier Balance Snapshot'
+        verbose_name_plural = 'Supplier Balance Snapshots'
+        constraints = [
+            models.UniqueConstraint(fields=['supplier', 'period_end'], name='suppliers_snapshot_period_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['supplier', 'closing_at'], name='suppliers_snapshot_closing_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.supplier_id} @ {self.period_end}: {self.balance}'
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import Supplier, SupplierBalanceSnapshot
+
+
+class SupplierSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Supplier
+        fields = [
+            'id', 'name', 'contact_person', 'email', 'phone', 'address', 'category',
+            'total_billed', 'total_paid', 'balance', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class SupplierBalanceSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SupplierBalanceSnapshot
+        fields = ['id', 'supplier', 'period_end', 'total_billed', 'total_paid', 'balance']
+        read_only_fields = fields
@@ -1,3 +1,155 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from purchase_orders.models import POPayment, PurchaseOrder
+from .ledger import aging, balances_at, close_months, drifted_suppliers, post, rebuild_totals
+from .models import Supplier, SupplierBalanceSnapshot, SupplierLedgerEntry
+
+
+class SupplierLedgerTests(TestCase):
+    """Bills and payments go through ledger entries and F() updates of the supplier totals"""
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name='Fabrics R Us', category='FABRIC')
+
+    def create_po(self, amount):
+        return PurchaseOrder.objects.create(supplier=self.supplier, type='FABRIC', total_amount=amount)
+
+    def test_po_and_payment_update_totals(self):
+        po = self.create_po(Decimal('1000.00'))
+        POPayment.objects.create(purchase_order=po, amount=Decimal('400.00'))
+        POPayment.objects.create(purchase_order=po, amount=Decimal('250.50'))
+
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.total_billed, Decimal('1000.00'))
+        self.assertEqual(self.supplier.total_paid, Decimal('650.50'))
+        self.assertEqual(self.supplier.balance, Decimal('349.50'))
+        self.assertEqual(
+            list(self.supplier.ledger_entries.values_list('kind', flat=True)), ['BILL', 'PAYMENT', 'PAYMENT']
+        )
+
+    def test_stale_supplier_instance_does_not_undo_postings(self):
+        stale = Supplier.objects.get(pk=self.supplier.pk)
+        self.create_po(Decimal('500.00'))
+        stale.name = 'Renamed'
+        stale.save(update_fields=['name'])
+        self.create_po(Decimal('300.00'))
+
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.balance, Decimal('800.00'))
+
+    def test_payment_queries_do_not_grow_with_history(self):
+        po = self.create_po(Decimal('10000.00'))
+        POPayment.objects.create(purchase_order=po, amount=Decimal('1.00'))
+        with CaptureQueriesContext(connection) as first:
+            POPayment.objects.create(purchase_order=po, amount=Decimal('1.00'))
+        for _ in range(20):
+            POPayment.objects.create(purchase_order=po, amount=Decimal('1.00'))
+        with CaptureQueriesContext(connection) as later:
+            POPayment.objects.create(purchase_order=po, amount=Decimal('1.00'))
+        self.assertEqual(len(first), len(later))
+
+    def test_rebuild_totals_repairs_drift(self):
+        po = self.create_po(Decimal('1000.00'))
+        POPayment.objects.create(purchase_order=po, amount=Decimal('100.00'))
+        Supplier.objects.filter(pk=self.supplier.pk).update(total_paid=0, balance=0)
+        self.assertEqual(list(drifted_suppliers().values_list('pk', flat=True)), [self.supplier.pk])
+
+        rebuild_totals()
+
+        self.supplier.refresh_from_db()
+        self.assertEqual((self.supplier.total_paid, self.supplier.balance), (Decimal('100.00'), Decimal('900.00')))
+        self.assertFalse(drifted_suppliers().exists())
+
+    def test_entries_are_append_only(self):
+        entry = self.create_po(Decimal('10.00')).ledger_entries.get()
+        with self.assertRaises(ValueError):
+            entry.save()
+        self.assertEqual(SupplierLedgerEntry.objects.count(), 1)
+
+
+def noon(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+class SupplierSnapshotTests(TestCase):
+    """Past balances start from month-end snapshots; aging buckets recent entries"""
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name='Trims Co', category='TRIMS')
+
+    def entry(self, when, billed=0, paid=0, kind='ADJUSTMENT'):
+        post([SupplierLedgerEntry(supplier=self.supplier, kind=kind, billed=billed, paid=paid, posted_at=when)])
+
+    def create_po(self, amount, when):
+        po = PurchaseOrder.objects.create(supplier=self.supplier, type='TRIM', total_amount=amount)
+        PurchaseOrder.objects.filter(pk=po.pk).update(created_at=when)
+        SupplierLedgerEntry.objects.filter(purchase_order=po).update(posted_at=when)
+        return po
+
+    def balance(self, day):
+        return balances_at(day).get(pk=self.supplier.pk).balance_at
+
+    def test_balances_match_full_replay(self):
+        self.entry(noon(2025, 11, 3), billed=Decimal('500.00'))
+        self.entry(noon(2025, 12, 15), paid=Decimal('200.00'))
+        self.entry(noon(2026, 2, 1), billed=Decimal('80.00'))
+        days = [date(2025, 11, 2), date(2025, 11, 30), date(2025, 12, 15), date(2026, 1, 31), date(2026, 2, 1)]
+        before = [self.balance(day) for day in days]
+
+        self.assertGreater(close_months(), 0)
+        self.assertEqual(
+            SupplierBalanceSnapshot.objects.get(supplier=self.supplier, period_end=date(2025, 12, 31)).balance,
+            Decimal('300.00'),
+        )
+        self.assertEqual([self.balance(day) for day in days], before)
+        self.assertEqual(before, [0, Decimal('500.00'), Decimal('300.00'), Decimal('300.00'), Decimal('380.00')])
+        self.assertEqual(close_months(), 0)
+
+    def test_backdated_entry_drops_later_snapshots(self):
+        self.entry(noon(2025, 11, 3), billed=Decimal('500.00'))
+        close_months()
+        self.entry(noon(2026, 1, 10), paid=Decimal('100.00'))
+
+        self.assertFalse(self.supplier.balance_snapshots.filter(period_end__gte=date(2026, 1, 31)).exists())
+        self.assertEqual(self.balance(date(2026, 3, 1)), Decimal('400.00'))
+        close_months()
+        self.assertEqual(
+            self.supplier.balance_snapshots.get(period_end=date(2026, 1, 31)).balance, Decimal('400.00')
+        )
+
+    def test_aging_buckets_payments_with_their_bill(self):
+        self.entry(noon(2025, 6, 1), billed=Decimal('1000.00'), kind='OPENING')
+        old = self.create_po(Decimal('300.00'), noon(2026, 1, 20))
+        self.create_po(Decimal('200.00'), noon(2026, 3, 10))
+        POPayment.objects.create(purchase_order=old, amount=Decimal('100.00'), date=noon(2026, 3, 15))
+        close_months(date(2026, 2, 28))
+
+        with self.assertNumQueries(2):
+            [row] = aging(date(2026, 3, 31))
+        self.assertEqual(row['balance'], Decimal('1400.00'))
+        self.assertEqual(
+            [row['current'], row['days_31_60'], row['days_61_90'], row['over_90']],
+            [Decimal('200.00'), Decimal('0'), Decimal('200.00'), Decimal('1000.00')],
+        )
+
+    def test_aging_endpoint(self):
+        self.entry(noon(2026, 1, 5), billed=Decimal('50.00'))
+        Supplier.objects.create(name='Idle Supplier')
+        user = get_user_model().objects.create_user(
+            email='seller@example.com', username='seller', first_name='Seller', password='x', role='SELLER'
+        )
+        client = APIClient()
+        client.force_authenticate(user)
 
-# Create your tests here.
+        response = client.get('/api/suppliers/aging/', {'date': '2026-01-20'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.json()['data']['suppliers']], ['Trims Co'])
+        self.assertEqual(client.get('/api/suppliers/balances/', {'date': 'soon'}).status_code, 400)
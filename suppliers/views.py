@@ -1,3 +1,71 @@
-from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from .ledger import aging, balances_at
+from .models import Supplier
+from .serializers import SupplierBalanceSnapshotSerializer, SupplierSerializer
+
+
+class SupplierViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Suppliers and their ledger (SELLER/ADMIN only)
+    - balances: billed / paid / balance of every supplier at the end of ?date=YYYY-MM-DD
+    - aging: payables in 0-30 / 31-60 / 61-90 / 90+ day buckets at ?date=
+    - snapshots: month-end closings of one supplier
+    """
+    serializer_class = SupplierSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['category']
+    search_fields = ['name', 'contact_person', 'email']
+    ordering_fields = ['name', 'balance', 'created_at']
+
+    def get_queryset(self):
+        user = self.request.user
+        if getattr(user, 'role', '').upper() in ['SELLER', 'ADMIN']:
+            return Supplier.objects.all()
+        return Supplier.objects.none()
+
+    def report_date(self):
+        value = self.request.query_params.get('date')
+        return parse_date(value) if value else timezone.localdate()
+
+    @action(detail=False, methods=['get'])
+    def balances(self, request):
+        """Ledger totals at the end of ?date= (default today), from the nearest month-end snapshot"""
+        day = self.report_date()
+        if day is None:
+            return Response({'success': False, 'error': 'date must be YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        rows = balances_at(day, self.filter_queryset(self.get_queryset())).values(
+            'id', 'name', 'category', 'billed_at', 'paid_at', 'balance_at'
+        )
+        data = [
+            {'id': row['id'], 'name': row['name'], 'category': row['category'], 'total_billed': row['billed_at'],
+             'total_paid': row['paid_at'], 'balance': row['balance_at']}
+            for row in rows
+        ]
+        return Response({'success': True, 'data': {'date': day, 'suppliers': data}}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def aging(self, request):
+        """Payables aging at the end of ?date= (default today); suppliers without a balance are left out"""
+        day = self.report_date()
+        if day is None:
+            return Response({'success': False, 'error': 'date must be YYYY-MM-DD'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        rows = aging(day, self.filter_queryset(self.get_queryset()))
+        return Response({'success': True, 'data': {'date': day, 'suppliers': rows}}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def snapshots(self, request, pk=None):
+        """Month-end closings of this supplier, latest first"""
+        snapshots = self.get_object().balance_snapshots.order_by('-period_end')
+        page = self.paginate_queryset(snapshots)
+        if page is not None:
+            return self.get_paginated_response(SupplierBalanceSnapshotSerializer(page, many=True).data)
+        return Response({'success': True, 'data': SupplierBalanceSnapshotSerializer(snapshots, many=True).data},
+                        status=status.HTTP_200_OK)
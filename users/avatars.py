@@ -0,0 +1,65 @@
+"""
+Avatar normalisation.
+
+Uploaded avatars are EXIF-transposed, centre-cropped to squares and saved as
+small JPEG variants without metadata. File names are derived from the SHA-256
+of the original upload, so a given URL always refers to the same bytes and can
+be cached immutably; re-uploading the same picture reuses the stored files.
+"""
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from PIL import Image, ImageOps
+
+# Square edge lengths (px) of the stored variants; the largest is the main avatar
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_QUALITY = 85
+
+
+def avatar_storage():
+    # Names are already content hashes, so skip the content-addressed default storage
+    return storages['hashed']
+
+
+def avatar_name(digest, size):
+    return f'avatars/{digest[:2]}/{digest[:20]}-{size}.jpg'
+
+
+def process_avatar(upload):
+    """
+    Store resized variants of ``upload`` and return ``{size: storage name}``
+    with sizes as strings (JSON keys).
+    """
+    upload.seek(0)
+    data = upload.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    storage = avatar_storage()
+    names = {str(size): avatar_name(digest, size) for size in AVATAR_SIZES}
+    if all(storage.exists(name) for name in names.values()):
+        return names
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for size in AVATAR_SIZES:
+            name = names[str(size)]
+            if storage.exists(name):
+                continue
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS, centering=(0.5, 0.5))
+            buffer = io.BytesIO()
+            # Saving without exif= drops all metadata from the output
+            variant.save(buffer, 'JPEG', quality=AVATAR_QUALITY, optimize=True)
+            saved = storage.save(name, ContentFile(buffer.getvalue()))
+            if saved != name:
+                # A concurrent upload of the same picture stored it first; keep that copy
+                storage.delete(saved)
+
+    return names
+
+
+def delete_avatar_files(variants):
+    storage = avatar_storage()
+    for name in variants.values():
+        storage.delete(name)
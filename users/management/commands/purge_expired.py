@@ -0,0 +1,74 @@
+"""
+Django management command to purge expired auth records
+Usage: python manage.py purge_expired [--batch-size 500] [--dry-run]
+
+Removes expired password reset requests, expired JWT outstanding/blacklisted
+tokens (when rest_framework_simplejwt.token_blacklist is installed) and
+expired Django sessions. Rows are deleted in small primary-key batches, each
+in its own transaction, so the SQLite write lock is only held briefly.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import PasswordResetRequest
+
+
+def purge_in_batches(queryset, batch_size):
+    """Delete rows matching ``queryset`` in pk-ordered batches; return the count."""
+    model = queryset.model
+    pk_query = queryset.order_by('pk').values_list('pk', flat=True)
+    total = 0
+    while True:
+        pks = list(pk_query[:batch_size])
+        if not pks:
+            return total
+        with transaction.atomic():
+            model.objects.filter(pk__in=pks).delete()
+        total += len(pks)
+
+
+class Command(BaseCommand):
+    help = 'Purges expired password reset requests, JWT tokens and sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows deleted per transaction')
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=1,
+            help='Keep expired password reset requests this many days for auditing',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be removed')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch_size = options['batch_size']
+
+        targets = [
+            (
+                'password reset requests',
+                PasswordResetRequest.objects.filter(expires_at__lt=now - timedelta(days=options['keep_days'])),
+            ),
+        ]
+
+        if apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+            # Blacklisted tokens cascade with their outstanding token
+            targets.append(('expired JWT tokens', OutstandingToken.objects.filter(expires_at__lt=now)))
+
+        if apps.is_installed('django.contrib.sessions'):
+            from django.contrib.sessions.models import Session
+
+            targets.append(('expired sessions', Session.objects.filter(expire_date__lt=now)))
+
+        for label, queryset in targets:
+            if options['dry_run']:
+                self.stdout.write(f'Would remove {queryset.count()} {label}')
+                continue
+            removed = purge_in_batches(queryset, batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Removed {removed} {label}'))
@@ -5,7 +5,8 @@ Usage: python manage.py seed_data
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from leads.models import Lead
-from suppliers.models import Supplier
+from suppliers.ledger import post
+from suppliers.models import Supplier, SupplierLedgerEntry
 from products.models import Product
 
 User = get_user_model()
@@ -82,8 +83,15 @@ class Command(BaseCommand):
             }
         ]
         
+        opening = []
         for supplier_data in suppliers:
-            Supplier.objects.create(**supplier_data)
+            billed = supplier_data.pop('total_billed')
+            paid = supplier_data.pop('total_paid')
+            supplier_data.pop('balance')
+            supplier = Supplier.objects.create(**supplier_data)
+            opening.append(SupplierLedgerEntry(supplier=supplier, kind='OPENING', billed=billed, paid=paid))
+        # Totals are derived from the ledger
+        post(opening)
         
         self.stdout.write(self.style.SUCCESS(f'Created {len(suppliers)} suppliers'))
     
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_passwordresetrequest'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordresetrequest',
+            index=models.Index(fields=['expires_at'], name='users_pwreset_expires_idx'),
+        ),
+    ]
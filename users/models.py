@@ -26,6 +26,8 @@ class User(AbstractUser):
     phone = models.CharField(max_length=20, blank=True)
     company = models.CharField(max_length=255, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True)
+    # Storage names of the resized avatar variants, keyed by edge length: {"64": "avatars/..."}
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     # Use email as the username field
@@ -71,6 +73,9 @@ class PasswordResetRequest(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at'], name='users_pwreset_expires_idx'),
+        ]
 
     def __str__(self):
         return f'Password reset for {self.user.email} at {self.created_at:%Y-%m-%d %H:%M}'
@@ -2,10 +2,13 @@ from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
 from django.db.models import Q
+from django.core.files.storage import default_storage
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 import requests
 from django.conf import settings
 
+from .avatars import AVATAR_SIZES, process_avatar, delete_avatar_files
+
 User = get_user_model()
 
 
@@ -15,19 +18,31 @@ class UserSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
     role_label = serializers.CharField(source='get_role_display', read_only=True)
     avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = [
             'id', 'email', 'username', 'first_name', 'last_name',
-            'role', 'role_label', 'phone', 'company', 'avatar', 'created_at'
+            'role', 'role_label', 'phone', 'company', 'avatar', 'avatar_variants', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
 
     def get_role(self, obj):
         return obj.role
 
+    @property
+    def media_base_url(self):
+        """Absolute media URL prefix, built once per serializer instead of per user."""
+        if not hasattr(self, '_media_base_url'):
+            request = self.context.get('request') if hasattr(self, 'context') else None
+            base = default_storage.base_url
+            self._media_base_url = request.build_absolute_uri(base) if request else base
+        return self._media_base_url
+
     def get_avatar(self, obj):
+        if obj.avatar_variants:
+            return self.media_base_url + obj.avatar_variants[str(AVATAR_SIZES[-1])]
         if not obj.avatar:
             return None
         request = self.context.get('request') if hasattr(self, 'context') else None
@@ -36,6 +51,10 @@ class UserSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(url)
         return url
 
+    def get_avatar_variants(self, obj):
+        base = self.media_base_url
+        return {size: base + name for size, name in obj.avatar_variants.items()}
+
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating user profile"""
@@ -53,19 +72,36 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             'company': {'required': False},
         }
 
+    @staticmethod
+    def release_avatar(instance):
+        """Delete the current avatar files unless another user still uses them"""
+        # Avatar files are content-addressed and may be shared with other users
+        if User.objects.filter(avatar=instance.avatar.name).exclude(pk=instance.pk).exists():
+            return
+        if instance.avatar_variants:
+            delete_avatar_files(instance.avatar_variants)
+        else:
+            instance.avatar.delete(save=False)
+
     def update(self, instance, validated_data):
         remove_avatar = validated_data.pop('remove_avatar', False)
         avatar = validated_data.pop('avatar', None)
 
         if remove_avatar and instance.avatar:
-            instance.avatar.delete(save=False)
+            self.release_avatar(instance)
             instance.avatar = None
+            instance.avatar_variants = {}
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
         if avatar is not None:
-            instance.avatar = avatar
+            variants = process_avatar(avatar)
+            main = variants[str(AVATAR_SIZES[-1])]
+            if instance.avatar and instance.avatar.name != main:
+                self.release_avatar(instance)
+            instance.avatar = main
+            instance.avatar_variants = variants
 
         instance.save()
         return instance
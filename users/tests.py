@@ -1,3 +1,117 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .avatars import AVATAR_SIZES, avatar_storage, process_avatar
+from .models import PasswordResetRequest, User
+
+
+class PurgeExpiredTests(TestCase):
+    """purge_expired removes expired reset requests in batches and keeps recent ones"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='a@example.com', username='a', password='pw123456')
+        now = timezone.now()
+        for days in [3, 4, 5, 6, 7]:
+            PasswordResetRequest.objects.create(user=self.user, otp_hash='x', expires_at=now - timedelta(days=days))
+        self.recent = PasswordResetRequest.objects.create(
+            user=self.user, otp_hash='x', expires_at=now - timedelta(hours=2)
+        )
+        self.active = PasswordResetRequest.objects.create(
+            user=self.user, otp_hash='x', expires_at=now + timedelta(minutes=10)
+        )
+
+    def test_purges_in_batches(self):
+        out = StringIO()
+        call_command('purge_expired', batch_size=2, stdout=out)
+        self.assertIn('Removed 5 password reset requests', out.getvalue())
+        self.assertEqual(
+            set(PasswordResetRequest.objects.values_list('pk', flat=True)), {self.recent.pk, self.active.pk}
+        )
+
+    def test_dry_run_deletes_nothing(self):
+        out = StringIO()
+        call_command('purge_expired', dry_run=True, stdout=out)
+        self.assertIn('Would remove 5 password reset requests', out.getvalue())
+        self.assertEqual(PasswordResetRequest.objects.count(), 7)
+
+
+class AvatarTests(TestCase):
+    """Avatars are stored as square, metadata-free JPEG variants named after the upload's hash"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(email='a@example.com', username='a', password='pw123456')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, color='red'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 500), color).save(buffer, 'PNG')
+        return SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+
+    def test_upload_stores_square_variants(self):
+        response = self.client.patch('/api/auth/me/', {'avatar': self.upload()}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual(sorted(self.user.avatar_variants, key=int), [str(size) for size in AVATAR_SIZES])
+        for size, name in self.user.avatar_variants.items():
+            with avatar_storage().open(name) as handle, Image.open(handle) as image:
+                self.assertEqual((image.format, image.size), ('JPEG', (int(size), int(size))))
+                self.assertNotIn('exif', image.info)
+        self.assertTrue(response.json()['avatar_variants'])
+
+    def test_same_picture_reuses_names_and_remove_deletes_files(self):
+        self.client.patch('/api/auth/me/', {'avatar': self.upload()}, format='multipart')
+        self.user.refresh_from_db()
+        first = dict(self.user.avatar_variants)
+        self.client.patch('/api/auth/me/', {'avatar': self.upload()}, format='multipart')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_variants, first)
+
+        response = self.client.patch('/api/auth/me/', {'remove_avatar': True}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_variants, {})
+        self.assertFalse(any(avatar_storage().exists(name) for name in first.values()))
+
+    def test_replacing_deletes_previous_variants(self):
+        self.client.patch('/api/auth/me/', {'avatar': self.upload('red')}, format='multipart')
+        self.user.refresh_from_db()
+        first = dict(self.user.avatar_variants)
+        self.client.patch('/api/auth/me/', {'avatar': self.upload('blue')}, format='multipart')
+        self.user.refresh_from_db()
+
+        self.assertNotEqual(self.user.avatar_variants, first)
+        self.assertFalse(any(avatar_storage().exists(name) for name in first.values()))
+        self.assertTrue(all(avatar_storage().exists(name) for name in self.user.avatar_variants.values()))
+
+    def test_concurrently_stored_variant_keeps_its_canonical_name(self):
+        upload = self.upload()
+        storage = avatar_storage()
+        first = process_avatar(upload)
+        # The second upload checked for the files before the first one stored them
+        racing = mock.Mock(exists=mock.Mock(return_value=False), save=storage.save, delete=storage.delete)
+        with mock.patch('users.avatars.avatar_storage', return_value=racing):
+            second = process_avatar(upload)
+
+        self.assertEqual(first, second)
+        directory = first[str(AVATAR_SIZES[0])].rsplit('/', 1)[0]
+        self.assertEqual(
+            sorted(f'{directory}/{filename}' for filename in storage.listdir(directory)[1]), sorted(first.values())
+        )
@@ -13,6 +13,7 @@ from django.core.mail import send_mail
 from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
 
+from backend.throttling import IPBucketThrottle
 from .serializers import (
     UserSerializer,
     UserCreateSerializer,
@@ -34,11 +35,15 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
     serializer_class = UserCreateSerializer
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'register'
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Login endpoint - returns JWT tokens + user data"""
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'login'
 
 
 
@@ -70,6 +75,8 @@ class PasswordResetRequestView(generics.GenericAPIView):
 
     permission_classes = [AllowAny]
     serializer_class = PasswordResetRequestSerializer
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -125,6 +132,8 @@ class PasswordResetVerifyView(generics.GenericAPIView):
 
     permission_classes = [AllowAny]
     serializer_class = PasswordResetVerifySerializer
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -201,6 +210,8 @@ class PasswordResetConfirmView(generics.GenericAPIView):
 
     permission_classes = [AllowAny]
     serializer_class = PasswordResetConfirmSerializer
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)